@@ -74,14 +74,93 @@ WSGI_APPLICATION = 'SinToFront.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Conexiones persistentes y transacciones IMMEDIATE: una escritura toma el
+# bloqueo al empezar en vez de fallar al promocionarlo a mitad de transacción.
+# 'replica' es el mismo archivo en solo lectura (ver web/db.py)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'OPTIONS': {},
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['web.db.ReadReplicaRouter']
+DATABASE_READ_ALIAS = 'replica'
+
+
+# PRAGMA aplicados a cada conexión SQLite nueva. Solo fuera de desarrollo:
+# journal_mode=WAL queda grabado en el archivo y crea db.sqlite3-wal/-shm
+
+SQLITE_PRAGMAS_ENABLED = not DEBUG
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+# Caché compartido entre workers para recomendaciones y gestos
+# BACKEND: 'memory' (por proceso), 'sqlite' (archivo compartido) o 'redis'
+# SERIALIZER (solo sqlite): 'pickle', 'json' o 'numpy' (arrays fuera de banda)
+
+RECOMMENDATION_CACHE = {
+    'BACKEND': 'sqlite',
+    'LOCATION': BASE_DIR / 'cache.sqlite3',
+    'MAX_ENTRIES': 10000,
+    'SERIALIZER': 'numpy',
 }
 
 
+# Caché de lectura de los repositorios de canciones y playlists (web.django_patterns),
+# invalidado por señales; 'memory' solo es coherente con un único proceso
+
+REPOSITORY_CACHE = {
+    'BACKEND': 'sqlite',
+    'LOCATION': BASE_DIR / 'repository_cache.sqlite3',
+    'MAX_ENTRIES': 50000,
+    'SERIALIZER': 'pickle',
+    'TTL': 3600,
+}
+
+
+# Observadores de recomendaciones (caché, notificaciones), entregados en segundo plano
+# POLICY con la cola llena: 'drop' (descarta el evento) o 'block' (espera BLOCK_TIMEOUT s)
+
+RECOMMENDATION_EVENT_BUS = {
+    'MAX_QUEUE': 10000,
+    'WORKERS': 2,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 0.05,
+    'POLICY': 'drop',
+    'BLOCK_TIMEOUT': 1.0,
+}
+
+
+# Índice de vectores de canciones (ContentBasedStrategy), generado con SongVectorIndex.save()
+
+SONG_VECTOR_INDEX_DIR = BASE_DIR / 'song_index'
+
+
+# Modelo colaborativo entrenado (ItemSimilarityEngine.save), generado por
+# precompute_recommendations; las peticiones nunca lo entrenan
+
+COLLABORATIVE_MODEL_DIR = BASE_DIR / 'collaborative_model'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
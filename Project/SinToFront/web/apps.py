@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class WebConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'web'
+
+    def ready(self):
+        from . import db, signals  # noqa: F401
+        from .django_patterns import connect_cache_observers
+
+        # El caché de los repositorios se crea en la primera invalidación o lectura
+        connect_cache_observers()
@@ -0,0 +1,22 @@
+"""
+Benchmarks de rendimiento
+
+Se ejecutan con `python manage.py benchmark <nombre>`. Cada benchmark expone
+una función `run(**options)` que devuelve una lista de filas (dicts) con
+sus métricas.
+"""
+from . import ann, batch, cache, collaborative, database, events, export, recommendation, records, search, serializers
+
+BENCHMARKS = {
+    'ann': ann.run,
+    'batch': batch.run,
+    'cache': cache.run,
+    'collaborative': collaborative.run,
+    'database': database.run,
+    'events': events.run,
+    'export': export.run,
+    'recommendation': recommendation.run,
+    'records': records.run,
+    'search': search.run,
+    'serializers': serializers.run,
+}
@@ -0,0 +1,65 @@
+"""
+Benchmark del índice IVF frente a búsqueda exacta: recall@10 y latencia por n_probe
+"""
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..similarity_index import SongVectorIndex
+from .synthetic import synthetic_vectors
+
+
+def _latencies(func, queries) -> List[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(operations: int = 200, songs: int = 100_000, n_lists: int = 0, **options) -> List[Dict[str, Any]]:
+    vectors = synthetic_vectors(songs)
+    n_lists = n_lists or int(4 * np.sqrt(songs))
+    
+    start = time.perf_counter()
+    index = SongVectorIndex(n_lists=n_lists).build(np.arange(songs), vectors)
+    build_seconds = time.perf_counter() - start
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(tmp)
+        start = time.perf_counter()
+        index = SongVectorIndex.load(tmp, mmap=True)
+        load_seconds = time.perf_counter() - start
+        
+        rng = np.random.default_rng(1)
+        query_ids = rng.choice(index.song_ids, size=operations, replace=False)
+        queries = [np.array(index.vector(int(song_id))) for song_id in query_ids]
+        
+        exact = [{s for s, _ in index.exact_search(q, k=10)} for q in queries]
+        exact_ms = _latencies(lambda q: index.exact_search(q, k=10), queries)
+        rows = [{
+            "name": f"exacta {songs} canciones",
+            "build_s": build_seconds,
+            "load_mmap_s": load_seconds,
+            "recall_at_10": 1.0,
+            "p50_ms": float(np.percentile(exact_ms, 50)),
+            "p99_ms": float(np.percentile(exact_ms, 99)),
+        }]
+        
+        for n_probe in (1, 4, 16, 64):
+            found = [{s for s, _ in index.search(q, k=10, n_probe=n_probe)} for q in queries]
+            recall = np.mean([len(f & e) / len(e) for f, e in zip(found, exact)])
+            ivf_ms = _latencies(lambda q: index.search(q, k=10, n_probe=n_probe), queries)
+            rows.append({
+                "name": f"IVF n_lists={n_lists} n_probe={n_probe}",
+                "recall_at_10": float(recall),
+                "p50_ms": float(np.percentile(ivf_ms, 50)),
+                "p99_ms": float(np.percentile(ivf_ms, 99)),
+            })
+        # Liberar el mmap antes de borrar el directorio temporal
+        del index
+    return rows
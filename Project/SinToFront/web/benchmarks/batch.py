@@ -0,0 +1,66 @@
+"""
+Benchmark de recomendaciones por lotes: N llamadas a run frente a un run_batch
+
+Las peticiones comparten un conjunto pequeño de canciones actuales (como la
+portada o un envío masivo), de modo que el lote reutiliza las búsquedas de
+vecinos y puntúa a todos los usuarios en una sola pasada del motor.
+"""
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..collaborative import ItemSimilarityEngine
+from ..fusion import ScoreFusion
+from ..similarity_index import SongVectorIndex
+from .synthetic import synthetic_events, synthetic_vectors
+
+
+def run(operations: int = 5000, users: int = 10_000, songs: int = 100_000, **options) -> List[Dict[str, Any]]:
+    from ..recommendation_system import (
+        CollaborativeFilteringStrategy,
+        ContentBasedStrategy,
+        DiversityReranker,
+        FreshnessReranker,
+        RecommendationPipeline,
+    )
+
+    engine = ItemSimilarityEngine().fit(synthetic_events(users, songs))
+    index = SongVectorIndex().build(np.arange(songs), synthetic_vectors(songs, 64))
+    pipeline = RecommendationPipeline(
+        "benchmark",
+        [CollaborativeFilteringStrategy(engine), ContentBasedStrategy(index)],
+        [0.6, 0.4],
+        [5.0, 5.0],
+        fusion=ScoreFusion(),
+        rerankers=[DiversityReranker(), FreshnessReranker()],
+    )
+
+    rows = []
+    # Muestra sin reemplazo: no puede pedir más usuarios de los que hay
+    batch_size = min(operations, users, 1000)
+    rng = np.random.default_rng(0)
+    user_ids = rng.choice(users, size=batch_size, replace=False)
+    current_songs = rng.choice(songs, size=min(songs, 20), replace=False)
+    requests = [
+        (SimpleNamespace(id=int(user_id)), {"current_song": int(current_songs[i % len(current_songs)])})
+        for i, user_id in enumerate(user_ids)
+    ]
+
+    start = time.perf_counter()
+    for user, context in requests:
+        pipeline.run(user, context)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pipeline.run_batch(requests)
+    batch_seconds = time.perf_counter() - start
+
+    for name, seconds in (("run x N", loop_seconds), ("run_batch", batch_seconds)):
+        rows.append({
+            "name": f"híbrido {batch_size} peticiones / {name}",
+            "total_ms": seconds * 1000,
+            "per_request_us": seconds / batch_size * 1e6,
+        })
+    return rows
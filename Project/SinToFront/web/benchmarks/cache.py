@@ -0,0 +1,94 @@
+"""
+Benchmark de backends de caché: InMemoryCache, SQLiteCache y RedisCache
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from ..services import InMemoryCache, RedisCache, SQLiteCache
+
+
+def _sample_payload(i: int) -> List[Dict[str, Any]]:
+    """Payload con la forma de una respuesta de recomendaciones"""
+    return [
+        {"title": f"Song {i}-{j}", "artist": f"Artist {j}", "score": 0.5 + j / 100}
+        for j in range(10)
+    ]
+
+
+def _measure(cache, operations: int) -> Dict[str, float]:
+    payloads = [_sample_payload(i) for i in range(operations)]
+    
+    start = time.perf_counter()
+    for i, payload in enumerate(payloads):
+        cache.set(f"bench_{i}", payload, ttl=600)
+    set_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i in range(operations):
+        cache.get(f"bench_{i}")
+    get_seconds = time.perf_counter() - start
+    
+    return {
+        "set_ops_per_sec": operations / set_seconds,
+        "get_ops_per_sec": operations / get_seconds,
+        "set_us": set_seconds / operations * 1e6,
+        "get_us": get_seconds / operations * 1e6,
+    }
+
+
+def _contention_worker(path: str, worker: int, operations: int, results):
+    cache = SQLiteCache(path)
+    hits = 0
+    start = time.perf_counter()
+    for i in range(operations):
+        key = f"shared_{i % 200}"
+        if cache.get(key) is not None:
+            hits += 1
+        elif i % 4 == worker % 4:
+            cache.set(key, _sample_payload(i), ttl=600)
+    results.put((time.perf_counter() - start, hits))
+
+
+def _measure_contention(path: str, workers: int, operations: int) -> Dict[str, float]:
+    """Varios procesos leyendo y escribiendo el mismo archivo de caché"""
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_contention_worker, args=(path, w, operations, results))
+        for w in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+    
+    hits = sum(h for _, h in outcomes)
+    return {
+        "ops_per_sec": workers * operations / elapsed,
+        "hit_rate": hits / (workers * operations),
+    }
+
+
+def run(operations: int = 5000, workers: int = 4, **options) -> List[Dict[str, Any]]:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_cache.sqlite3")
+        backends = [
+            ("InMemoryCache", InMemoryCache()),
+            ("SQLiteCache", SQLiteCache(path, max_entries=operations * 2)),
+            # RedisCache aún no tiene conexión real: mide solo el overhead de la interfaz
+            ("RedisCache (stub)", RedisCache()),
+        ]
+        for name, cache in backends:
+            rows.append({"name": name, **_measure(cache, operations)})
+        
+        rows.append({
+            "name": f"SQLiteCache x{workers} procesos",
+            **_measure_contention(path, workers, operations),
+        })
+    return rows
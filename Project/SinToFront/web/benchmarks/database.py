@@ -0,0 +1,189 @@
+"""
+Benchmark de contención lectura/escritura en SQLite con varios procesos
+
+Cada proceso simula un worker de gunicorn atendiendo peticiones sobre una
+tabla de tareas: la mayoría lee una página del listado y una de cada
+WRITE_EVERY lee una tarea y la actualiza en la misma transacción (como
+get() + save() dentro de atomic()). Se comparan dos perfiles:
+
+- por defecto: journal de rollback, una conexión por petición y
+  transacciones diferidas (lo que hacía la configuración anterior);
+- producción: settings.SQLITE_PRAGMAS, conexiones persistentes, escrituras con
+  BEGIN IMMEDIATE y lecturas por una conexión query_only aparte.
+
+Los errores son peticiones que acabaron en "database is locked".
+"""
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from django.conf import settings
+
+from ..db import pragma_statements
+
+WRITE_EVERY = 5
+PAGE = 20
+TASKS = 50_000
+STATUSES = ("TODO", "IN_PROGRESS", "DONE")
+
+SCHEMA = [
+    "CREATE TABLE web_task (id INTEGER PRIMARY KEY, title TEXT NOT NULL, status TEXT NOT NULL,"
+    " created_at REAL NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE INDEX task_status_created_idx ON web_task (status, created_at DESC, id DESC)",
+]
+
+READ_SQL = "SELECT id, title, status FROM web_task WHERE status = ? ORDER BY created_at DESC, id DESC LIMIT ?"
+GET_SQL = "SELECT status FROM web_task WHERE id = ?"
+UPDATE_SQL = "UPDATE web_task SET status = ?, updated_at = ? WHERE id = ?"
+
+
+class _DefaultProfile:
+    """Conexión nueva por petición, journal de rollback y BEGIN diferido"""
+
+    begin = "BEGIN"
+    journal_mode = "DELETE"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def reader(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, isolation_level=None)
+
+    writer = reader
+
+    def release(self, conn: sqlite3.Connection):
+        conn.close()
+
+
+class _ProductionProfile:
+    """Conexiones persistentes con settings.SQLITE_PRAGMAS y BEGIN IMMEDIATE"""
+
+    begin = "BEGIN IMMEDIATE"
+    journal_mode = settings.SQLITE_PRAGMAS.get("journal_mode", "DELETE")
+
+    def __init__(self, path: str):
+        self._reader = self._connect(path, read_only=True)
+        self._writer = self._connect(path, read_only=False)
+
+    @staticmethod
+    def _connect(path: str, read_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, isolation_level=None)
+        # El perfil de producción aunque SQLITE_PRAGMAS_ENABLED esté desactivado en desarrollo
+        for statement in pragma_statements(settings.SQLITE_PRAGMAS, read_only):
+            conn.execute(statement)
+        return conn
+
+    def reader(self) -> sqlite3.Connection:
+        return self._reader
+
+    def writer(self) -> sqlite3.Connection:
+        return self._writer
+
+    def release(self, conn: sqlite3.Connection):
+        pass
+
+
+PROFILES = {
+    "por defecto": _DefaultProfile,
+    "producción (WAL + réplica)": _ProductionProfile,
+}
+
+
+def _create_database(path: str, journal_mode: str):
+    rng = np.random.default_rng(0)
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    created = np.sort(rng.random(TASKS) * 1e6)
+    statuses = rng.choice(STATUSES, size=TASKS).tolist()
+    conn.executemany(
+        "INSERT INTO web_task VALUES (?, ?, ?, ?, ?)",
+        ((i + 1, f"Tarea {i}", status, float(t), float(t)) for i, (status, t) in enumerate(zip(statuses, created))),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _request(profile, rng, write: bool):
+    if not write:
+        conn = profile.reader()
+        try:
+            conn.execute(READ_SQL, (STATUSES[rng.integers(0, len(STATUSES))], PAGE)).fetchall()
+        finally:
+            profile.release(conn)
+        return
+    conn = profile.writer()
+    try:
+        task_id = int(rng.integers(1, TASKS + 1))
+        conn.execute(profile.begin)
+        try:
+            status = conn.execute(GET_SQL, (task_id,)).fetchone()[0]
+            following = STATUSES[(STATUSES.index(status) + 1) % len(STATUSES)]
+            conn.execute(UPDATE_SQL, (following, time.time(), task_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    finally:
+        profile.release(conn)
+
+
+def _worker(profile_name: str, path: str, worker: int, operations: int, results):
+    rng = np.random.default_rng(worker)
+    profile = PROFILES[profile_name](path)
+    reads, writes, errors = [], [], 0
+    start = time.perf_counter()
+    for i in range(operations):
+        write = i % WRITE_EVERY == worker % WRITE_EVERY
+        begin = time.perf_counter()
+        try:
+            _request(profile, rng, write)
+        except sqlite3.OperationalError:
+            errors += 1
+            continue
+        (writes if write else reads).append(time.perf_counter() - begin)
+    results.put((time.perf_counter() - start, reads, writes, errors))
+
+
+def _measure(profile_name: str, path: str, workers: int, operations: int) -> Dict[str, float]:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(profile_name, path, w, operations, results))
+        for w in range(workers)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    reads = np.concatenate([r for _, r, _, _ in outcomes]) * 1000
+    writes = np.concatenate([w for _, _, w, _ in outcomes]) * 1000
+    errors = sum(e for _, _, _, e in outcomes)
+    row = {"ops_per_sec": (workers * operations - errors) / elapsed, "errors": errors}
+    for kind, latencies in (("read", reads), ("write", writes)):
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            row.update({f"{kind}_p50_ms": float(p50), f"{kind}_p95_ms": float(p95), f"{kind}_p99_ms": float(p99)})
+    return row
+
+
+def run(operations: int = 5000, workers: int = 4, **options) -> List[Dict[str, Any]]:
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (profile_name, profile) in enumerate(PROFILES.items()):
+            path = os.path.join(directory, f"tasks_{index}.sqlite3")
+            _create_database(path, profile.journal_mode)
+            rows.append({
+                "name": f"SQLite {profile_name} x{workers} procesos",
+                **_measure(profile_name, path, workers, operations),
+            })
+    return rows
@@ -0,0 +1,79 @@
+"""
+Benchmark del bus de eventos de observadores: notificación síncrona frente a encolado
+
+Un observador simula I/O de 1 ms por evento (o por lote, si lo agrupa). Se
+mide la latencia que la notificación añade a la petición y los eventos
+entregados/descartados con cada política.
+"""
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..events import ObserverEventBus, RecommendationEvent
+
+
+class _SlowObserver:
+    """Observador con coste fijo de I/O por llamada"""
+
+    def __init__(self, io_seconds: float = 0.001):
+        self.io_seconds = io_seconds
+        self.received = 0
+
+    def on_recommendations_updated(self, user, recommendations, cache_key=None, metadata=None):
+        time.sleep(self.io_seconds)
+        self.received += 1
+
+    def on_recommendations_batch(self, events):
+        time.sleep(self.io_seconds)
+        self.received += len(events)
+
+
+def _latencies(notify, events) -> Dict[str, float]:
+    latencies = []
+    start_all = time.perf_counter()
+    for event in events:
+        start = time.perf_counter()
+        notify(event)
+        latencies.append(time.perf_counter() - start)
+    total = time.perf_counter() - start_all
+    latencies = np.asarray(latencies) * 1e6
+    return {
+        "p50_us": float(np.percentile(latencies, 50)),
+        "p99_us": float(np.percentile(latencies, 99)),
+        "events_per_sec": len(events) / total,
+    }
+
+
+def run(operations: int = 5000, workers: int = 2, **options) -> List[Dict[str, Any]]:
+    events = [
+        RecommendationEvent(SimpleNamespace(id=i % 500), [], f"key_{i}", {})
+        for i in range(operations)
+    ]
+    rows = []
+
+    observers = [_SlowObserver(), _SlowObserver()]
+    sync_events = events[:max(1, operations // 10)]
+
+    def notify_sync(event):
+        for observer in observers:
+            observer.on_recommendations_updated(event.user, event.recommendations, event.cache_key, event.metadata)
+
+    rows.append({"name": f"síncrono ({len(sync_events)} eventos)", **_latencies(notify_sync, sync_events)})
+
+    for policy, max_queue in (("drop", 10_000), ("drop", 100), ("block", 100)):
+        observers = [_SlowObserver(), _SlowObserver()]
+        bus = ObserverEventBus(max_queue=max_queue, workers=workers, policy=policy)
+        for observer in observers:
+            bus.subscribe(observer)
+        metrics = _latencies(bus.publish, events)
+        bus.close()
+        stats = bus.stats()
+        rows.append({
+            "name": f"bus {policy} (cola {max_queue}, {workers} workers)",
+            **metrics,
+            "dropped": stats["dropped"],
+            "delivered_per_observer": observers[0].received,
+        })
+    return rows
@@ -0,0 +1,122 @@
+"""
+Benchmark de exportación en streaming: memoria plana de 1k a N filas
+
+Crea la tabla de tareas (esquema real, vía schema_editor) en una base SQLite
+temporal registrada como alias aparte y exporta tamaños crecientes, cada uno
+en un proceso hijo que descarta los bytes. El crecimiento de RSS se mide con
+resource.getrusage (ru_maxrss) y el benchmark falla si algún tamaño supera
+RSS_BOUND_MB: la memoria no debe depender del número de filas.
+
+La conexión del benchmark desactiva mmap: las páginas del archivo mapeadas
+cuentan en el RSS aunque son caché del sistema, compartida y liberable, y
+con el perfil de web.db crecerían con la tabla hasta mmap_size.
+"""
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from django.db import connections
+
+from ..catalog_export import export_stream
+from ..catalog_import import batched
+from ..models import Task
+
+ALIAS = "export_benchmark"
+RSS_BOUND_MB = 32
+INSERT_BATCH = 50_000
+STATUSES = [value for value in Task.Status.values if value != Task.Status.ARCHIVED]
+
+VARIANTS = (
+    ("csv", False),
+    ("ndjson", False),
+    ("csv", True),
+)
+
+
+def _sizes(rows: int) -> List[int]:
+    sizes, size = [], 1000
+    while size < rows:
+        sizes.append(size)
+        size *= 10
+    return sizes + [rows]
+
+
+def _create_tasks(rows: int):
+    connection = connections[ALIAS]
+    with connection.schema_editor() as editor:
+        editor.create_model(Task)
+    table = Task._meta.db_table
+    sql = (f"INSERT INTO {table} (id, title, description, status, created_at, updated_at) "
+           "VALUES (%s, %s, %s, %s, %s, %s)")
+    moment = "2024-01-01 00:00:00"
+    tasks = (
+        (i, f"Tarea {i}", f"Descripción de la tarea {i}", STATUSES[i % len(STATUSES)], moment, moment)
+        for i in range(1, rows + 1)
+    )
+    with connection.cursor() as cursor:
+        for batch in batched(tasks, INSERT_BATCH):
+            cursor.executemany(sql, batch)
+    connection.close()
+
+
+def _maxrss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _export_worker(fmt: str, compress: bool, rows: int, results):
+    with connections[ALIAS].cursor() as cursor:
+        cursor.execute("PRAGMA mmap_size=0")
+    before = _maxrss_mb()
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in export_stream("tasks", fmt, compress, using=ALIAS, limit=rows))
+    elapsed = time.perf_counter() - start
+    connections[ALIAS].close()
+    results.put((elapsed, size, _maxrss_mb() - before))
+
+
+def _measure(fmt: str, compress: bool, rows: int) -> Dict[str, float]:
+    results = multiprocessing.Queue()
+    # El hijo abre sus propias conexiones
+    connections.close_all()
+    process = multiprocessing.Process(target=_export_worker, args=(fmt, compress, rows, results))
+    process.start()
+    elapsed, size, growth = results.get()
+    process.join()
+    return {
+        "rows_per_sec": rows / elapsed,
+        "mb": size / 2 ** 20,
+        "rss_growth_mb": growth,
+    }
+
+
+def run(operations: int = 5000, **options) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as directory:
+        connections.settings[ALIAS] = {
+            **connections.settings["default"],
+            "NAME": os.path.join(directory, "export.sqlite3"),
+        }
+        try:
+            start = time.perf_counter()
+            _create_tasks(operations)
+            rows = [{"name": f"Tabla de {operations} tareas", "build_s": time.perf_counter() - start}]
+            for fmt, compress in VARIANTS:
+                for size in _sizes(operations):
+                    rows.append({
+                        "name": f"{fmt}{'.gz' if compress else ''} {size} filas",
+                        **_measure(fmt, compress, size),
+                    })
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+
+    exceeded = [
+        f"{row['name']} ({row['rss_growth_mb']:.1f} MB)"
+        for row in rows if row.get("rss_growth_mb", 0) > RSS_BOUND_MB
+    ]
+    if exceeded:
+        raise ValueError(f"La exportación supera {RSS_BOUND_MB} MB de RSS en: {', '.join(exceeded)}")
+    return rows
@@ -0,0 +1,81 @@
+"""
+Utilidades comunes de los benchmarks: percentiles, throughput, memoria pico
+y comparación con una línea base guardada en JSON
+"""
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Sentido de mejora de cada métrica según su nombre
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "_mb", "bytes", "bytes_per_record")
+HIGHER_IS_BETTER = ("per_sec", "recall", "hit_rate", "speedup")
+
+
+def latency_stats(func: Callable[[Any], Any], inputs: Iterable[Any]) -> Dict[str, float]:
+    """Latencia por llamada (p50/p95/p99/media en ms) y throughput secuencial"""
+    latencies = []
+    start_all = time.perf_counter()
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    total = time.perf_counter() - start_all
+    latencies = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(latencies.mean()),
+        "ops_per_sec": len(latencies) / total,
+    }
+
+
+def peak_memory(func: Callable[[], Any]) -> Tuple[Any, float]:
+    """(resultado, pico de memoria Python asignada durante la llamada en MB)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 2 ** 20
+
+
+def save_baseline(path: str, benchmark: str, options: Dict[str, Any], rows: List[Dict[str, Any]]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"benchmark": benchmark, "options": options, "rows": rows}, f, indent=2, default=str)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(rows: List[Dict[str, Any]], baseline_rows: List[Dict[str, Any]],
+                        tolerance: float = 0.2) -> List[str]:
+    """
+    Regresiones respecto a la línea base
+
+    Se comparan las filas con el mismo nombre y las métricas con sentido
+    conocido; una métrica empeora si se aleja más de `tolerance` (relativo).
+    """
+    baseline = {row["name"]: row for row in baseline_rows}
+    regressions = []
+    for row in rows:
+        previous = baseline.get(row["name"])
+        if previous is None:
+            continue
+        for metric, value in row.items():
+            old = previous.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+                continue
+            change = (value - old) / abs(old)
+            if metric.endswith(LOWER_IS_BETTER) and change > tolerance:
+                regressions.append(f"{row['name']}: {metric} {old:.3f} -> {value:.3f} (+{change:.0%})")
+            elif any(token in metric for token in HIGHER_IS_BETTER) and change < -tolerance:
+                regressions.append(f"{row['name']}: {metric} {old:.3f} -> {value:.3f} ({change:.0%})")
+    return regressions
@@ -0,0 +1,87 @@
+"""
+Benchmark del sistema de recomendaciones a escala
+
+Genera usuarios, catálogo y eventos sintéticos (--users/--songs, de 1k a 1M),
+entrena el motor colaborativo y el índice de contenido, y mide para cada
+estrategia, la fusión híbrida y los decoradores: percentiles de latencia,
+throughput y memoria pico por petición (tracemalloc, en una pasada aparte
+para no distorsionar la latencia).
+"""
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..collaborative import ItemSimilarityEngine
+from ..fusion import ScoreFusion
+from ..similarity_index import SongVectorIndex
+from .harness import latency_stats, peak_memory
+from .synthetic import synthetic_catalog, synthetic_events, synthetic_users, synthetic_vectors
+
+MEMORY_SAMPLE = 200
+
+
+def _build_row(name: str, build) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result, peak_mb = peak_memory(build)
+    return result, {"name": name, "build_s": time.perf_counter() - start, "peak_mb": peak_mb}
+
+
+def _cases(engine, index) -> Dict[str, Any]:
+    from ..recommendation_system import (
+        CollaborativeFilteringStrategy,
+        ContentBasedStrategy,
+        DiversityDecorator,
+        DiversityReranker,
+        FreshnessDecorator,
+        FreshnessReranker,
+        RecommendationPipeline,
+    )
+
+    collaborative = CollaborativeFilteringStrategy(engine)
+    content = ContentBasedStrategy(index)
+    deadlines = [5.0, 5.0]
+
+    def hybrid(method, rerankers=()):
+        return RecommendationPipeline(
+            f"hybrid_{method}", [collaborative, content], [0.6, 0.4], deadlines,
+            fusion=ScoreFusion(method=method), rerankers=rerankers,
+        ).run
+
+    return {
+        "collaborative": collaborative.recommend,
+        "content": content.recommend,
+        "hybrid weighted": hybrid("weighted"),
+        "hybrid rrf": hybrid("rrf"),
+        "collaborative + diversity": DiversityDecorator(collaborative).recommend,
+        "collaborative + freshness": FreshnessDecorator(collaborative).recommend,
+        "hybrid weighted + diversity + freshness": hybrid("weighted", [DiversityReranker(), FreshnessReranker()]),
+    }
+
+
+def run(operations: int = 1000, users: int = 10_000, songs: int = 100_000, **options) -> List[Dict[str, Any]]:
+    rows = []
+    catalog, row = _build_row(f"catálogo {songs} canciones", lambda: synthetic_catalog(songs))
+    rows.append(row)
+    events, row = _build_row(f"eventos {users} usuarios", lambda: synthetic_events(users, songs))
+    rows.append({**row, "events": len(events)})
+    engine, row = _build_row("fit ItemSimilarityEngine", lambda: ItemSimilarityEngine().fit(events, song_metadata=catalog))
+    rows.append(row)
+    index, row = _build_row("build SongVectorIndex", lambda: SongVectorIndex().build(
+        np.arange(songs), synthetic_vectors(songs), catalog
+    ))
+    rows.append(row)
+
+    rng = np.random.default_rng(1)
+    requests = [
+        (SimpleNamespace(id=int(user_id)), {"current_song": int(song_id)})
+        for user_id, song_id in zip(rng.choice(synthetic_users(users), size=operations),
+                                    rng.integers(0, songs, size=operations))
+    ]
+
+    for name, recommend in _cases(engine, index).items():
+        metrics = latency_stats(lambda request: recommend(*request), requests)
+        _, peak_mb = peak_memory(lambda: [recommend(*request) for request in requests[:MEMORY_SAMPLE]])
+        rows.append({"name": f"{name} {users}x{songs}", **metrics, "peak_mb": peak_mb})
+    return rows
@@ -0,0 +1,137 @@
+"""
+Benchmark de registros de recomendación: dicts ad hoc frente a Recommendation con __slots__
+
+Mide memoria (tracemalloc) de N registros y la latencia de un pipeline
+completo por petición: fusión de dos listas, diversidad, frescura y JSON.
+La variante "dict" reproduce el pipeline anterior basado en dicts.
+"""
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..fusion import ScoreFusion
+from ..records import Recommendation, encode_json
+
+CANDIDATES = 200
+
+
+def _dict_candidates(rng, offset: int) -> List[Dict[str, Any]]:
+    ids = rng.choice(5 * CANDIDATES, size=CANDIDATES, replace=False) + offset
+    scores = np.sort(rng.random(CANDIDATES))[::-1]
+    return [
+        {"song_id": int(song_id), "title": f"Song {song_id}", "artist": f"Artist {song_id % 50}", "score": float(score)}
+        for song_id, score in zip(ids, scores)
+    ]
+
+
+def _as_records(candidates: List[Dict[str, Any]]) -> List[Recommendation]:
+    return [Recommendation(c["song_id"], c["title"], c["artist"], c["score"]) for c in candidates]
+
+
+def _dict_fuse(lists, weights, limit: int = 10) -> List[Dict[str, Any]]:
+    # ScoreFusion.fuse tal como operaba sobre dicts
+    ids: Dict[Any, int] = {}
+    representatives, candidates, sources, scores = [], [], [], []
+    for source, recommendations in enumerate(lists):
+        for rec in recommendations:
+            key = rec.get("song_id")
+            if key is None:
+                key = (rec.get("title"), rec.get("artist"))
+            candidate = ids.get(key)
+            if candidate is None:
+                candidate = ids[key] = len(representatives)
+                representatives.append(rec)
+            candidates.append(candidate)
+            sources.append(source)
+            scores.append(rec.get("score", 0.0))
+    contributions = np.asarray(weights, dtype=np.float64)[sources] * np.asarray(scores, dtype=np.float64)
+    totals = np.bincount(candidates, weights=contributions, minlength=len(representatives))
+    top = np.argpartition(-totals, limit - 1)[:limit]
+    top = top[np.argsort(-totals[top], kind="stable")]
+    return [{**representatives[i], "score": float(totals[i])} for i in top]
+
+
+def _dict_pipeline(lists, weights) -> bytes:
+    # Fusión, diversidad y frescura tal como se hacían con dicts
+    ranked = _dict_fuse(lists, weights)
+
+    diversified, used_artists = [], set()
+    for rec in ranked:
+        if rec.get("artist") not in used_artists:
+            diversified.append(rec)
+            used_artists.add(rec.get("artist"))
+    for rec in diversified:
+        rec["release_date"] = f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+        rec["freshness_score"] = random.uniform(0.5, 1.0)
+    diversified.sort(key=lambda rec: rec["freshness_score"], reverse=True)
+    return json.dumps({"recommendations": diversified}).encode("utf-8")
+
+
+def _record_pipeline(fusion, lists, weights) -> bytes:
+    from ..recommendation_system import DiversityReranker, FreshnessReranker
+
+    ranked = fusion.fuse(lists, weights)
+    fresh = FreshnessReranker().rerank(DiversityReranker().rerank(ranked))
+    return encode_json({"recommendations": list(fresh)})
+
+
+def _retained_bytes(build) -> int:
+    tracemalloc.start()
+    try:
+        items = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del items
+    return current
+
+
+def _percentiles(func, operations: int) -> Dict[str, float]:
+    latencies = []
+    for _ in range(operations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    latencies = np.asarray(latencies) * 1000
+    return {"p50_ms": float(np.percentile(latencies, 50)), "p99_ms": float(np.percentile(latencies, 99))}
+
+
+def run(operations: int = 5000, **options) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(0)
+    n_records = 100_000
+
+    rows = [
+        {
+            "name": f"memoria {n_records} dicts",
+            "bytes_per_record": _retained_bytes(lambda: [
+                {"song_id": i, "title": f"Song {i}", "artist": f"Artist {i % 50}", "score": 0.5}
+                for i in range(n_records)
+            ]) / n_records,
+        },
+        {
+            "name": f"memoria {n_records} Recommendation",
+            "bytes_per_record": _retained_bytes(lambda: [
+                Recommendation(i, f"Song {i}", f"Artist {i % 50}", 0.5) for i in range(n_records)
+            ]) / n_records,
+        },
+    ]
+
+    lists = [_dict_candidates(rng, 0), _dict_candidates(rng, 2 * CANDIDATES)]
+    record_lists = [_as_records(candidates) for candidates in lists]
+    weights = [0.6, 0.4]
+    fusion = ScoreFusion()
+    repeat = max(1, operations // 5)
+
+    rows.append({
+        "name": f"pipeline dicts ({CANDIDATES}x2 candidatos)",
+        **_percentiles(lambda: _dict_pipeline(lists, weights), repeat),
+    })
+    rows.append({
+        "name": f"pipeline Recommendation ({CANDIDATES}x2 candidatos)",
+        **_percentiles(lambda: _record_pipeline(fusion, record_lists, weights), repeat),
+    })
+    return rows
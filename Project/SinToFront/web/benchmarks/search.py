@@ -0,0 +1,109 @@
+"""
+Benchmark de búsqueda de canciones: LIKE '%q%' (icontains) frente a FTS5
+
+Crea un catálogo sintético en una base SQLite temporal con el mismo esquema
+de búsqueda que la migración y simula una búsqueda mientras se escribe:
+cada prefijo de la consulta es una petición de la primera página. Los
+títulos combinan palabras reales con un vocabulario sintético de frecuencia
+tipo Zipf, para que los prefijos tengan una selectividad realista.
+"""
+import importlib
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..search import BM25, IDS_SQL, PROBE_SQL, RANK_LIMIT, fts_query
+from .harness import latency_stats
+
+WORDS = (
+    "amor corazón noche canción fuego luna sol mar cielo tiempo vida sueño "
+    "camino ciudad lluvia baile fiesta verano invierno mañana estrella río "
+    "ojos beso alma libertad silencio memoria tierra viento flor destino"
+).split()
+
+SYLLABLES = "ba be ca co da de la le lo ma me mi mo na no pa pe ra re ri sa se ta te to va vi".split()
+VOCABULARY = 20_000
+
+PAGE = 20
+
+# El índice se crea con el mismo SQL que la migración
+FTS_SCHEMA = importlib.import_module("..migrations.0004_song_fts", __package__).FTS_SCHEMA
+
+SCHEMA = [
+    "CREATE TABLE web_artist (id INTEGER PRIMARY KEY, name TEXT NOT NULL)",
+    "CREATE TABLE web_song (id INTEGER PRIMARY KEY, title TEXT NOT NULL, artist_id INTEGER NOT NULL)",
+]
+
+LIKE_SQL = (
+    "SELECT web_song.id FROM web_song JOIN web_artist ON web_artist.id = web_song.artist_id "
+    "WHERE web_song.title LIKE ? ESCAPE '\\' OR web_artist.name LIKE ? ESCAPE '\\' LIMIT ?"
+)
+
+
+def _vocabulary(rng) -> np.ndarray:
+    syllables = rng.choice(SYLLABLES, size=(VOCABULARY, 3))
+    invented = ["".join(row) for row in syllables.tolist()]
+    return np.asarray(WORDS + list(dict.fromkeys(invented)))
+
+
+def _titles(rng, count: int) -> List[str]:
+    words = _vocabulary(rng)
+    picks = (rng.zipf(1.2, size=(count, 4)) - 1) % len(words)
+    lengths = rng.integers(1, 5, size=count)
+    return [" ".join(words[row[:n]]).capitalize() for row, n in zip(picks, lengths)]
+
+
+def _typing_queries(rng, titles: List[str], count: int) -> List[str]:
+    """Prefijos crecientes de títulos existentes, sin tildes (como teclea el usuario)"""
+    plain = str.maketrans("áéíóúñ", "aeioun")
+    queries = []
+    while len(queries) < count:
+        words = titles[rng.integers(0, len(titles))].lower().translate(plain).split()[:2]
+        text = " ".join(words)
+        queries.extend(text[:end] for end in range(2, len(text) + 1) if not text[:end].endswith(" "))
+    return queries[:count]
+
+
+def run(operations: int = 1000, songs: int = 100_000, **options) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(0)
+    artists = max(1, songs // 20)
+    titles = _titles(rng, songs)
+    queries = _typing_queries(rng, titles, operations)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = sqlite3.connect(os.path.join(directory, "search.sqlite3"))
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.executemany("INSERT INTO web_artist VALUES (?, ?)",
+                       ((i, f"{WORDS[i % len(WORDS)].capitalize()} {i}") for i in range(artists)))
+        db.executemany("INSERT INTO web_song VALUES (?, ?, ?)",
+                       zip(range(songs), titles, rng.integers(0, artists, size=songs).tolist()))
+        db.commit()
+
+        start = time.perf_counter()
+        for statement in FTS_SCHEMA:
+            db.execute(statement)
+        db.commit()
+        build_seconds = time.perf_counter() - start
+
+        def like(text):
+            pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            return db.execute(LIKE_SQL, (pattern, pattern, PAGE)).fetchall()
+
+        probe_sql, ids_sql = PROBE_SQL.replace("%s", "?"), IDS_SQL.replace("%s", "?")
+
+        def fts(text):
+            query = fts_query(text)
+            ranked = db.execute(probe_sql, (query, RANK_LIMIT + 1)).fetchone()[0] <= RANK_LIMIT
+            return db.execute(ids_sql.format(order=BM25 if ranked else "rowid DESC"), (query, PAGE)).fetchall()
+
+        rows = [{"name": f"FTS5 índice {songs} canciones", "build_s": build_seconds}]
+        for name, search in (("icontains (LIKE)", like), ("FTS5 + bm25", fts)):
+            hits = np.mean([len(search(text)) for text in queries[:100]])
+            rows.append({"name": f"{name} {songs} canciones", **latency_stats(search, queries), "hits": float(hits)})
+        db.close()
+    return rows
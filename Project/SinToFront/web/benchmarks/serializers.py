@@ -0,0 +1,56 @@
+"""
+Benchmark de serializadores de caché: JSON, pickle por defecto y buffers fuera de banda
+"""
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..cache_serializers import JSONSerializer, NumpyBufferSerializer, PickleSerializer
+
+
+def _payloads() -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    return {
+        "gesto (8 clases)": {
+            "gesture_name": "Next",
+            "confidence": 0.91,
+            "probabilities": rng.random(8, dtype=np.float32),
+        },
+        "gesto (landmarks 21x2 + 4k probs)": {
+            "gesture_name": "Close",
+            "landmarks": rng.random((21, 2), dtype=np.float32),
+            "probabilities": rng.random(4096, dtype=np.float32),
+        },
+        "embedding 1M float32": {
+            "vector": rng.random(1_000_000, dtype=np.float32),
+        },
+    }
+
+
+def _time_per_call(func, arg, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(operations: int = 200, **options) -> List[Dict[str, Any]]:
+    serializers = [
+        ("json", JSONSerializer()),
+        ("pickle", PickleSerializer()),
+        ("numpy", NumpyBufferSerializer()),
+    ]
+    rows = []
+    for payload_name, payload in _payloads().items():
+        # Los payloads grandes se repiten menos para acotar la duración
+        repeat = max(1, operations // 100) if "1M" in payload_name else operations
+        for serializer_name, serializer in serializers:
+            data = serializer.dumps(payload)
+            rows.append({
+                "name": f"{payload_name} / {serializer_name}",
+                "bytes": len(data),
+                "dumps_us": _time_per_call(serializer.dumps, payload, repeat),
+                "loads_us": _time_per_call(serializer.loads, data, repeat),
+            })
+    return rows
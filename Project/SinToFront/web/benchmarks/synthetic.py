@@ -0,0 +1,44 @@
+"""
+Generadores de datos sintéticos para los benchmarks
+
+Todos son deterministas dada la semilla, vectorizados y escalan de miles a
+millones de filas: usuarios, catálogo (canciones con artista), eventos de
+escucha con popularidad tipo Zipf y vectores de contenido agrupados.
+"""
+from typing import Any, Dict
+
+import numpy as np
+
+
+def synthetic_users(users: int) -> np.ndarray:
+    """Ids de usuario 0..users-1"""
+    return np.arange(users, dtype=np.int64)
+
+
+def synthetic_catalog(songs: int, artists: int = 0, seed: int = 0) -> Dict[int, Dict[str, Any]]:
+    """Metadatos {song_id: {title, artist}}; el número de canciones por artista sigue una ley de potencias"""
+    rng = np.random.default_rng(seed)
+    artists = artists or max(1, songs // 20)
+    artist_ids = (rng.zipf(1.5, size=songs) - 1) % artists
+    return {
+        song_id: {"title": f"Song {song_id}", "artist": f"Artist {artist_id}"}
+        for song_id, artist_id in enumerate(artist_ids.tolist())
+    }
+
+
+def synthetic_events(users: int, songs: int, events_per_user: int = 20, seed: int = 0) -> np.ndarray:
+    """Eventos (user_id, song_id, plays) con popularidad de canciones tipo Zipf"""
+    rng = np.random.default_rng(seed)
+    counts = rng.geometric(1 / events_per_user, size=users)
+    user_ids = np.repeat(np.arange(users), counts)
+    song_ids = (rng.zipf(1.3, size=len(user_ids)) - 1) % songs
+    plays = rng.integers(1, 5, size=len(user_ids))
+    return np.column_stack([user_ids, song_ids, plays])
+
+
+def synthetic_vectors(songs: int, dim: int = 64, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Vectores agrupados (mezcla de gaussianas) como proxy de features de audio"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=songs)
+    return centers[labels] + 0.6 * rng.standard_normal((songs, dim)).astype(np.float32)
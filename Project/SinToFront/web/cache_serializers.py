@@ -0,0 +1,94 @@
+"""
+Serializadores para backends de caché compartidos
+"""
+import json
+import pickle
+import struct
+from typing import Any
+
+import numpy as np
+
+from .interfaces import CacheSerializerInterface
+
+
+class PickleSerializer(CacheSerializerInterface):
+    """Pickle genérico: los arrays viajan dentro del stream"""
+    
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class JSONSerializer(CacheSerializerInterface):
+    """JSON: portable pero convierte cada elemento de un array en un objeto Python"""
+    
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), default=self._default).encode("utf-8")
+    
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+    
+    @staticmethod
+    def _default(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+class NumpyBufferSerializer(CacheSerializerInterface):
+    """
+    Pickle protocolo 5 con los buffers de NumPy fuera de banda
+    
+    Formato: cabecera (magic, número de buffers, longitudes) + stream pickle +
+    buffers crudos alineados a 64 bytes respecto al inicio del payload. Al cargar, los arrays se reconstruyen
+    como vistas de solo lectura sobre los bytes recibidos, sin copiar datos
+    ni crear un objeto Python por elemento.
+    """
+    
+    MAGIC = b"NPB1"
+    ALIGNMENT = 64
+    
+    def dumps(self, value: Any) -> bytes:
+        buffers = []
+        body = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        
+        lengths = [len(body)] + [raw.nbytes for raw in raws]
+        header = self.MAGIC + struct.pack(f"<I{len(lengths)}Q", len(raws), *lengths)
+        
+        parts = [header]
+        offset = len(header)
+        for chunk in [body] + raws:
+            padding = -offset % self.ALIGNMENT
+            parts.append(b"\0" * padding)
+            parts.append(chunk)
+            offset += padding + len(chunk)
+        return b"".join(parts)
+    
+    def loads(self, data: bytes) -> Any:
+        if data[:4] != self.MAGIC:
+            # Valores escritos con PickleSerializer
+            return pickle.loads(data)
+        
+        view = memoryview(data)
+        (count,) = struct.unpack_from("<I", view, 4)
+        lengths = struct.unpack_from(f"<{count + 1}Q", view, 8)
+        
+        offset = 8 + 8 * (count + 1)
+        chunks = []
+        for length in lengths:
+            offset += -offset % self.ALIGNMENT
+            chunks.append(view[offset:offset + length])
+            offset += length
+        return pickle.loads(chunks[0], buffers=chunks[1:])
+
+
+SERIALIZERS = {
+    "pickle": PickleSerializer,
+    "json": JSONSerializer,
+    "numpy": NumpyBufferSerializer,
+}
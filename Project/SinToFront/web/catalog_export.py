@@ -0,0 +1,128 @@
+"""
+Exportación en streaming de tareas y del catálogo (CSV o NDJSON, opcionalmente gzip)
+
+Las filas salen de la base con values_list (tuplas, sin instanciar modelos)
+y QuerySet.iterator(chunk_size), y se escriben en bloques de unos
+CHUNK_BYTES: la memoria depende del tamaño de bloque y no del número de
+filas. Con gzip, cada bloque pasa por un compresor incremental.
+"""
+import csv
+import datetime
+import io
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .models import Song, Task
+from .records import encode_json
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Filas por fetchmany del cursor y bytes por bloque de la respuesta
+ITERATOR_CHUNK_SIZE = 2000
+CHUNK_BYTES = 64 * 1024
+
+# Columna de salida -> búsqueda en values_list
+EXPORTS: Dict[str, Tuple[Callable[[], Any], Sequence[Tuple[str, str]]]] = {
+    "tasks": (
+        lambda: Task.objects.order_by("id"),
+        (
+            ("id", "id"),
+            ("title", "title"),
+            ("description", "description"),
+            ("status", "status"),
+            ("created_at", "created_at"),
+            ("updated_at", "updated_at"),
+        ),
+    ),
+    "songs": (
+        lambda: Song.objects.order_by("id"),
+        (
+            ("id", "id"),
+            ("title", "title"),
+            ("artist", "artist__name"),
+            ("genre", "genre"),
+            ("duration_seconds", "duration_seconds"),
+            ("release_date", "release_date"),
+            ("created_at", "created_at"),
+        ),
+    ),
+}
+
+
+def export_queryset(kind: str, using: Optional[str] = None):
+    """(columnas, queryset de tuplas) de un tipo de exportación"""
+    if kind not in EXPORTS:
+        raise ValueError(f"Exportación no soportada: {kind}")
+    queryset, columns = EXPORTS[kind]
+    queryset = queryset()
+    if using is not None:
+        queryset = queryset.using(using)
+    return [name for name, _ in columns], queryset.values_list(*(lookup for _, lookup in columns))
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns: Sequence[str], rows: Iterable[Tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_chunks(columns: Sequence[str], rows: Iterable[Tuple]) -> Iterator[bytes]:
+    lines, size = [], 0
+    for row in rows:
+        line = encode_json(dict(zip(columns, map(_cell, row))))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_BYTES:
+            yield b"\n".join(lines) + b"\n"
+            lines, size = [], 0
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime un flujo de bloques en formato gzip sin acumularlo"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+RENDERERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+}
+
+
+def export_stream(kind: str, fmt: str, compress: bool = False, using: Optional[str] = None,
+                  limit: Optional[int] = None) -> Iterator[bytes]:
+    """Bloques de bytes de la exportación completa (o de sus primeras `limit` filas)"""
+    if fmt not in RENDERERS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    columns, queryset = export_queryset(kind, using)
+    if limit is not None:
+        queryset = queryset[:limit]
+    chunks = RENDERERS[fmt](columns, queryset.iterator(chunk_size=ITERATOR_CHUNK_SIZE))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(kind: str, fmt: str, compress: bool = False) -> str:
+    return f"{kind}.{fmt}" + (".gz" if compress else "")
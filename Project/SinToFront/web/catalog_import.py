@@ -0,0 +1,200 @@
+"""
+Carga masiva del catálogo (ver manage.py import_catalog)
+
+Los ficheros se leen fila a fila (CSV con cabecera o JSON Lines, opcionalmente
+comprimidos con gzip) y se insertan en lotes con bulk_create, cada lote en su
+propia transacción: la memoria depende del tamaño de lote y no del fichero,
+y un fallo a mitad conserva los lotes ya confirmados. Lo que bulk_create no
+mantiene (contadores de las playlists del lote, recomendaciones precalculadas
+de los usuarios con escuchas nuevas) se actualiza en la transacción del lote.
+"""
+import csv
+import gzip
+import io
+import json
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.db import IntegrityError, models, reset_queries, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import (
+    Artist, ListeningEvent, Playlist, PlaylistEntry, PrecomputedRecommendation, Song, UserMusicStats,
+)
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError(f"No se reconoce el formato de {path}; indica --format")
+
+
+def read_rows(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Filas del fichero como dicts, sin cargarlo entero en memoria"""
+    fmt = fmt or detect_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    raw = gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+    with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _required(row: Dict[str, Any], name: str) -> Any:
+    value = row.get(name)
+    if value is None or value == "":
+        raise ValueError(f"Falta el campo '{name}'")
+    return value
+
+
+def _int(value: Any, default: Optional[int] = None) -> Optional[int]:
+    return default if value is None or value == "" else int(value)
+
+
+def _date(value: Any):
+    return parse_date(value) if value else None
+
+
+def _datetime(value: Any):
+    if not value:
+        return timezone.now()
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(f"Fecha no válida: {value}")
+    if settings.USE_TZ and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def build_artists(rows: List[Dict[str, Any]]) -> List[Artist]:
+    return [Artist(id=_int(row.get("id")), name=_required(row, "name")) for row in rows]
+
+
+def build_songs(rows: List[Dict[str, Any]]) -> List[Song]:
+    artist_ids = Artist.objects.ids_for(_required(row, "artist") for row in rows)
+    return [
+        Song(
+            id=_int(row.get("id")),
+            title=_required(row, "title"),
+            artist_id=artist_ids[row["artist"]],
+            genre=row.get("genre") or "",
+            duration_seconds=_int(row.get("duration_seconds")),
+            release_date=_date(row.get("release_date")),
+        )
+        for row in rows
+    ]
+
+
+def build_playlists(rows: List[Dict[str, Any]]) -> List[Playlist]:
+    return [
+        Playlist(
+            id=_int(row.get("id")),
+            user_id=_int(_required(row, "user_id")),
+            name=_required(row, "name"),
+            description=row.get("description") or "",
+        )
+        for row in rows
+    ]
+
+
+def build_playlist_entries(rows: List[Dict[str, Any]]) -> List[PlaylistEntry]:
+    return [
+        PlaylistEntry(
+            playlist_id=_int(_required(row, "playlist_id")),
+            song_id=_int(_required(row, "song_id")),
+            position=_int(_required(row, "position")),
+        )
+        for row in rows
+    ]
+
+
+def build_events(rows: List[Dict[str, Any]]) -> List[ListeningEvent]:
+    return [
+        ListeningEvent(
+            user_id=_int(_required(row, "user_id")),
+            song_id=_int(_required(row, "song_id")),
+            plays=_int(row.get("plays"), 1),
+            listened_at=_datetime(row.get("listened_at")),
+        )
+        for row in rows
+    ]
+
+
+BUILDERS: Dict[str, Tuple[Type[models.Model], Callable[[List[Dict[str, Any]]], List]]] = {
+    "artists": (Artist, build_artists),
+    "songs": (Song, build_songs),
+    "playlists": (Playlist, build_playlists),
+    "playlist_entries": (PlaylistEntry, build_playlist_entries),
+    "events": (ListeningEvent, build_events),
+}
+
+
+def invalidate_precomputed(events: List[ListeningEvent]):
+    """Las recomendaciones precalculadas de los usuarios con escuchas nuevas dejan de ser válidas"""
+    PrecomputedRecommendation.objects.invalidate_users({event.user_id for event in events})
+
+
+def refresh_counters(kind: str, objects: List):
+    """
+    Recalcula los contadores que bulk_create no mantiene (no emite señales)
+
+    Solo las playlists del lote; las estadísticas de sus dueños se borran y
+    se reconstruyen al leerlas.
+    """
+    if kind == "playlist_entries":
+        playlists = Playlist.objects.filter(id__in={entry.playlist_id for entry in objects})
+        playlists.rebuild_counters()
+        user_ids = set(playlists.values_list("user_id", flat=True))
+    else:
+        user_ids = {playlist.user_id for playlist in objects}
+    UserMusicStats.objects.filter(user_id__in=user_ids).delete()
+
+
+# Trabajo extra por lote, en la misma transacción que su inserción
+AFTER_BATCH: Dict[str, Callable[[List], None]] = {
+    "playlists": partial(refresh_counters, "playlists"),
+    "playlist_entries": partial(refresh_counters, "playlist_entries"),
+    "events": invalidate_precomputed,
+}
+
+
+def import_rows(kind: str, rows: Iterable[Dict[str, Any]], batch_size: int = 2000,
+                ignore_conflicts: bool = False) -> Iterator[int]:
+    """Inserta las filas por lotes; devuelve el número de filas de cada lote confirmado"""
+    if kind not in BUILDERS:
+        raise ValueError(f"Tipo de datos no soportado: {kind}")
+    if batch_size < 1:
+        raise ValueError("batch_size debe ser positivo")
+    model, build = BUILDERS[kind]
+    first_row = 1
+    for batch in batched(rows, batch_size):
+        try:
+            with transaction.atomic():
+                objects = model.objects.bulk_create(build(batch), ignore_conflicts=ignore_conflicts)
+                if kind in AFTER_BATCH:
+                    AFTER_BATCH[kind](objects)
+        except (IntegrityError, KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Lote desde la fila {first_row}: {exc}") from exc
+        # Con DEBUG el log de consultas guardaría cada INSERT masivo
+        reset_queries()
+        first_row += len(batch)
+        yield len(batch)
+
@@ -0,0 +1,728 @@
+"""
+Motor de filtrado colaborativo item-item sobre matrices dispersas
+
+La matriz usuario×canción se guarda en formato CSR con arrays de NumPy
+(indptr/indices/data). Las similitudes coseno item-item se precalculan por
+bloques y solo se conservan los `top_k` vecinos de cada canción, de modo que
+recomendar a un usuario cuesta O(canciones escuchadas × top_k). Los eventos
+nuevos se aplican de forma incremental sin reentrenar el modelo.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .ranking import iter_ranked
+
+
+def _expand_ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatena los rangos [start, start + length) sin bucles de Python"""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + np.arange(total) - offsets
+
+
+def _top_k_per_group(groups: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """Posiciones de los k mayores scores de cada grupo, ordenadas por grupo y score desc"""
+    order = np.lexsort((-scores, groups))
+    sorted_groups = groups[order]
+    group_start = np.searchsorted(sorted_groups, sorted_groups, side="left")
+    rank = np.arange(len(order)) - group_start
+    return order[rank < k]
+
+
+class CSRMatrix:
+    """Matriz dispersa CSR mínima (indptr, indices, data)"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray,
+                 shape: Tuple[int, int]):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @classmethod
+    def from_coo(cls, rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                 shape: Tuple[int, int]) -> "CSRMatrix":
+        """Construye la matriz sumando las entradas duplicadas"""
+        keys = rows.astype(np.int64) * shape[1] + cols
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        data = np.bincount(inverse, weights=values).astype(np.float32)
+        unique_rows = unique_keys // shape[1]
+        indices = (unique_keys % shape[1]).astype(np.int32)
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(unique_rows, minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, indices, data, shape)
+
+    def row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def row_lengths(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def transpose(self) -> "CSRMatrix":
+        rows = np.repeat(np.arange(self.shape[0]), self.row_lengths())
+        return CSRMatrix.from_coo(self.indices, rows, self.data, (self.shape[1], self.shape[0]))
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+
+class ItemSimilarityEngine:
+    """
+    Modelo item-item: co-ocurrencias, similitud coseno y top-k vecinos
+
+    Además del entrenamiento completo (`fit`), acepta lotes de eventos con
+    `partial_fit`: los pesos nuevos quedan en un delta por usuario/canción,
+    las normas y la popularidad se actualizan al momento y las listas de
+    vecinos afectadas se marcan como sucias y se recalculan de forma perezosa
+    la primera vez que una recomendación las necesita. `compact` fusiona el
+    delta en las matrices CSR y recalcula exactamente todas las filas que
+    co-ocurren con canciones modificadas: construye las matrices nuevas
+    fuera del lock (las consultas siguen sirviéndose) y solo las sustituye
+    bajo él, volviendo a aplicar los eventos llegados mientras tanto.
+
+    Hasta la compactación, los scores perezosos no coinciden exactamente con
+    los de un reentrenamiento: una fila refrescada parte del top-k base, así
+    que una canción que estaba fuera de él solo suma la parte del delta. La
+    diferencia está acotada: `partial_fit` lanza la compactación en un hilo
+    en segundo plano al acumular `compaction_threshold` eventos o cuando han
+    pasado `compaction_interval` segundos desde la última.
+    """
+
+    def __init__(self, top_k: int = 50, block_pairs: int = 5_000_000,
+                 compaction_threshold: int = 50_000, compaction_interval: float = 300.0):
+        self.top_k = top_k
+        self.block_pairs = block_pairs
+        self.compaction_threshold = compaction_threshold
+        self.compaction_interval = compaction_interval
+        self.user_ids = np.zeros(0, dtype=np.int64)
+        self.song_ids = np.zeros(0, dtype=np.int64)
+        self.user_items: Optional[CSRMatrix] = None
+        self.item_users: Optional[CSRMatrix] = None
+        self.neighbors: Optional[CSRMatrix] = None
+        self.popularity = np.zeros(0, dtype=np.float64)
+        self._base_norm_sq = np.zeros(0, dtype=np.float64)
+        self.song_metadata: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        # Una compactación a la vez; _replay guarda los eventos que llegan durante ella
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._replay: Optional[List[Tuple[int, int, float]]] = None
+        self._generation = 0
+        self._reset_lookups()
+        self._reset_delta()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.neighbors is not None
+
+    @property
+    def pending_events(self) -> int:
+        return sum(len(items) for items in self._pending_by_user.values())
+
+    def fit(self, events: Iterable[Tuple[int, int, float]],
+            song_metadata: Optional[Dict[int, Dict[str, Any]]] = None) -> "ItemSimilarityEngine":
+        """Entrena el modelo a partir de eventos (user_id, song_id, peso)"""
+        events = np.asarray(list(events), dtype=np.float64).reshape(-1, 3)
+        user_ids, user_index = np.unique(events[:, 0].astype(np.int64), return_inverse=True)
+        song_ids, song_index = np.unique(events[:, 1].astype(np.int64), return_inverse=True)
+        shape = (len(user_ids), len(song_ids))
+
+        with self._lock:
+            self.user_ids, self.song_ids = user_ids, song_ids
+            self.user_items = CSRMatrix.from_coo(user_index, song_index, events[:, 2], shape)
+            self.item_users = self.user_items.transpose()
+            self._norm_sq, self.popularity = self._statistics(self.user_items)
+            self.neighbors = self._build_neighbor_matrix(
+                *self._neighbors_for(np.arange(shape[1]), self.user_items, self.item_users, self._norm_sq),
+                shape[1],
+            )
+            self._base_norm_sq = self._norm_sq.copy()
+            self._reset_lookups()
+            self._reset_delta()
+            # Una compactación en curso parte del modelo anterior: se descarta
+            self._generation += 1
+            self._replay = None
+            if song_metadata is not None:
+                self.song_metadata = song_metadata
+        return self
+
+    # --- Persistencia ---
+
+    FILES = (
+        "user_ids", "song_ids", "norm_sq",
+        "user_items_indptr", "user_items_indices", "user_items_data",
+        "item_users_indptr", "item_users_indices", "item_users_data",
+        "neighbors_indptr", "neighbors_indices", "neighbors_data",
+    )
+
+    def save(self, directory: str):
+        """Guarda el modelo base como archivos .npy (recargables con mmap); el delta pendiente no se incluye"""
+        with self._lock:
+            if not self.is_fitted:
+                raise ValueError("El motor no está entrenado")
+            n_users, n_items = self.user_items.shape
+            arrays = {
+                "user_ids": self.user_ids[:n_users],
+                "song_ids": self.song_ids[:n_items],
+                "norm_sq": self._base_norm_sq,
+            }
+            for name in ("user_items", "item_users", "neighbors"):
+                matrix = getattr(self, name)
+                arrays.update({
+                    f"{name}_indptr": matrix.indptr,
+                    f"{name}_indices": matrix.indices,
+                    f"{name}_data": matrix.data,
+                })
+            config = {
+                "top_k": self.top_k,
+                "block_pairs": self.block_pairs,
+                "compaction_threshold": self.compaction_threshold,
+                "compaction_interval": self.compaction_interval,
+                "song_metadata": {str(k): v for k, v in self.song_metadata.items()},
+            }
+        os.makedirs(directory, exist_ok=True)
+        for name in self.FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), arrays[name])
+        with open(os.path.join(directory, "model.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ItemSimilarityEngine":
+        """Carga un modelo guardado; con mmap las matrices no se copian a memoria"""
+        with open(os.path.join(directory, "model.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in cls.FILES
+        }
+        engine = cls(top_k=config["top_k"], block_pairs=config["block_pairs"],
+                     compaction_threshold=config["compaction_threshold"],
+                     compaction_interval=config["compaction_interval"])
+        engine.user_ids, engine.song_ids = arrays["user_ids"], arrays["song_ids"]
+        shape = (len(engine.user_ids), len(engine.song_ids))
+        for name, matrix_shape in (("user_items", shape), ("item_users", shape[::-1]),
+                                   ("neighbors", (shape[1], shape[1]))):
+            setattr(engine, name, CSRMatrix(
+                arrays[f"{name}_indptr"], arrays[f"{name}_indices"], arrays[f"{name}_data"], matrix_shape
+            ))
+        # partial_fit actualiza normas y popularidad en sitio: copias en memoria
+        engine._base_norm_sq = np.array(arrays["norm_sq"])
+        engine._norm_sq = engine._base_norm_sq.copy()
+        engine.popularity = engine._statistics(engine.user_items)[1]
+        engine.song_metadata = {int(k): v for k, v in config["song_metadata"].items()}
+        engine._reset_lookups()
+        engine._reset_delta()
+        return engine
+
+    # --- Actualización incremental ---
+
+    def partial_fit(self, events: Iterable[Tuple[int, int, float]]) -> List[int]:
+        """Aplica un lote de eventos sin reentrenar; devuelve los user_id afectados"""
+        events = list(events)
+        with self._lock:
+            if not self.is_fitted:
+                self.fit([])
+            affected_users = self._apply(events)
+            if self._replay is not None:
+                self._replay.extend(events)
+            if (self.pending_events >= self.compaction_threshold
+                    or time.monotonic() - self._last_compaction >= self.compaction_interval):
+                self._schedule_compaction()
+        return sorted(affected_users)
+
+    def _apply(self, events: Iterable[Tuple[int, int, float]]) -> set:
+        affected_users = set()
+        with self._lock:
+            for user_id, song_id, weight in events:
+                u = self._user_position(int(user_id), create=True)
+                i = self._song_position(int(song_id), create=True)
+                old = self._weight(u, i)
+                if u not in self._pending_by_user:
+                    self._pending_by_user[u] = {}
+                    # El usuario pasa a tener delta: corrige todas las filas de su historial
+                    for j in self._base_row(u)[0].tolist():
+                        self._pending_by_item.setdefault(j, set()).add(u)
+                self._pending_by_user[u][i] = self._pending_by_user[u].get(i, 0.0) + weight
+                self._pending_by_item.setdefault(i, set()).add(u)
+                self._touched.add(i)
+                self._norm_sq[i] += (old + weight) ** 2 - old ** 2
+                self.popularity[i] += weight
+                # Cambian los pares (i, j) de todas las canciones del usuario
+                self._dirty.update(self._user_row(u)[0].tolist())
+                affected_users.add(int(user_id))
+        return affected_users
+
+    def _schedule_compaction(self):
+        """Lanza compact en segundo plano si no hay ya una en curso (llamar con el lock)"""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(
+            target=self.compact, name="collaborative-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+    def wait_for_compaction(self, timeout: Optional[float] = None):
+        """Espera a la compactación en segundo plano, si hay una"""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def compact(self):
+        """Fusiona el delta en las matrices CSR y sincroniza vecinos, normas y popularidad"""
+        with self._compaction_lock:
+            # Foto del modelo bajo el lock; los arrays y matrices no se modifican en sitio
+            with self._lock:
+                if not self._pending_by_user:
+                    self._last_compaction = time.monotonic()
+                    return
+                generation = self._generation
+                user_ids, song_ids = self.user_ids, self.song_ids
+                user_items, neighbors = self.user_items, self.neighbors
+                touched = np.fromiter(self._touched, dtype=np.int64)
+                pending = [(u, i, w) for u, items in self._pending_by_user.items() for i, w in items.items()]
+                self._replay = []
+
+            try:
+                built = self._compacted(user_items, neighbors, pending, touched, len(user_ids), len(song_ids))
+            except BaseException:
+                with self._lock:
+                    self._replay = None
+                raise
+
+            with self._lock:
+                replay, self._replay = self._replay, None
+                if generation != self._generation:
+                    return
+                self.user_ids, self.song_ids = user_ids, song_ids
+                self.user_items, self.item_users, self._norm_sq, self.popularity, self.neighbors = built
+                self._base_norm_sq = self._norm_sq.copy()
+                self._reset_lookups()
+                self._reset_delta()
+                # Eventos llegados durante la construcción: vuelven a ser el delta
+                self._apply(replay)
+
+    def _compacted(self, user_items: CSRMatrix, neighbors: CSRMatrix, pending: List[Tuple[int, int, float]],
+                   touched: np.ndarray, n_users: int, n_items: int):
+        """(user_items, item_users, norm_sq, popularity, neighbors) con el delta fusionado"""
+        base_rows = np.repeat(np.arange(user_items.shape[0]), user_items.row_lengths())
+        pending = np.asarray(pending, dtype=np.float64).reshape(-1, 3)
+        user_items = CSRMatrix.from_coo(
+            np.concatenate([base_rows, pending[:, 0].astype(np.int64)]),
+            np.concatenate([user_items.indices, pending[:, 1].astype(np.int64)]),
+            np.concatenate([user_items.data, pending[:, 2]]),
+            (n_users, n_items),
+        )
+        item_users = user_items.transpose()
+        norm_sq, popularity = self._statistics(user_items)
+
+        # Filas que pueden cambiar: canciones que co-ocurren con alguna modificada
+        users = item_users.indices[_expand_ranges(item_users.indptr[touched], item_users.row_lengths()[touched])]
+        users = np.unique(users)
+        affected = np.unique(np.concatenate([touched, user_items.indices[_expand_ranges(
+            user_items.indptr[users], user_items.row_lengths()[users]
+        )]]))
+
+        old_rows = np.repeat(np.arange(neighbors.shape[0]), neighbors.row_lengths())
+        keep = ~np.isin(old_rows, affected)
+        rows, cols, sims = self._neighbors_for(affected, user_items, item_users, norm_sq)
+        neighbors = self._build_neighbor_matrix(
+            np.concatenate([old_rows[keep], rows]),
+            np.concatenate([neighbors.indices[keep], cols]),
+            np.concatenate([neighbors.data[keep], sims]),
+            n_items,
+        )
+        return user_items, item_users, norm_sq, popularity, neighbors
+
+    def _reset_lookups(self):
+        self._user_order = np.argsort(self.user_ids, kind="stable")
+        self._song_order = np.argsort(self.song_ids, kind="stable")
+        self._new_users: Dict[int, int] = {}
+        self._new_songs: Dict[int, int] = {}
+
+    def _reset_delta(self):
+        self._pending_by_user: Dict[int, Dict[int, float]] = {}
+        self._pending_by_item: Dict[int, set] = {}
+        self._touched: set = set()
+        self._dirty: set = set()
+        self._refreshed: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._last_compaction = time.monotonic()
+
+    @staticmethod
+    def _statistics(user_items: CSRMatrix) -> Tuple[np.ndarray, np.ndarray]:
+        """(normas al cuadrado, popularidad) de cada canción"""
+        n_items = user_items.shape[1]
+        norm_sq = np.bincount(user_items.indices, weights=user_items.data.astype(np.float64) ** 2, minlength=n_items)
+        popularity = np.bincount(user_items.indices, weights=user_items.data, minlength=n_items)
+        return norm_sq, popularity
+
+    @staticmethod
+    def _find(ids: np.ndarray, order: np.ndarray, new: Dict[int, int], value: int) -> Optional[int]:
+        # Los ids añadidos desde la última compactación no están en `order`
+        position = np.searchsorted(ids[:len(order)], value, sorter=order)
+        if position < len(order) and ids[order[position]] == value:
+            return int(order[position])
+        return new.get(value)
+
+    def _user_position(self, user_id: int, create: bool = False) -> Optional[int]:
+        position = self._find(self.user_ids, self._user_order, self._new_users, user_id)
+        if position is None and create:
+            position = self._new_users[user_id] = len(self.user_ids)
+            self.user_ids = np.append(self.user_ids, user_id)
+        return position
+
+    def _song_position(self, song_id: int, create: bool = False) -> Optional[int]:
+        position = self._find(self.song_ids, self._song_order, self._new_songs, song_id)
+        if position is None and create:
+            position = self._new_songs[song_id] = len(self.song_ids)
+            self.song_ids = np.append(self.song_ids, song_id)
+            self._norm_sq = np.append(self._norm_sq, 0.0)
+            self.popularity = np.append(self.popularity, 0.0)
+        return position
+
+    def _base_row(self, u: int) -> Tuple[np.ndarray, np.ndarray]:
+        if u < self.user_items.shape[0]:
+            return self.user_items.row(u)
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+    def _user_row(self, u: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Fila efectiva del usuario: base + delta pendiente"""
+        items, weights = self._base_row(u)
+        pending = self._pending_by_user.get(u)
+        if not pending:
+            return items, weights.astype(np.float64)
+        merged_items = np.concatenate([items, np.fromiter(pending.keys(), dtype=np.int64)])
+        merged_weights = np.concatenate([weights, np.fromiter(pending.values(), dtype=np.float64)])
+        unique_items, inverse = np.unique(merged_items, return_inverse=True)
+        return unique_items, np.bincount(inverse, weights=merged_weights)
+
+    def _weight(self, u: int, i: int) -> float:
+        items, weights = self._base_row(u)
+        position = np.searchsorted(items, i)
+        base = float(weights[position]) if position < len(items) and items[position] == i else 0.0
+        return base + self._pending_by_user.get(u, {}).get(i, 0.0)
+
+    def _refresh(self, i: int):
+        """
+        Recalcula la fila de vecinos de i con el delta pendiente
+
+        Parte de la fila base (co-ocurrencias reconstruidas desde las
+        similitudes y normas base) y suma la corrección r_ui·r_u − b_ui·b_u de
+        los usuarios con delta. Las canciones fuera del top-k base solo
+        cuentan su parte del delta hasta la siguiente compactación.
+        """
+        cols, co = [], []
+        if i < self.neighbors.shape[0]:
+            base_neighbors, base_sims = self.neighbors.row(i)
+            cols.append(base_neighbors.astype(np.int64))
+            co.append(base_sims * np.sqrt(self._base_norm_sq[i] * self._base_norm_sq[base_neighbors]))
+        for u in self._pending_by_item.get(i, ()):
+            full_items, full_weights = self._user_row(u)
+            base_items, base_weights = self._base_row(u)
+            full_ui = self._lookup(full_items, full_weights, i)
+            base_ui = self._lookup(base_items, base_weights, i)
+            if full_ui:
+                cols.append(full_items)
+                co.append(full_ui * full_weights)
+            if base_ui:
+                cols.append(base_items.astype(np.int64))
+                co.append(-base_ui * base_weights.astype(np.float64))
+
+        neighbors = np.zeros(0, dtype=np.int32)
+        sims = np.zeros(0, dtype=np.float32)
+        if cols:
+            unique_cols, inverse = np.unique(np.concatenate(cols), return_inverse=True)
+            totals = np.bincount(inverse, weights=np.concatenate(co))
+            valid = (unique_cols != i) & (totals > 1e-9)
+            unique_cols, totals = unique_cols[valid], totals[valid]
+            scores = totals / np.sqrt(self._norm_sq[i] * self._norm_sq[unique_cols])
+            top = np.argsort(-scores, kind="stable")[:self.top_k]
+            neighbors = unique_cols[top].astype(np.int32)
+            sims = scores[top].astype(np.float32)
+        self._refreshed[i] = (neighbors, sims)
+        self._dirty.discard(i)
+
+    @staticmethod
+    def _lookup(items: np.ndarray, weights: np.ndarray, i: int) -> float:
+        position = np.searchsorted(items, i)
+        return float(weights[position]) if position < len(items) and items[position] == i else 0.0
+
+    def _neighbor_row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        if i in self._dirty:
+            self._refresh(i)
+        if i in self._refreshed:
+            return self._refreshed[i]
+        if i < self.neighbors.shape[0]:
+            return self.neighbors.row(i)
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+    # --- Cálculo de similitudes ---
+
+    def _neighbors_for(self, items: np.ndarray, user_items: CSRMatrix, item_users: CSRMatrix,
+                       norm_sq: np.ndarray):
+        """Top-k vecinos de `items` sobre las matrices dadas, en bloques de pares acotados"""
+        user_degree = user_items.row_lengths()
+        lengths = item_users.row_lengths()[items]
+        degrees = user_degree[item_users.indices[_expand_ranges(item_users.indptr[items], lengths)]]
+        # Pares (i, j) que genera cada item: suma de los grados de sus usuarios
+        pair_counts = np.bincount(np.repeat(np.arange(len(items)), lengths), weights=degrees,
+                                  minlength=len(items))
+        cumulative = np.cumsum(pair_counts)
+
+        rows, cols, sims = [], [], []
+        start = 0
+        while start < len(items):
+            done = cumulative[start - 1] if start else 0
+            end = int(np.searchsorted(cumulative, done + self.block_pairs, side="right"))
+            end = max(end, start + 1)
+            block_rows, block_cols, co_occurrence = self._cooccurrence(items[start:end], user_items, item_users)
+            block_sims = co_occurrence / np.sqrt(norm_sq[block_rows] * norm_sq[block_cols])
+            top = _top_k_per_group(block_rows, block_sims, self.top_k)
+            rows.append(block_rows[top])
+            cols.append(block_cols[top])
+            sims.append(block_sims[top])
+            start = end
+
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(sims)
+
+    @staticmethod
+    def _cooccurrence(items: np.ndarray, user_items: CSRMatrix, item_users: CSRMatrix):
+        """Pares (i, j, Σ_u w_ui·w_uj) con i en `items`, j ≠ i"""
+        lengths = item_users.row_lengths()[items]
+        entry_pos = _expand_ranges(item_users.indptr[items], lengths)
+        entry_item = np.repeat(items, lengths)
+        entry_user = item_users.indices[entry_pos]
+        entry_weight = item_users.data[entry_pos].astype(np.float64)
+
+        # Expandir cada (item, usuario) a todas las canciones del usuario
+        user_lengths = user_items.row_lengths()[entry_user]
+        pair_pos = _expand_ranges(user_items.indptr[entry_user], user_lengths)
+        pair_i = np.repeat(entry_item, user_lengths)
+        pair_j = user_items.indices[pair_pos]
+        pair_w = np.repeat(entry_weight, user_lengths) * user_items.data[pair_pos]
+
+        n_items = user_items.shape[1]
+        keep = pair_i != pair_j
+        keys = pair_i[keep] * n_items + pair_j[keep]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        return unique_keys // n_items, unique_keys % n_items, np.bincount(inverse, weights=pair_w[keep])
+
+    @staticmethod
+    def _build_neighbor_matrix(rows, cols, sims, n_items: int) -> CSRMatrix:
+        order = np.lexsort((-sims, rows))
+        indptr = np.zeros(n_items + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows.astype(np.int64), minlength=n_items), out=indptr[1:])
+        return CSRMatrix(indptr, cols[order].astype(np.int32), sims[order].astype(np.float32),
+                         (n_items, n_items))
+
+    # --- Consultas ---
+
+    def recommend(self, user_id: int, n: int = 10, exclude_seen: bool = True) -> List[Tuple[int, float]]:
+        """Top-n (song_id, score) para un usuario; usa popularidad si no hay historial"""
+        with self._lock:
+            if not self.is_fitted:
+                return []
+            position = self._user_position(user_id)
+            if position is None:
+                return self._most_popular(n)
+
+            items, weights = self._user_row(position)
+            if len(items) == 0:
+                return self._most_popular(n)
+            return self._score(items, weights, n, exclude=items if exclude_seen else None)
+
+    def recommend_batch(self, user_ids: Iterable[int], n: int = 10,
+                        exclude_seen: bool = True) -> List[List[Tuple[int, float]]]:
+        """
+        Top-n de varios usuarios con una sola pasada vectorizada
+
+        Expande a la vez las filas de todos los usuarios y sus vecinos, suma
+        las contribuciones por (usuario, candidato) y selecciona el top-n de
+        cada usuario. Los usuarios sin historial comparten el ranking de
+        popularidad. Con delta pendiente se calcula usuario a usuario.
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        with self._lock:
+            if not self.is_fitted:
+                return [[] for _ in user_ids]
+            if self._pending_by_user or self._dirty or self._refreshed:
+                return [self.recommend(user_id, n, exclude_seen) for user_id in user_ids]
+
+            positions = [self._user_position(user_id) for user_id in user_ids]
+            lengths_by_user = self.user_items.row_lengths()
+            known = [i for i, position in enumerate(positions)
+                     if position is not None and lengths_by_user[position] > 0]
+            popular = self._most_popular(n) if len(known) < len(user_ids) else []
+            results = [popular for _ in user_ids]
+            if not known:
+                return results
+
+            users = np.asarray([positions[i] for i in known], dtype=np.int64)
+            lengths = lengths_by_user[users]
+            entries = _expand_ranges(self.user_items.indptr[users], lengths)
+            owners = np.repeat(np.arange(len(users)), lengths)
+            items = self.user_items.indices[entries].astype(np.int64)
+            weights = self.user_items.data[entries]
+
+            neighbor_lengths = self.neighbors.row_lengths()[items]
+            neighbor_entries = _expand_ranges(self.neighbors.indptr[items], neighbor_lengths)
+            n_items = self.neighbors.shape[0]
+            keys = np.repeat(owners, neighbor_lengths) * n_items + self.neighbors.indices[neighbor_entries]
+            contributions = self.neighbors.data[neighbor_entries] * np.repeat(weights, neighbor_lengths)
+
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            scores = np.bincount(inverse, weights=contributions).astype(np.float64, copy=False)
+            if exclude_seen:
+                # unique_keys está ordenado: búsqueda binaria en vez de isin
+                seen = owners * n_items + items
+                found = np.searchsorted(unique_keys, seen)
+                hit = found < len(unique_keys)
+                hit[hit] = unique_keys[found[hit]] == seen[hit]
+                scores[found[hit]] = -np.inf
+            groups, candidates = unique_keys // n_items, unique_keys % n_items
+
+            top = _top_k_per_group(groups, scores, n)
+            top = top[np.isfinite(scores[top])]
+            song_ids = self.song_ids[candidates[top]].tolist()
+            top_scores = scores[top].tolist()
+            boundaries = np.searchsorted(groups[top], np.arange(len(users) + 1)).tolist()
+            for group, i in enumerate(known):
+                start, end = boundaries[group], boundaries[group + 1]
+                results[i] = list(zip(song_ids[start:end], top_scores[start:end]))
+            return results
+
+    def iter_recommendations(self, user_id: int, exclude_seen: bool = True,
+                             batch_size: int = 10) -> Iterator[Tuple[int, float]]:
+        """(song_id, score) en orden descendente, calculados al pedir el primero y ordenados por bloques"""
+        with self._lock:
+            if not self.is_fitted:
+                return
+            song_ids = self.song_ids
+            position = self._user_position(user_id)
+            items, weights = self._user_row(position) if position is not None else ([], [])
+            if len(items) == 0:
+                candidates, scores = np.arange(len(self.popularity)), self.popularity.astype(np.float64)
+            else:
+                candidates, scores = self._candidate_scores(items, weights, exclude=items if exclude_seen else None)
+        for candidate, score in iter_ranked(candidates, scores, batch_size):
+            yield int(song_ids[candidate]), score
+
+    def similar_items(self, song_id: int, n: int = 10) -> List[Tuple[int, float]]:
+        """Vecinos precalculados de una canción"""
+        with self._lock:
+            if not self.is_fitted:
+                return []
+            position = self._song_position(song_id)
+            if position is None:
+                return []
+            neighbors, sims = self._neighbor_row(position)
+            return [(int(self.song_ids[j]), float(s)) for j, s in zip(neighbors[:n], sims[:n])]
+
+    def _score(self, items: np.ndarray, weights: np.ndarray, n: int,
+               exclude: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        return self._top_n(*self._candidate_scores(items, weights, exclude), n)
+
+    def _candidate_scores(self, items: np.ndarray, weights: np.ndarray,
+                          exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        # Producto matriz-vector disperso: S^T · x restringido a los vecinos de x
+        if self._dirty or self._refreshed or items.max() >= self.neighbors.shape[0]:
+            rows = [self._neighbor_row(int(i)) for i in items]
+            lengths = np.array([len(row[0]) for row in rows], dtype=np.int64)
+            candidates = np.concatenate([row[0] for row in rows]) if rows else np.zeros(0, dtype=np.int32)
+            similarities = np.concatenate([row[1] for row in rows]) if rows else np.zeros(0)
+        else:
+            lengths = self.neighbors.row_lengths()[items]
+            positions = _expand_ranges(self.neighbors.indptr[items], lengths)
+            candidates = self.neighbors.indices[positions]
+            similarities = self.neighbors.data[positions]
+        contributions = similarities * np.repeat(weights, lengths)
+
+        unique_candidates, inverse = np.unique(candidates, return_inverse=True)
+        scores = np.bincount(inverse, weights=contributions)
+        if exclude is not None and len(unique_candidates):
+            scores[np.isin(unique_candidates, exclude)] = -np.inf
+        return unique_candidates, scores
+
+    def _most_popular(self, n: int) -> List[Tuple[int, float]]:
+        return self._top_n(np.arange(len(self.popularity)), self.popularity.astype(np.float64), n)
+
+    def _top_n(self, items: np.ndarray, scores: np.ndarray, n: int) -> List[Tuple[int, float]]:
+        if len(items) == 0 or n <= 0:
+            return []
+        if len(items) > n:
+            top = np.argpartition(-scores, n - 1)[:n]
+        else:
+            top = np.arange(len(items))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top])]
+        return [(int(self.song_ids[items[i]]), float(scores[i])) for i in top]
+
+
+# Lectura del catálogo por bloques (límite de variables de SQLite en IN)
+LOAD_CHUNK_SIZE = 10_000
+
+_default_engine: Optional[ItemSimilarityEngine] = None
+_default_engine_lock = threading.Lock()
+
+
+def load_engine(engine: Optional[ItemSimilarityEngine] = None,
+                chunk_size: int = LOAD_CHUNK_SIZE) -> ItemSimilarityEngine:
+    """Entrena un motor con el historial persistido (ListeningEvent) y los títulos del catálogo"""
+    from .models import ListeningEvent, Song
+
+    engine = engine if engine is not None else ItemSimilarityEngine()
+    engine.fit(ListeningEvent.objects.as_triples(chunk_size))
+    song_ids = engine.song_ids.tolist()
+    metadata = {}
+    for start in range(0, len(song_ids), chunk_size):
+        rows = Song.objects.filter(id__in=song_ids[start:start + chunk_size]).values_list(
+            "id", "title", "artist__name"
+        )
+        metadata.update((song_id, {"title": title, "artist": artist}) for song_id, title, artist in rows)
+    engine.song_metadata = metadata
+    return engine
+
+
+def model_directory() -> Optional[str]:
+    from django.conf import settings
+
+    return getattr(settings, "COLLABORATIVE_MODEL_DIR", None)
+
+
+def get_default_engine() -> ItemSimilarityEngine:
+    """
+    Motor compartido por las estrategias del proceso
+
+    Se carga del modelo guardado en settings.COLLABORATIVE_MODEL_DIR si
+    existe; si no, es un motor vacío que solo recoge los eventos nuevos. El
+    entrenamiento con todo el historial no se hace nunca en una petición: es
+    un paso explícito (precompute_recommendations, que guarda el modelo, o
+    load_engine + set_default_engine).
+    """
+    global _default_engine
+    if _default_engine is None:
+        with _default_engine_lock:
+            if _default_engine is None:
+                directory = model_directory()
+                if directory and os.path.exists(os.path.join(directory, "model.json")):
+                    _default_engine = ItemSimilarityEngine.load(directory)
+                else:
+                    _default_engine = ItemSimilarityEngine()
+    return _default_engine
+
+
+def set_default_engine(engine: Optional[ItemSimilarityEngine]):
+    """Reemplaza el motor compartido (p. ej. tras reentrenar); con None se recarga en el siguiente uso"""
+    global _default_engine
+    with _default_engine_lock:
+        _default_engine = engine
@@ -0,0 +1,69 @@
+"""
+Perfil de conexión SQLite para varios workers y enrutado de lecturas
+
+Cada conexión nueva aplica los PRAGMA de settings.SQLITE_PRAGMAS: WAL para
+que las lecturas no bloqueen a la escritura (ni al revés), synchronous=NORMAL
+(seguro en WAL), caché de páginas y mmap más grandes y busy_timeout para que
+un worker espere al otro en lugar de fallar con "database is locked". Con
+settings.SQLITE_PRAGMAS_ENABLED a False (desarrollo y tests) no se aplica
+ninguno: el modo WAL es persistente y cambiaría el db.sqlite3 del repositorio.
+
+ReadReplicaRouter manda las lecturas al alias de solo lectura
+(settings.DATABASE_READ_ALIAS), que abre el mismo archivo con query_only; en
+WAL ese lector ve siempre lo último confirmado. Dentro de una transacción de
+`default` las lecturas se quedan en `default` para ver sus propias escrituras.
+"""
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+def read_alias() -> str:
+    return getattr(settings, "DATABASE_READ_ALIAS", "replica")
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Perfil de settings.SQLITE_PRAGMAS (la única copia), o nada si está desactivado"""
+    if not getattr(settings, "SQLITE_PRAGMAS_ENABLED", True):
+        return {}
+    return dict(getattr(settings, "SQLITE_PRAGMAS", {}))
+
+
+def pragma_statements(pragmas: Dict[str, Any], read_only: bool = False) -> List[str]:
+    """Sentencias PRAGMA en orden; query_only va al final (journal_mode puede escribir)"""
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+    if read_only:
+        statements.append("PRAGMA query_only=1")
+    return statements
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    read_only = connection.alias == read_alias() and connection.alias != DEFAULT_DB_ALIAS
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(sqlite_pragmas(), read_only):
+            cursor.execute(statement)
+
+
+class ReadReplicaRouter:
+    """Lecturas al alias de solo lectura (si existe) y escrituras y migraciones a default"""
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias()
+        if alias not in settings.DATABASES or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambos alias son el mismo archivo
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -5,15 +5,31 @@ from django.db import models
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Max, Q
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.core.cache import cache
-from typing import Dict, Any, List
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from collections import Counter
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+import datetime
+import hashlib
 import json
+import threading
+
+from .catalog_import import batched
+from .interfaces import CacheInterface
+from .models import Artist, Playlist, PlaylistEntry, Song, UserMusicStats
+from .pagination import KeysetPaginationMixin
+from .search import normalize_search_text, search_songs
+from .services import CacheFactory
 
 
 # 1. REPOSITORY PATTERN
@@ -33,21 +49,57 @@ class SongRepository:
         return self.model_class.objects.create(**kwargs)
     
     def update(self, song_id, **kwargs):
-        song = self.get_by_id(song_id)
+        # Las escrituras parten siempre de la fila actual, nunca de una copia cacheada
+        song = get_object_or_404(self.model_class, id=song_id)
         for key, value in kwargs.items():
             setattr(song, key, value)
         song.save()
         return song
     
     def delete(self, song_id):
-        song = self.get_by_id(song_id)
+        song = get_object_or_404(self.model_class, id=song_id)
         song.delete()
         return True
     
     def search(self, query):
-        return self.model_class.objects.filter(
-            Q(title__icontains=query) | Q(artist__icontains=query)
-        )
+        """Canciones por título o artista, las más relevantes primero (FTS5)"""
+        return search_songs(self.model_class.objects.select_related("artist"), query)
+    
+    def get_or_create_many(self, songs_data: List[Dict[str, Any]]) -> List[Tuple[int, str]]:
+        """
+        (id, género) de cada canción por clave natural (artista, título), creando las que falten
+        
+        Un número fijo de consultas por lote, sea cual sea su tamaño. Las altas
+        ignoran los conflictos con la restricción única (otro proceso pudo crear
+        la misma canción a la vez) y se vuelven a leer de la base.
+        """
+        artist_ids = Artist.objects.ids_for(data['artist'] for data in songs_data)
+        keys = [(artist_ids[data['artist']], data['title']) for data in songs_data]
+        existing = self._by_natural_key(keys)
+        missing = {}
+        for key, data in zip(keys, songs_data):
+            if key not in existing and key not in missing:
+                missing[key] = self.model_class(
+                    artist_id=key[0],
+                    title=key[1],
+                    genre=data.get('genre') or '',
+                    duration_seconds=data.get('duration_seconds'),
+                    release_date=data.get('release_date'),
+                )
+        if missing:
+            # Con ignore_conflicts los objetos creados no reciben id: se vuelven a seleccionar
+            self.model_class.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            existing.update(self._by_natural_key(list(missing)))
+        return [existing[key] for key in keys]
+    
+    def _by_natural_key(self, keys: List[Tuple[int, str]]) -> Dict[Tuple[int, str], Tuple[int, str]]:
+        return {
+            (artist_id, title): (song_id, genre)
+            for song_id, artist_id, title, genre in self.model_class.objects.filter(
+                artist_id__in={artist_id for artist_id, _ in keys},
+                title__in={title for _, title in keys},
+            ).values_list('id', 'artist_id', 'title', 'genre')
+        }
 
 
 class PlaylistRepository:
@@ -59,11 +111,97 @@ class PlaylistRepository:
     def get_user_playlists(self, user):
         return self.model_class.objects.filter(user=user)
     
+    def create(self, **kwargs):
+        return self.model_class.objects.create(**kwargs)
+    
     def add_song_to_playlist(self, playlist_id, song_id):
         playlist = get_object_or_404(self.model_class, id=playlist_id)
         song = get_object_or_404(Song, id=song_id)
-        playlist.songs.add(song)
+        playlist.append(song)
         return playlist
+    
+    def bulk_append(self, playlist, song_ids: List[int], position: int):
+        """Inserta las entradas a partir de `position` con un solo INSERT (sin señales)"""
+        PlaylistEntry.objects.bulk_create([
+            PlaylistEntry(playlist=playlist, song_id=song_id, position=position + offset)
+            for offset, song_id in enumerate(song_ids)
+        ])
+    
+    def add_to_counters(self, playlist, songs: int, genres: Dict[str, int]):
+        """Suma a los contadores de la playlist y del usuario lo insertado por bulk_append"""
+        self.model_class.objects.filter(id=playlist.id).apply(songs=songs, genres=genres)
+        UserMusicStats.objects.filter(user_id=playlist.user_id).apply(songs=songs, genres=genres)
+
+
+# Repositorios con caché de lectura (read-through). Las claves las invalidan
+# SongObserver y PlaylistObserver desde las señales de los modelos; el TTL
+# solo cubre cambios sin señales (bulk_update, rebuild_counters). Con el
+# backend 'memory' cada proceso tiene su copia y solo ve sus propias
+# invalidaciones: entre varios workers hace falta 'sqlite' o 'redis'.
+def song_cache_key(song_id) -> str:
+    return f"repo:song:{song_id}"
+
+
+def user_playlists_cache_key(user_id) -> str:
+    return f"repo:playlists:user:{user_id}"
+
+
+_repository_cache: Optional[CacheInterface] = None
+_repository_cache_lock = threading.Lock()
+
+
+def repository_cache() -> CacheInterface:
+    """Caché compartido por los repositorios y sus observadores (settings.REPOSITORY_CACHE)"""
+    global _repository_cache
+    if _repository_cache is None:
+        with _repository_cache_lock:
+            if _repository_cache is None:
+                _repository_cache = CacheFactory.from_settings("REPOSITORY_CACHE")
+    return _repository_cache
+
+
+def repository_cache_ttl() -> int:
+    return getattr(settings, "REPOSITORY_CACHE", {}).get("TTL", 3600)
+
+
+class CachedSongRepository(SongRepository):
+    """SongRepository que sirve get_by_id desde el caché (con su artista)"""
+    
+    def __init__(self, model_class, cache: CacheInterface, ttl: int = 3600):
+        super().__init__(model_class)
+        self.cache = cache
+        self.ttl = ttl
+    
+    def get_by_id(self, song_id):
+        key = song_cache_key(song_id)
+        song = self.cache.get(key)
+        if song is None:
+            song = get_object_or_404(self.model_class.objects.select_related('artist'), id=song_id)
+            self.cache.set(key, song, ttl=self.ttl)
+        return song
+
+
+class CachedPlaylistRepository(PlaylistRepository):
+    """PlaylistRepository que sirve las playlists de cada usuario desde el caché"""
+    
+    def __init__(self, model_class, cache: CacheInterface, ttl: int = 3600):
+        super().__init__(model_class)
+        self.cache = cache
+        self.ttl = ttl
+    
+    def get_user_playlists(self, user):
+        """Lista (no queryset) de las playlists del usuario, las más recientes primero"""
+        key = user_playlists_cache_key(getattr(user, 'pk', user))
+        playlists = self.cache.get(key)
+        if playlists is None:
+            playlists = list(super().get_user_playlists(user))
+            self.cache.set(key, playlists, ttl=self.ttl)
+        return playlists
+    
+    def add_to_counters(self, playlist, songs: int, genres: Dict[str, int]):
+        # bulk_append y los UPDATE de contadores no emiten señales
+        super().add_to_counters(playlist, songs, genres)
+        PlaylistObserver(lambda: self.cache).model_saved(playlist, created=False)
 
 
 # 2. SERVICE LAYER PATTERN
@@ -86,21 +224,39 @@ class MusicService:
         """Añade una canción a una playlist"""
         return self.playlist_repository.add_song_to_playlist(playlist_id, song_id)
     
-    def get_user_music_stats(self, user):
-        """Obtiene estadísticas de música del usuario"""
-        playlists = self.playlist_repository.get_user_playlists(user)
-        total_songs = sum(playlist.songs.count() for playlist in playlists)
+    def add_songs_to_playlist(self, playlist, songs_data: Iterable[Dict[str, Any]], batch_size: int = 500):
+        """
+        Añade canciones (dicts con title y artist) al final de la playlist por lotes
         
+        Acepta cualquier iterable, también un generador: solo hay un lote en
+        memoria. Debe llamarse dentro de una transacción.
+        """
+        last = playlist.entries.aggregate(last=Max('position'))['last']
+        position = 0 if last is None else last + 1
+        added = 0
+        genres = Counter()
+        for batch in batched(songs_data, batch_size):
+            songs = self.song_repository.get_or_create_many(batch)
+            self.playlist_repository.bulk_append(playlist, [song_id for song_id, _ in songs], position + added)
+            genres.update(genre for _, genre in songs if genre)
+            added += len(songs)
+        if added:
+            self.playlist_repository.add_to_counters(playlist, added, genres)
+        return added
+    
+    def get_user_music_stats(self, user):
+        """Obtiene estadísticas de música del usuario (contadores mantenidos, una consulta)"""
+        stats = UserMusicStats.objects.for_user(user.id)
         return {
-            'total_playlists': playlists.count(),
-            'total_songs': total_songs,
-            'favorite_genre': self._get_favorite_genre(user)
+            'total_playlists': stats.playlist_count,
+            'total_songs': stats.song_count,
+            'favorite_genre': stats.favorite_genre,
+            'genres': stats.genre_counts,
         }
     
     def _get_favorite_genre(self, user):
         """Obtiene el género favorito del usuario"""
-        # Lógica para determinar género favorito
-        return "Pop"
+        return UserMusicStats.objects.for_user(user.id).favorite_genre
 
 
 # 3. FACTORY PATTERN para Vistas
@@ -111,7 +267,7 @@ class ViewFactory:
     def create_crud_views(model_class, template_prefix=""):
         """Crea vistas CRUD para un modelo"""
         
-        class BaseListView(ListView):
+        class BaseListView(KeysetPaginationMixin, ListView):
             model = model_class
             template_name = f"{template_prefix}_list.html"
             context_object_name = 'objects'
@@ -149,34 +305,77 @@ class ViewFactory:
 
 
 # 4. STRATEGY PATTERN para Filtros
+def _normalize_moment(value) -> datetime.datetime:
+    """Fecha o instante como datetime aware en UTC (una fecha es su medianoche, como en __range)"""
+    if isinstance(value, str):
+        moment, day = parse_datetime(value), parse_date(value)
+        if moment is None and day is None:
+            raise ValueError(f"Fecha no válida: {value}")
+        value = moment or day
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value.astimezone(datetime.timezone.utc)
+
+
 class FilterStrategy:
     """Estrategia base para filtros"""
     
+    # Faceta que restringe el filtro (None si no corresponde a ninguna)
+    facet = None
+    
     def apply(self, queryset):
         return queryset
+    
+    def restrict(self, queryset):
+        """Como apply, pero sin importar el orden (para agregados)"""
+        return self.apply(queryset)
+    
+    def condition(self) -> Optional[Q]:
+        """El filtro como Q, si se puede expresar así (necesario para excluirlo de su faceta)"""
+        return None
+    
+    def cache_key_part(self) -> Optional[Tuple]:
+        """Forma canónica del filtro; None si no filtra nada"""
+        return (type(self).__name__, *sorted((name, str(value)) for name, value in vars(self).items()))
 
 
 class DateRangeFilter(FilterStrategy):
     """Filtro por rango de fechas"""
     
+    facet = 'created_at'
+    
     def __init__(self, start_date, end_date):
-        self.start_date = start_date
-        self.end_date = end_date
+        self.start_date = _normalize_moment(start_date)
+        self.end_date = _normalize_moment(end_date)
     
     def apply(self, queryset):
-        return queryset.filter(
-            created_at__range=[self.start_date, self.end_date]
-        )
+        return queryset.filter(self.condition())
+    
+    def condition(self):
+        return Q(created_at__range=[self.start_date, self.end_date])
+    
+    def cache_key_part(self):
+        return (self.facet, self.start_date.isoformat(), self.end_date.isoformat())
 
 
 class GenreFilter(FilterStrategy):
     """Filtro por género"""
     
+    facet = 'genre'
+    
     def __init__(self, genre):
-        self.genre = genre
+        self.genre = str(genre).strip()
     
     def apply(self, queryset):
-        return queryset.filter(genre=self.genre)
+        return queryset.filter(self.condition())
+    
+    def condition(self):
+        return Q(genre=self.genre)
+    
+    def cache_key_part(self):
+        return (self.facet, self.genre)
 
 
 class SearchFilter(FilterStrategy):
@@ -186,14 +385,28 @@ class SearchFilter(FilterStrategy):
         self.search_term = search_term
     
     def apply(self, queryset):
-        return queryset.filter(
-            Q(title__icontains=self.search_term) |
-            Q(artist__icontains=self.search_term)
-        )
+        return search_songs(queryset, self.search_term)
+    
+    def restrict(self, queryset):
+        return search_songs(queryset, self.search_term, rank=False)
+    
+    def cache_key_part(self):
+        text = normalize_search_text(self.search_term)
+        return ('search', text) if text else None
 
 
 class FilterContext:
-    """Contexto que usa estrategias de filtrado"""
+    """
+    Contexto que usa estrategias de filtrado
+    
+    Además de los resultados calcula las facetas (conteo por género e
+    histograma de created_at) en una sola consulta: GROUP BY género con un
+    COUNT condicional por tramo. Cada faceta cuenta como si su propio filtro
+    no estuviera, para que la interfaz pueda ofrecer las alternativas.
+    """
+    
+    HISTOGRAM_BUCKETS = 12
+    HISTOGRAM_DAYS = 365
     
     def __init__(self, queryset):
         self.queryset = queryset
@@ -207,6 +420,107 @@ class FilterContext:
         for filter_strategy in self.filters:
             result = filter_strategy.apply(result)
         return result
+    
+    def normalized_filters(self) -> List[FilterStrategy]:
+        """Filtros sin los vacíos ni los repetidos, en orden canónico (el orden no cambia el resultado)"""
+        unique = {}
+        for filter_strategy in self.filters:
+            part = filter_strategy.cache_key_part()
+            if part is not None:
+                unique.setdefault(part, filter_strategy)
+        return [unique[part] for part in sorted(unique)]
+    
+    def cache_key(self, prefix: str = 'filters', **extra) -> str:
+        """Misma clave para combinaciones equivalentes de filtros (orden, repetidos, tildes...)"""
+        parts = [filter_strategy.cache_key_part() for filter_strategy in self.normalized_filters()]
+        payload = json.dumps(
+            [self.queryset.model._meta.label, parts, sorted(extra.items())],
+            default=str, separators=(',', ':'),
+        )
+        return f"{prefix}:{hashlib.sha1(payload.encode()).hexdigest()}"
+    
+    def facets(self, buckets: Optional[int] = None, histogram_range=None,
+               cache: Optional[CacheInterface] = None, ttl: int = 300) -> Dict[str, Any]:
+        """
+        {'total', 'genres': {género: n}, 'created_at': [{'start', 'end', 'count'}]}
+        
+        El histograma cubre el rango del DateRangeFilter, o `histogram_range`,
+        o los últimos HISTOGRAM_DAYS días hasta ahora (incluido). Las canciones
+        sin género cuentan en el total pero no en 'genres'.
+        """
+        buckets = buckets or self.HISTOGRAM_BUCKETS
+        edges = self._histogram_edges(buckets, histogram_range)
+        if histogram_range is None and not self._date_filters():
+            # El rango por defecto se mueve con el reloj: la clave no lleva sus bordes
+            histogram = ['last_days', self.HISTOGRAM_DAYS, buckets]
+        else:
+            histogram = [edge.isoformat() for edge in edges]
+        key = self.cache_key('facets', histogram=histogram)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        queryset, conditions = self.queryset, {}
+        for filter_strategy in self.normalized_filters():
+            condition = filter_strategy.condition()
+            if condition is None or filter_strategy.facet is None:
+                queryset = filter_strategy.restrict(queryset)
+            else:
+                conditions[filter_strategy.facet] = conditions.get(filter_strategy.facet, Q()) & condition
+        
+        def without(facet=None) -> Q:
+            combined = Q()
+            for name, condition in conditions.items():
+                if name != facet:
+                    combined &= condition
+            return combined
+        
+        aggregates = {'total': Count('pk', filter=without()), 'genre_total': Count('pk', filter=without('genre'))}
+        by_date = without('created_at')
+        for index, (start, end) in enumerate(zip(edges, edges[1:])):
+            lookup = 'lte' if index == len(edges) - 2 else 'lt'
+            in_bucket = Q(created_at__gte=start, **{f'created_at__{lookup}': end})
+            aggregates[f'bucket_{index}'] = Count('pk', filter=in_bucket & by_date)
+        rows = list(queryset.order_by().values('genre').annotate(**aggregates))
+        
+        result = {
+            'total': sum(row['total'] for row in rows),
+            'genres': dict(sorted(
+                ((row['genre'], row['genre_total']) for row in rows if row['genre'] and row['genre_total']),
+                key=lambda item: (-item[1], item[0]),
+            )),
+            'created_at': [
+                {
+                    'start': start.isoformat(),
+                    'end': end.isoformat(),
+                    'count': sum(row[f'bucket_{index}'] for row in rows),
+                }
+                for index, (start, end) in enumerate(zip(edges, edges[1:]))
+            ],
+        }
+        if cache is not None:
+            cache.set(key, result, ttl=ttl)
+        return result
+    
+    def _date_filters(self) -> List['DateRangeFilter']:
+        return [f for f in self.normalized_filters() if isinstance(f, DateRangeFilter)]
+    
+    def _histogram_edges(self, buckets: int, histogram_range=None) -> List[datetime.datetime]:
+        date_filters = self._date_filters()
+        if histogram_range is not None:
+            start, end = map(_normalize_moment, histogram_range)
+        elif date_filters:
+            # Varios rangos se combinan con AND: su intersección
+            start = max(f.start_date for f in date_filters)
+            end = min(f.end_date for f in date_filters)
+        else:
+            end = timezone.now().astimezone(datetime.timezone.utc)
+            start = end - datetime.timedelta(days=self.HISTOGRAM_DAYS)
+        if end <= start:
+            return [start, start]
+        step = (end - start) / buckets
+        return [start + step * index for index in range(buckets)] + [end]
 
 
 # 5. DECORATOR PATTERN para Vistas
@@ -245,19 +559,113 @@ class ModelObserver:
     
     def model_deleted(self, instance):
         pass
+    
+    def relation_changed(self, instance, action, reverse, pk_set):
+        """Cambios en una relación ManyToMany (m2m_changed)"""
+        pass
 
 
-class SongObserver(ModelObserver):
-    """Observador específico para canciones"""
+def connect_observer(observer: ModelObserver, *models, m2m=()):
+    """Conecta post_save/post_delete de `models` y m2m_changed de las tablas `m2m` al observador"""
+    name = type(observer).__name__
+    
+    def saved(sender, instance, created, **kwargs):
+        observer.model_saved(instance, created)
+    
+    def deleted(sender, instance, **kwargs):
+        observer.model_deleted(instance)
+    
+    def relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+        observer.relation_changed(instance, action, reverse, pk_set)
+    
+    for model in models:
+        label = model._meta.label
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=f"{name}:save:{label}")
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f"{name}:delete:{label}")
+    for through in m2m:
+        m2m_changed.connect(relation_changed, sender=through, weak=False,
+                            dispatch_uid=f"{name}:m2m:{through._meta.label}")
+
+
+class CacheInvalidationObserver(ModelObserver):
+    """Borra del caché las claves (`cache_keys`) afectadas por cada cambio
+    
+    `cache_provider` se llama en cada invalidación: el caché se crea al
+    usarlo por primera vez y no al arrancar la aplicación.
+    """
+    
+    def __init__(self, cache_provider: Callable[[], CacheInterface]):
+        self.cache_provider = cache_provider
+    
+    @property
+    def cache(self) -> CacheInterface:
+        return self.cache_provider()
+    
+    def cache_keys(self, instance) -> Iterable[str]:
+        return []
     
     def model_saved(self, instance, created):
-        if created:
-            print(f"🎵 Nueva canción creada: {instance.title}")
-        else:
-            print(f"🎵 Canción actualizada: {instance.title}")
+        self.invalidate(self.cache_keys(instance))
     
     def model_deleted(self, instance):
-        print(f"🗑️ Canción eliminada: {instance.title}")
+        self.invalidate(self.cache_keys(instance))
+    
+    def invalidate(self, keys: Iterable[str]):
+        keys = list(keys)
+        self._delete(keys)
+        # Hasta el COMMIT otra petición puede volver a cachear la fila anterior
+        if keys and transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._delete(keys))
+    
+    def _delete(self, keys: List[str]):
+        for key in keys:
+            self.cache.delete(key)
+
+
+class SongObserver(CacheInvalidationObserver):
+    """Invalida las canciones cacheadas cuando cambian ellas o el nombre de su artista"""
+    
+    def cache_keys(self, instance):
+        if isinstance(instance, Artist):
+            return [song_cache_key(song_id) for song_id in instance.songs.values_list('id', flat=True)]
+        return [song_cache_key(instance.pk)]
+    
+    def model_saved(self, instance, created):
+        # Un artista nuevo aún no tiene canciones cacheadas
+        if not (created and isinstance(instance, Artist)):
+            super().model_saved(instance, created)
+
+
+class PlaylistObserver(CacheInvalidationObserver):
+    """Invalida la lista de playlists del dueño al cambiar una playlist o sus canciones"""
+    
+    def cache_keys(self, instance):
+        if isinstance(instance, PlaylistEntry):
+            # Playlist.append/remove crean y borran entradas sin m2m_changed
+            user_ids = Playlist.objects.filter(pk=instance.playlist_id).values_list('user_id', flat=True)
+            return [user_playlists_cache_key(user_id) for user_id in user_ids]
+        return [user_playlists_cache_key(instance.user_id)]
+    
+    def relation_changed(self, instance, action, reverse, pk_set):
+        if not reverse:
+            if action.startswith('post_'):
+                self.invalidate(self.cache_keys(instance))
+            return
+        # Desde la canción (song.playlists.add/remove/clear): los dueños de esas playlists
+        if action in ('post_add', 'post_remove'):
+            playlists = Playlist.objects.filter(id__in=pk_set)
+        elif action == 'pre_clear':
+            playlists = instance.playlists.all()
+        else:
+            return
+        user_ids = playlists.values_list('user_id', flat=True).distinct()
+        self.invalidate(user_playlists_cache_key(user_id) for user_id in user_ids)
+
+
+def connect_cache_observers(cache_provider: Callable[[], CacheInterface] = repository_cache):
+    """Mantiene el caché de los repositorios al día con las señales de los modelos"""
+    connect_observer(SongObserver(cache_provider), Song, Artist)
+    connect_observer(PlaylistObserver(cache_provider), Playlist, PlaylistEntry, m2m=[Playlist.songs.through])
 
 
 # 7. COMMAND PATTERN para Operaciones
@@ -277,20 +685,20 @@ class AddSongToPlaylistCommand(Command):
     def __init__(self, playlist_id, song_id):
         self.playlist_id = playlist_id
         self.song_id = song_id
-        self.was_added = False
+        self.entry_id = None
     
     def execute(self):
         playlist = get_object_or_404(Playlist, id=self.playlist_id)
         song = get_object_or_404(Song, id=self.song_id)
-        playlist.songs.add(song)
-        self.was_added = True
+        self.entry_id = playlist.append(song).id
         return True
     
     def undo(self):
-        if self.was_added:
+        # Solo se quita la entrada añadida, no otras apariciones de la canción
+        if self.entry_id is not None:
             playlist = get_object_or_404(Playlist, id=self.playlist_id)
-            song = get_object_or_404(Song, id=self.song_id)
-            playlist.songs.remove(song)
+            playlist.remove(self.entry_id)
+            self.entry_id = None
             return True
         return False
 
@@ -392,23 +800,20 @@ class MusicFacade:
     """Facade para operaciones complejas de música"""
     
     def __init__(self):
-        self.song_repository = SongRepository(Song)
-        self.playlist_repository = PlaylistRepository(Playlist)
+        self.song_repository = CachedSongRepository(Song, repository_cache(), repository_cache_ttl())
+        self.playlist_repository = CachedPlaylistRepository(Playlist, repository_cache(), repository_cache_ttl())
         self.music_service = MusicService(
             self.song_repository, 
             self.playlist_repository
         )
     
-    def create_complete_playlist(self, user, name, songs_data):
-        """Crea una playlist completa con canciones"""
-        # Crear playlist
-        playlist = self.music_service.create_playlist(user, name)
-        
-        # Añadir canciones
-        for song_data in songs_data:
-            song = self.song_repository.create(**song_data)
-            self.music_service.add_song_to_playlist(playlist.id, song.id)
-        
+    def create_complete_playlist(self, user, name, songs_data, batch_size=500):
+        """Crea una playlist completa con canciones en una sola transacción"""
+        with transaction.atomic():
+            playlist = self.music_service.create_playlist(user, name)
+            self.music_service.add_songs_to_playlist(playlist, songs_data, batch_size)
+            # Los contadores se sumaron con UPDATE en la base, no en esta instancia
+            playlist.refresh_from_db(fields=['song_count', 'genre_counts'])
         return playlist
     
     def get_user_dashboard_data(self, user):
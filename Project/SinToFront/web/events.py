@@ -0,0 +1,163 @@
+"""
+Bus de eventos asíncrono para los observadores de recomendaciones
+
+La petición solo encola el evento (O(1)); un pool de hilos lo entrega a los
+observadores en lotes. La cola está acotada y, cuando se llena, la política
+decide qué hacer:
+
+- "drop": el evento nuevo se descarta y se contabiliza en `stats()`
+- "block": el productor espera hasta `block_timeout` segundos (backpressure)
+  y, si no hay hueco, el evento se descarta
+"""
+import queue
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+class RecommendationEvent(NamedTuple):
+    user: Any
+    recommendations: List[Any]
+    cache_key: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+_STOP = object()
+
+
+class ObserverEventBus:
+    """Cola acotada + workers que entregan lotes de eventos a cada observador"""
+
+    POLICIES = ("drop", "block")
+
+    def __init__(self, max_queue: int = 10_000, workers: int = 2, batch_size: int = 100,
+                 flush_interval: float = 0.05, policy: str = "drop", block_timeout: float = 1.0):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política no soportada: {policy}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.workers = workers
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._observers: tuple = ()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stats = {"published": 0, "dropped": 0, "delivered": 0, "errors": 0}
+
+    @classmethod
+    def from_settings(cls) -> "ObserverEventBus":
+        """Bus configurado en settings.RECOMMENDATION_EVENT_BUS"""
+        from django.conf import settings
+
+        config = getattr(settings, "RECOMMENDATION_EVENT_BUS", {})
+        return cls(
+            max_queue=config.get("MAX_QUEUE", 10_000),
+            workers=config.get("WORKERS", 2),
+            batch_size=config.get("BATCH_SIZE", 100),
+            flush_interval=config.get("FLUSH_INTERVAL", 0.05),
+            policy=config.get("POLICY", "drop"),
+            block_timeout=config.get("BLOCK_TIMEOUT", 1.0),
+        )
+
+    def subscribe(self, observer):
+        with self._lock:
+            # Copia al escribir: los workers iteran la tupla sin bloquear
+            self._observers = self._observers + (observer,)
+
+    def publish(self, event: RecommendationEvent) -> bool:
+        """Encola el evento; devuelve False si se descartó"""
+        if not self._threads:
+            self._start()
+        try:
+            if self.policy == "block":
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("published")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que se entreguen los eventos encolados"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Entrega lo pendiente y detiene los workers"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self.flush(timeout)
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._threads = [
+                threading.Thread(target=self._run, name=f"recommendation-events-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                self._queue.task_done()
+                return
+            batch = [event]
+            stop = self._fill_batch(batch)
+            try:
+                self._dispatch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _fill_batch(self, batch: List[RecommendationEvent]) -> bool:
+        """Completa el lote hasta batch_size o flush_interval; True si llegó la señal de parada"""
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if event is _STOP:
+                self._queue.task_done()
+                return True
+            batch.append(event)
+        return False
+
+    def _dispatch(self, batch: List[RecommendationEvent]):
+        # Un observador que falla no impide la entrega a los demás
+        for observer in self._observers:
+            try:
+                observer.on_recommendations_batch(batch)
+                self._count("delivered", len(batch))
+            except Exception:
+                self._count("errors")
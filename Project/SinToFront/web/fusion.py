@@ -0,0 +1,66 @@
+"""
+Fusión de listas de recomendaciones de varias estrategias
+
+Cada candidato se mapea a un id entero y los scores ponderados se acumulan
+en arrays de NumPy, sin modificar los registros de entrada (una subestrategia
+puede tenerlos cacheados). El top-k se selecciona con argpartition.
+"""
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from .records import Recommendation
+
+
+class ScoreFusion:
+    """
+    Fusión ponderada de rankings
+
+    - "weighted": suma de weight * score
+    - "rrf": reciprocal rank fusion, suma de weight / (rrf_k + rank)
+    """
+
+    METHODS = ("weighted", "rrf")
+
+    def __init__(self, method: str = "weighted", limit: int = 10, rrf_k: int = 60):
+        if method not in self.METHODS:
+            raise ValueError(f"Método de fusión no soportado: {method}")
+        self.method = method
+        self.limit = limit
+        self.rrf_k = rrf_k
+
+    def fuse(self, ranked_lists: Sequence[List[Recommendation]],
+             weights: Sequence[float], limit: Optional[int] = None) -> List[Recommendation]:
+        """Top `limit` (por defecto self.limit) candidatos fusionados"""
+        limit = self.limit if limit is None else limit
+        flat = [rec for recommendations in ranked_lists for rec in recommendations]
+        if not flat:
+            return []
+        lengths = [len(recommendations) for recommendations in ranked_lists]
+        sources = np.repeat(np.arange(len(ranked_lists)), lengths)
+        ranks = np.concatenate([np.arange(1, length + 1) for length in lengths])
+        scores = np.array([rec.score for rec in flat], dtype=np.float64)
+
+        # Id entero por candidato; el representante es su primera aparición
+        song_ids = [rec.song_id for rec in flat]
+        if None in song_ids:
+            ids: Dict[Hashable, int] = {}
+            keys = np.array([ids.setdefault(rec.key, len(ids)) for rec in flat], dtype=np.int64)
+        else:
+            keys = np.array(song_ids, dtype=np.int64)
+        _, first, candidates = np.unique(keys, return_index=True, return_inverse=True)
+
+        weight_array = np.asarray(weights, dtype=np.float64)[sources]
+        if self.method == "rrf":
+            contributions = weight_array / (self.rrf_k + ranks)
+        else:
+            contributions = weight_array * scores
+        totals = np.bincount(candidates, weights=contributions, minlength=len(first))
+
+        if len(totals) > limit:
+            top = np.argpartition(-totals, limit - 1)[:limit]
+        else:
+            top = np.arange(len(totals))
+        top = top[np.argsort(-totals[top], kind="stable")]
+
+        return [flat[first[i]].replace(score=float(totals[i])) for i in top.tolist()]
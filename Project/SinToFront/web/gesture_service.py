@@ -2,6 +2,7 @@
 Servicio principal que usa inversión de dependencias
 """
 from typing import Dict, Any
+import hashlib
 import numpy as np
 from .interfaces import GestureDetectorInterface, NotificationServiceInterface, CacheInterface
 from .services import MockGestureDetector, ConsoleNotificationService, InMemoryCache
@@ -34,7 +35,8 @@ class GestureControlService:
         """
         try:
             # Verificar caché primero
-            cache_key = f"gesture_{hash(image.tobytes())}"
+            # hash() de bytes cambia entre procesos; el digest permite compartir caché
+            cache_key = f"gesture_{hashlib.blake2b(image.tobytes(), digest_size=16).hexdigest()}"
             cached_result = self.cache_service.get(cache_key)
             
             if cached_result:
@@ -89,10 +91,10 @@ class GestureServiceFactory:
     @staticmethod
     def create_production_service() -> GestureControlService:
         """Crea un servicio para producción"""
-        from .services import RealGestureDetector, ToastNotificationService, RedisCache
+        from .services import RealGestureDetector, ToastNotificationService, CacheFactory
         
         return GestureControlService(
             gesture_detector=RealGestureDetector(),
             notification_service=ToastNotificationService(),
-            cache_service=RedisCache()
+            cache_service=CacheFactory.from_settings()
         )
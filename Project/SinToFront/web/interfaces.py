@@ -88,3 +88,17 @@ class CacheInterface(ABC):
     def delete(self, key: str) -> bool:
         """Elimina un valor del caché"""
         pass
+
+
+class CacheSerializerInterface(ABC):
+    """Interface para serializadores de valores de caché"""
+    
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Convierte un valor en bytes"""
+        pass
+    
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Reconstruye un valor desde bytes"""
+        pass
@@ -0,0 +1,73 @@
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+from web.benchmarks import BENCHMARKS
+from web.benchmarks.harness import compare_to_baseline, load_baseline, save_baseline
+
+SCALE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def scale(value: str) -> int:
+    """Cantidad con sufijo opcional: 5000, 10k, 1M"""
+    value = value.strip().lower()
+    multiplier = SCALE_SUFFIXES.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    try:
+        return int(float(value) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Cantidad no válida: {value}")
+
+
+class Command(BaseCommand):
+    help = "Ejecuta un benchmark de rendimiento y muestra sus métricas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(BENCHMARKS))
+        parser.add_argument("--operations", type=scale, default=5000)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--users", type=scale, default=10_000)
+        parser.add_argument("--songs", type=scale, default=100_000)
+        parser.add_argument("--save-baseline", metavar="PATH",
+                            help="Guarda las métricas como línea base en JSON")
+        parser.add_argument("--baseline", metavar="PATH",
+                            help="Compara con una línea base y falla si hay regresiones")
+        parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Empeoramiento relativo admitido frente a la línea base")
+
+    def handle(self, *args, **options):
+        run_options = {
+            "operations": options["operations"],
+            "workers": options["workers"],
+            "users": options["users"],
+            "songs": options["songs"],
+        }
+        try:
+            rows = BENCHMARKS[options["name"]](**run_options)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for row in rows:
+            metrics = ", ".join(
+                f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in row.items()
+                if key != "name"
+            )
+            self.stdout.write(f"{row['name']}: {metrics}")
+
+        if options["save_baseline"]:
+            save_baseline(options["save_baseline"], options["name"], run_options, rows)
+            self.stdout.write(f"Línea base guardada en {options['save_baseline']}")
+
+        if options["baseline"]:
+            try:
+                baseline = load_baseline(options["baseline"])
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"No se pudo leer la línea base: {exc}")
+            if baseline.get("benchmark") != options["name"]:
+                raise CommandError(f"La línea base corresponde al benchmark {baseline.get('benchmark')!r}")
+            regressions = compare_to_baseline(rows, baseline["rows"], options["tolerance"])
+            if regressions:
+                raise CommandError("Regresiones respecto a la línea base:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base"))
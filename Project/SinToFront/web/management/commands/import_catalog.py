@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from web.catalog_import import BUILDERS, FORMATS, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = "Importa catálogo, playlists o eventos de escucha desde CSV/JSONL por lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(BUILDERS))
+        parser.add_argument("path", help="Fichero .csv o .jsonl (admite .gz)")
+        parser.add_argument("--format", choices=FORMATS, help="Por defecto se deduce de la extensión")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Omite filas que violan restricciones únicas (reimportaciones)",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        imported = 0
+        try:
+            rows = read_rows(options["path"], options["format"])
+            for count in import_rows(options["kind"], rows, options["batch_size"], options["ignore_conflicts"]):
+                imported += count
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{imported} filas")
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"{exc} ({imported} filas ya importadas)")
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported} filas ({options['kind']}) importadas en {elapsed:.2f}s "
+            f"({imported / elapsed if elapsed else 0:.0f} filas/s)"
+        ))
@@ -0,0 +1,77 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from web.collaborative import load_engine, model_directory, set_default_engine
+from web.models import PrecomputedRecommendation
+from web.precompute import candidate_user_ids, compute_chunk, init_worker
+from web.recommendation_system import PrecomputedRecommendationStore
+from web.similarity_index import get_default_index
+
+
+class Command(BaseCommand):
+    help = "Precalcula el top-N de recomendaciones de cada usuario en un pool de procesos"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--strategy", default="hybrid")
+        parser.add_argument("--top-n", type=int, default=10)
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Solo usuarios sin resultado vigente (sus datos cambiaron desde la última ejecución)",
+        )
+
+    def handle(self, *args, **options):
+        strategy = options["strategy"]
+        # Modelos entrenados con los datos persistidos antes de crear el pool:
+        # con fork los workers los heredan; con spawn (y los servidores web)
+        # cargan el modelo guardado en el primer uso
+        engine = load_engine()
+        directory = model_directory()
+        if directory:
+            engine.save(directory)
+        set_default_engine(engine)
+        get_default_index()
+        user_ids = candidate_user_ids()
+        if options["incremental"]:
+            # Los cambios de preferencias/escuchas borran la fila del usuario
+            fresh = set(
+                PrecomputedRecommendation.objects.filter(strategy=strategy)
+                .values_list("user_id", flat=True)
+            )
+            user_ids = [user_id for user_id in user_ids if user_id not in fresh]
+
+        chunk_size = options["chunk_size"]
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+        compute = partial(compute_chunk, strategy, top_n=options["top_n"])
+        store = PrecomputedRecommendationStore()
+
+        start = time.perf_counter()
+        saved = 0
+        if options["processes"] > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(
+                max_workers=options["processes"],
+                initializer=init_worker,
+                initargs=(os.environ["DJANGO_SETTINGS_MODULE"],),
+            ) as executor:
+                for results in executor.map(compute, chunks):
+                    saved += self._save(store, strategy, results)
+        else:
+            for chunk in chunks:
+                saved += self._save(store, strategy, compute(chunk))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{saved} de {len(user_ids)} usuarios precalculados ({strategy}) en {time.perf_counter() - start:.2f}s"
+        ))
+        if saved < len(user_ids):
+            self.stdout.write(f"{len(user_ids) - saved} usuarios sin resultado completo: se calculan en vivo")
+
+    def _save(self, store, strategy, results):
+        with transaction.atomic():
+            return store.save_many(strategy, results)
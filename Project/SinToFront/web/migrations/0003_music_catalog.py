@@ -0,0 +1,110 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0002_precomputed_recommendation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Artist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Playlist',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('description', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='playlists', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Song',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('genre', models.CharField(blank=True, max_length=50)),
+                ('duration_seconds', models.PositiveIntegerField(blank=True, null=True)),
+                ('release_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('artist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='songs', to='web.artist')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlaylistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('added_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('playlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='web.playlist')),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='playlist_entries', to='web.song')),
+            ],
+            options={
+                'ordering': ['playlist', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='songs',
+            field=models.ManyToManyField(related_name='playlists', through='web.PlaylistEntry', to='web.song'),
+        ),
+        migrations.CreateModel(
+            name='ListeningEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('plays', models.PositiveIntegerField(default=1)),
+                ('listened_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listening_events', to='web.song')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['genre', '-created_at'], name='song_genre_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['-created_at'], name='song_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='song',
+            index=models.Index(fields=['artist', '-release_date'], name='song_artist_release_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='playlistentry',
+            constraint=models.UniqueConstraint(fields=('playlist', 'position'), name='unique_playlist_position'),
+        ),
+        migrations.AddIndex(
+            model_name='playlist',
+            index=models.Index(fields=['user', '-created_at'], name='playlist_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listeningevent',
+            index=models.Index(fields=['user_id', '-listened_at'], name='listening_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listeningevent',
+            index=models.Index(fields=['listened_at'], name='listening_time_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# SQL congelado en la migración: no depende de cambios posteriores en web.search
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE web_song_fts USING fts5(
+        title, artist,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER web_song_fts_insert AFTER INSERT ON web_song BEGIN
+        INSERT INTO web_song_fts(rowid, title, artist)
+        VALUES (new.id, new.title, (SELECT name FROM web_artist WHERE id = new.artist_id));
+    END
+    """,
+    """
+    CREATE TRIGGER web_song_fts_delete AFTER DELETE ON web_song BEGIN
+        DELETE FROM web_song_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER web_song_fts_update AFTER UPDATE OF id, title, artist_id ON web_song BEGIN
+        DELETE FROM web_song_fts WHERE rowid = old.id;
+        INSERT INTO web_song_fts(rowid, title, artist)
+        VALUES (new.id, new.title, (SELECT name FROM web_artist WHERE id = new.artist_id));
+    END
+    """,
+    """
+    CREATE TRIGGER web_artist_fts_update AFTER UPDATE OF name ON web_artist BEGIN
+        UPDATE web_song_fts SET artist = new.name
+        WHERE rowid IN (SELECT id FROM web_song WHERE artist_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO web_song_fts(rowid, title, artist)
+    SELECT web_song.id, web_song.title, web_artist.name
+    FROM web_song JOIN web_artist ON web_artist.id = web_song.artist_id
+    """,
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS web_artist_fts_update",
+    "DROP TRIGGER IF EXISTS web_song_fts_update",
+    "DROP TRIGGER IF EXISTS web_song_fts_delete",
+    "DROP TRIGGER IF EXISTS web_song_fts_insert",
+    "DROP TABLE IF EXISTS web_song_fts",
+]
+
+
+def _run(statements):
+    def apply(apps, schema_editor):
+        # FTS5 es específico de SQLite; en otros motores la búsqueda usa icontains
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0003_music_catalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FTS_SCHEMA), _run(FTS_DROP)),
+    ]
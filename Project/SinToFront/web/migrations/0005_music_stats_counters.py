@@ -0,0 +1,49 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_playlist_counters(apps, schema_editor):
+    """Contadores de las playlists existentes (UserMusicStats se calcula al leerse)"""
+    Playlist = apps.get_model('web', 'Playlist')
+    PlaylistEntry = apps.get_model('web', 'PlaylistEntry')
+    counters = {}
+    rows = PlaylistEntry.objects.values_list('playlist_id', 'song__genre').annotate(n=Count('id')).order_by()
+    for playlist_id, genre, n in rows.iterator():
+        song_count, genres = counters.setdefault(playlist_id, [0, {}])
+        counters[playlist_id][0] = song_count + n
+        if genre:
+            genres[genre] = genres.get(genre, 0) + n
+    for playlist_id, (song_count, genres) in counters.items():
+        Playlist.objects.filter(id=playlist_id).update(song_count=song_count, genre_counts=genres)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('web', '0004_song_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMusicStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='music_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('playlist_count', models.PositiveIntegerField(default=0)),
+                ('song_count', models.PositiveIntegerField(default=0)),
+                ('genre_counts', models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='genre_counts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='song_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_playlist_counters, migrations.RunPython.noop),
+    ]
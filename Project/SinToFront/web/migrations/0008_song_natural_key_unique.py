@@ -0,0 +1,51 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_songs(apps, schema_editor):
+    """Une las canciones repetidas (artista, título) en la de menor id antes de exigir unicidad"""
+    Song = apps.get_model('web', 'Song')
+    PlaylistEntry = apps.get_model('web', 'PlaylistEntry')
+    ListeningEvent = apps.get_model('web', 'ListeningEvent')
+    db = schema_editor.connection.alias
+    duplicates = list(
+        Song.objects.using(db).order_by().values('artist_id', 'title')
+        .annotate(keep=Min('id'), n=Count('id')).filter(n__gt=1)
+    )
+    for row in duplicates:
+        extra = Song.objects.using(db).filter(artist_id=row['artist_id'], title=row['title']).exclude(id=row['keep'])
+        # Las entradas y escuchas pasan a la canción conservada (los contadores no cambian)
+        PlaylistEntry.objects.using(db).filter(song__in=extra).update(song_id=row['keep'])
+        ListeningEvent.objects.using(db).filter(song__in=extra).update(song_id=row['keep'])
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0007_task_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_songs, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='song',
+            name='song_artist_title_idx',
+        ),
+        # En SQLite, AddConstraint rehace web_song y rompe los triggers FTS de 0004;
+        # un índice único impone lo mismo sin copiar la tabla
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX "unique_song_artist_title" ON "web_song" ("artist_id", "title")',
+                    'DROP INDEX "unique_song_artist_title"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='song',
+                    constraint=models.UniqueConstraint(fields=('artist', 'title'), name='unique_song_artist_title'),
+                ),
+            ],
+        ),
+    ]
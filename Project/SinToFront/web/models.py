@@ -1,4 +1,10 @@
-from django.db import models
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Func, Max, Subquery
+from django.db.models.functions import Coalesce, Greatest, Lower
 from django.utils import timezone
 
 
@@ -9,6 +15,25 @@ class TaskQuerySet(models.QuerySet):
     def by_status(self, status: str):
         return self.filter(status=status)
 
+    def move_to(self, status: str, from_statuses: Optional[Iterable[str]] = None) -> int:
+        """
+        Cambia el estado con un único UPDATE y devuelve las filas afectadas
+
+        La condición sobre el estado actual va en el propio WHERE, así que el
+        cambio es atómico aunque otra petición mueva las mismas tareas.
+        """
+        statuses = [status] if from_statuses is None else [status, *from_statuses]
+        invalid = set(statuses) - set(Task.Status.values)
+        if invalid:
+            raise ValueError(f"Estado no válido: {', '.join(sorted(map(str, invalid)))}")
+        queryset = self.exclude(status=status)
+        if from_statuses is not None:
+            queryset = queryset.filter(status__in=statuses[1:])
+        return queryset.update(status=status, updated_at=timezone.now())
+
+    def archive(self) -> int:
+        return self.move_to(Task.Status.ARCHIVED)
+
 
 class TaskManager(models.Manager):
     def get_queryset(self):
@@ -20,6 +45,9 @@ class TaskManager(models.Manager):
     def by_status(self, status: str):
         return self.get_queryset().by_status(status)
 
+    def move_to(self, status: str, from_statuses: Optional[Iterable[str]] = None) -> int:
+        return self.get_queryset().move_to(status, from_statuses)
+
 
 class Task(models.Model):
     class Status(models.TextChoices):
@@ -42,7 +70,341 @@ class Task(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Listados por estado/activos en orden de creación (con id como desempate del cursor)
+            models.Index(fields=["status", "-created_at", "-id"], name="task_status_created_idx"),
+            # active() excluye un estado, lo que el índice anterior no puede servir ordenado
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=~models.Q(status="ARCHIVED"),
+                name="task_active_created_idx",
+            ),
+            # Orden por título sin distinguir mayúsculas
+            models.Index(Lower("title"), "id", name="task_title_lower_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} ({self.status})"
 
+
+
+class PrecomputedRecommendationQuerySet(models.QuerySet):
+    def for_user(self, user_id: int, strategy: str):
+        return self.filter(user_id=user_id, strategy=strategy)
+
+    def for_users(self, user_ids, strategy: str):
+        return self.filter(user_id__in=list(user_ids), strategy=strategy)
+
+    def invalidate_users(self, user_ids):
+        """Borra los resultados de usuarios cuyos datos cambiaron"""
+        return self.filter(user_id__in=list(user_ids)).delete()
+
+
+class PrecomputedRecommendation(models.Model):
+    """Top-N por usuario y estrategia, empaquetado como arrays binarios"""
+
+    user_id = models.BigIntegerField()
+    strategy = models.CharField(max_length=30)
+    song_ids = models.BinaryField()  # int64 little-endian
+    scores = models.BinaryField()  # float32 little-endian
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    objects = PrecomputedRecommendationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user_id", "strategy"], name="unique_precomputed_user_strategy"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} ({self.strategy})"
+
+
+
+class ArtistQuerySet(models.QuerySet):
+    def ids_for(self, names: Iterable[str]) -> Dict[str, int]:
+        """{nombre: id} de los artistas, creando los que falten (tres consultas como máximo)"""
+        names = set(names)
+        ids = dict(self.filter(name__in=names).values_list("name", "id"))
+        missing = names - ids.keys()
+        if missing:
+            self.bulk_create([Artist(name=name) for name in missing], ignore_conflicts=True)
+            ids.update(self.filter(name__in=missing).values_list("name", "id"))
+        return ids
+
+
+class Artist(models.Model):
+    name = models.CharField(max_length=200, unique=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = ArtistQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Song(models.Model):
+    title = models.CharField(max_length=200)
+    artist = models.ForeignKey(Artist, on_delete=models.CASCADE, related_name="songs")
+    genre = models.CharField(max_length=50, blank=True)
+    duration_seconds = models.PositiveIntegerField(null=True, blank=True)
+    release_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # GenreFilter + orden por defecto; DateRangeFilter usa el prefijo de created_at
+            models.Index(fields=["genre", "-created_at"], name="song_genre_created_idx"),
+            models.Index(fields=["-created_at"], name="song_created_idx"),
+            # Discografía de un artista por fecha (frescura); cubre también las búsquedas por FK
+            models.Index(fields=["artist", "-release_date"], name="song_artist_release_idx"),
+        ]
+        constraints = [
+            # Clave natural de las altas masivas (get_or_create_many); su índice sirve las búsquedas
+            models.UniqueConstraint(fields=["artist", "title"], name="unique_song_artist_title"),
+        ]
+
+    def __str__(self) -> str:
+        return self.title
+
+
+def genre_histograms(entries, group_field: str):
+    """{grupo: (canciones, {género: canciones})} a partir de una única consulta agregada"""
+    totals: Dict[int, int] = defaultdict(int)
+    genres: Dict[int, Counter] = defaultdict(Counter)
+    rows = entries.values_list(group_field, "song__genre").annotate(n=Count("id")).order_by()
+    for group, genre, n in rows.iterator():
+        totals[group] += n
+        if genre:
+            genres[group][genre] += n
+    return {group: (total, dict(genres[group])) for group, total in totals.items()}
+
+
+class GenreCountsDelta(Func):
+    """
+    Suma deltas a un histograma de géneros JSON dentro del UPDATE (SQLite JSON1)
+
+    Cada contador se lee con json_each (la clave puede ser cualquier texto) y
+    se escribe con json_patch; los que llegan a 0 se eliminan (valor null).
+    """
+
+    output_field = models.JSONField()
+
+    def __init__(self, field: str, deltas: Dict[str, int]):
+        super().__init__(F(field))
+        self.deltas = deltas
+
+    def as_sql(self, compiler, connection, **extra_context):
+        field_sql, field_params = compiler.compile(self.source_expressions[0])
+        count = f"(COALESCE((SELECT value FROM json_each({field_sql}) WHERE key = %s), 0) + %s)"
+        pairs, params = [], []
+        for genre, delta in self.deltas.items():
+            pairs.append(f"%s, CASE WHEN {count} > 0 THEN {count} ELSE NULL END")
+            count_params = [*field_params, genre, delta]
+            params += [genre, *count_params, *count_params]
+        return f"json_patch({field_sql}, json_object({', '.join(pairs)}))", [*field_params, *params]
+
+
+def counter_updates(counts: Dict[str, int], genres: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Expresiones para update(): contadores con F() (sin bajar de 0) y el histograma de géneros"""
+    updates: Dict[str, Any] = {
+        field: Greatest(F(field) + delta, 0) for field, delta in counts.items() if delta
+    }
+    genres = {genre: delta for genre, delta in (genres or {}).items() if genre and delta}
+    if genres:
+        updates["genre_counts"] = GenreCountsDelta("genre_counts", genres)
+    return updates
+
+
+class PlaylistQuerySet(models.QuerySet):
+    def apply(self, songs: int = 0, genres: Optional[Dict[str, int]] = None) -> int:
+        """Suma un cambio incremental a los contadores de las playlists, en un UPDATE sin leerlas"""
+        updates = counter_updates({"song_count": songs}, genres)
+        return self.update(**updates) if updates else 0
+
+    def rebuild_counters(self, chunk_size: int = 1000):
+        """Recalcula song_count y genre_counts (tras cargas masivas que no emiten señales)"""
+        ids = self.order_by("pk").values_list("pk", flat=True)
+        chunk = list(ids[:chunk_size])
+        while chunk:
+            histograms = genre_histograms(PlaylistEntry.objects.filter(playlist_id__in=chunk), "playlist_id")
+            playlists = [
+                Playlist(id=playlist_id, song_count=histograms.get(playlist_id, (0, {}))[0],
+                         genre_counts=histograms.get(playlist_id, (0, {}))[1])
+                for playlist_id in chunk
+            ]
+            Playlist.objects.bulk_update(playlists, ["song_count", "genre_counts"])
+            # Paginación por clave: cada bloque es una búsqueda por índice, sin OFFSET
+            chunk = list(ids.filter(pk__gt=chunk[-1])[:chunk_size])
+
+
+class Playlist(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="playlists")
+    name = models.CharField(max_length=120)
+    description = models.TextField(blank=True)
+    songs = models.ManyToManyField(Song, through="PlaylistEntry", related_name="playlists")
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Contadores desnormalizados, mantenidos por web.signals
+    song_count = models.PositiveIntegerField(default=0)
+    genre_counts = models.JSONField(default=dict, blank=True)
+
+    objects = PlaylistQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="playlist_user_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    def append(self, song) -> "PlaylistEntry":
+        """
+        Añade la canción al final de la playlist
+
+        La posición se calcula dentro del propio INSERT (subconsulta): dos
+        altas concurrentes no pueden leer el mismo máximo.
+        """
+        last = PlaylistEntry.objects.filter(playlist=self).order_by().values("playlist").annotate(
+            next=Max("position") + 1
+        ).values("next")
+        entry = PlaylistEntry.objects.create(
+            playlist=self, song=song, position=Coalesce(Subquery(last), 0)
+        )
+        entry.refresh_from_db(fields=["position"])
+        return entry
+
+    def remove(self, entry_id: int) -> bool:
+        """Quita una entrada concreta (no otras apariciones de la misma canción)"""
+        entry = self.entries.filter(id=entry_id).first()
+        if entry is None:
+            return False
+        entry.delete()
+        return True
+
+
+class PlaylistEntry(models.Model):
+    """Canción en una posición concreta de una playlist (admite repeticiones)"""
+
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE, related_name="entries")
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name="playlist_entries")
+    position = models.PositiveIntegerField()
+    added_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ["playlist", "position"]
+        constraints = [
+            # Su índice sirve el recorrido ordenado de una playlist
+            models.UniqueConstraint(fields=["playlist", "position"], name="unique_playlist_position"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.playlist_id}[{self.position}] = {self.song_id}"
+
+
+class ListeningEventQuerySet(models.QuerySet):
+    def for_user(self, user_id: int):
+        return self.filter(user_id=user_id)
+
+    def since(self, moment):
+        return self.filter(listened_at__gt=moment)
+
+    def as_triples(self, chunk_size: int = 10_000):
+        """Eventos (user_id, song_id, plays) en streaming, para entrenar el motor colaborativo"""
+        return self.values_list("user_id", "song_id", "plays").iterator(chunk_size=chunk_size)
+
+
+class ListeningEvent(models.Model):
+    """Escucha de una canción; user_id no es FK porque el historial puede venir de fuera"""
+
+    user_id = models.BigIntegerField()
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name="listening_events")
+    plays = models.PositiveIntegerField(default=1)
+    listened_at = models.DateTimeField(default=timezone.now)
+
+    objects = ListeningEventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Historial y actividad reciente de un usuario
+            models.Index(fields=["user_id", "-listened_at"], name="listening_user_time_idx"),
+            # Carga incremental de eventos nuevos para el modelo colaborativo
+            models.Index(fields=["listened_at"], name="listening_time_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} -> {self.song_id} ({self.plays})"
+
+
+
+class UserMusicStatsQuerySet(models.QuerySet):
+    def for_user(self, user_id: int) -> "UserMusicStats":
+        """Estadísticas del usuario; si no existen (o se invalidaron) se reconstruyen"""
+        stats = self.filter(user_id=user_id).first()
+        if stats is None:
+            self.rebuild([user_id])
+            stats = self.get(user_id=user_id)
+        return stats
+
+    def rebuild(self, user_ids: Iterable[int]):
+        """
+        Recalcula las estadísticas de los usuarios con dos consultas agregadas
+
+        Para invalidar muchas basta con borrar sus filas (p. ej. tras una carga
+        masiva): se reconstruyen al leerlas.
+        """
+        user_ids = list(user_ids)
+        playlists = Playlist.objects.filter(user_id__in=user_ids)
+        playlist_counts = dict(playlists.values_list("user_id").annotate(n=Count("id")).order_by())
+        histograms = genre_histograms(PlaylistEntry.objects.filter(playlist__in=playlists), "playlist__user_id")
+        stats = [
+            UserMusicStats(
+                user_id=user_id,
+                playlist_count=playlist_counts.get(user_id, 0),
+                song_count=histograms.get(user_id, (0, {}))[0],
+                genre_counts=histograms.get(user_id, (0, {}))[1],
+            )
+            for user_id in user_ids
+        ]
+        self.bulk_create(
+            stats,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["playlist_count", "song_count", "genre_counts"],
+        )
+
+    def apply(self, playlists: int = 0, songs: int = 0, genres: Optional[Dict[str, int]] = None) -> int:
+        """
+        Suma un cambio incremental a las estadísticas del queryset, en un UPDATE sin leerlas
+
+        Los usuarios sin fila no cambian: se reconstruirá completa al leerla.
+        """
+        updates = counter_updates({"playlist_count": playlists, "song_count": songs}, genres)
+        return self.update(**updates) if updates else 0
+
+
+class UserMusicStats(models.Model):
+    """Contadores e histograma de géneros de las playlists de un usuario"""
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                primary_key=True, related_name="music_stats")
+    playlist_count = models.PositiveIntegerField(default=0)
+    song_count = models.PositiveIntegerField(default=0)
+    genre_counts = models.JSONField(default=dict, blank=True)
+
+    objects = UserMusicStatsQuerySet.as_manager()
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.playlist_count} playlists, {self.song_count} canciones"
+
+    @property
+    def favorite_genre(self) -> Optional[str]:
+        if not self.genre_counts:
+            return None
+        return max(self.genre_counts.items(), key=lambda item: (item[1], item[0]))[0]
@@ -0,0 +1,165 @@
+"""
+Paginación por cursor (keyset)
+
+En vez de OFFSET, cada página filtra por las claves de orden de la última
+fila vista (`WHERE (created_at, id) < (...)`), de modo que con un índice
+que cubra el orden la página N cuesta lo mismo que la primera. El cursor es
+opaco para el cliente: las claves codificadas en base64 más la dirección.
+
+El orden debe terminar en un campo único (normalmente la pk) y las claves no
+pueden ser nulas. Los nombres pueden ser anotaciones del queryset (p. ej.
+Lower("title")), pero no búsquedas a través de relaciones.
+"""
+import base64
+import datetime
+import decimal
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.db import models
+from django.db.models import Q
+from django.http import Http404
+
+CURSOR_NEXT = "n"
+CURSOR_PREVIOUS = "p"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    # isoformat conserva los microsegundos (DjangoJSONEncoder los recorta)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, models.Model):
+        return value.pk
+    return value
+
+
+def encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    payload = json.dumps([direction, [_encode_value(value) for value in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[str, List[Any]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Cursor no válido") from exc
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Cursor no válido")
+    return direction, values
+
+
+class KeysetPage:
+    """Página de resultados con los cursores para moverse a la siguiente y a la anterior"""
+
+    def __init__(self, object_list: List, next_cursor: Optional[str], previous_cursor: Optional[str]):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator:
+    """Pagina un queryset por las claves de `ordering` (nombres con '-' para descendente)"""
+
+    def __init__(self, queryset, ordering: Sequence[str], per_page: int):
+        if not ordering:
+            raise ValueError("La paginación por cursor necesita un orden")
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.fields = [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+        self.per_page = per_page
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        if not cursor:
+            rows, more = self._fetch(self.queryset, self.ordering)
+            return KeysetPage(rows, self._cursor(CURSOR_NEXT, rows[-1]) if more else None, None)
+
+        direction, values = decode_cursor(cursor, len(self.fields))
+        backwards = direction == CURSOR_PREVIOUS
+        ordering = [name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering] \
+            if backwards else self.ordering
+        rows, more = self._fetch(self.queryset.filter(self._beyond(values, backwards)), ordering)
+        if not rows:
+            return KeysetPage(rows, None, None)
+        if backwards:
+            rows.reverse()
+            return KeysetPage(rows, self._cursor(CURSOR_NEXT, rows[-1]),
+                              self._cursor(CURSOR_PREVIOUS, rows[0]) if more else None)
+        return KeysetPage(rows, self._cursor(CURSOR_NEXT, rows[-1]) if more else None,
+                          self._cursor(CURSOR_PREVIOUS, rows[0]))
+
+    def _fetch(self, queryset, ordering) -> Tuple[List, bool]:
+        """Una página más una fila para saber si hay más"""
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        return rows[:self.per_page], len(rows) > self.per_page
+
+    def _cursor(self, direction: str, row) -> str:
+        return encode_cursor(direction, [getattr(row, name) for name, _ in self.fields])
+
+    def _beyond(self, values: List[Any], backwards: bool) -> Q:
+        """
+        Filas posteriores a `values` en el orden (anteriores si `backwards`)
+
+        (a, b, id) > (va, vb, vid) se expande como a > va OR (a = va AND (...)),
+        con una condición de rango redundante sobre `a` para que el planificador
+        use el índice.
+        """
+        condition = None
+        for (name, descending), value in reversed(list(zip(self.fields, values))):
+            lookup = "lt" if descending != backwards else "gt"
+            strict = Q(**{f"{name}__{lookup}": value})
+            condition = strict if condition is None else strict | (Q(**{name: value}) & condition)
+        (name, descending), value = self.fields[0], values[0]
+        return Q(**{f"{name}__{'lt' if descending != backwards else 'gt'}e": value}) & condition
+
+
+class KeysetPaginationMixin:
+    """
+    Sustituye la paginación por OFFSET de ListView por cursores
+
+    Usa `paginate_by` como tamaño de página y `get_keyset_ordering()` como
+    orden; en el contexto `page_obj` expone next_cursor/previous_cursor.
+    """
+
+    cursor_kwarg = "cursor"
+    keyset_ordering: Optional[Sequence[str]] = None
+
+    def get_keyset_ordering(self) -> List[str]:
+        if self.keyset_ordering:
+            return list(self.keyset_ordering)
+        ordering = list(self.get_ordering() or self.model._meta.ordering or ["-pk"])
+        if ordering[-1].lstrip("-") not in ("pk", "id"):
+            ordering.append("-pk" if ordering[0].startswith("-") else "pk")
+        return ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.get_keyset_ordering(), page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as exc:
+            raise Http404(str(exc))
+        return paginator, page, page.object_list, page.has_other_pages()
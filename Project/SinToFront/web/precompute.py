@@ -0,0 +1,46 @@
+"""
+Cálculo offline de recomendaciones por usuario (ver manage.py precompute_recommendations)
+
+Las funciones de este módulo se ejecutan en procesos del pool, por eso no
+importan modelos a nivel de módulo: con el método `spawn` el worker debe
+inicializar Django antes de tocar el ORM.
+"""
+import os
+from types import SimpleNamespace
+from typing import List, Sequence, Tuple
+
+from .records import Recommendation
+
+
+def init_worker(settings_module: str):
+    """Inicializa Django en el worker y descarta conexiones heredadas del padre"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+    from django.db import connections
+
+    connections.close_all()
+
+
+def compute_chunk(strategy_type: str, user_ids: Sequence[int],
+                  top_n: int) -> List[Tuple[int, List[Recommendation]]]:
+    """Ejecuta el pipeline de recomendación para un bloque de usuarios"""
+    from .recommendation_system import default_pipelines
+
+    pipeline = default_pipelines.get(strategy_type)
+    results = []
+    for user_id in user_ids:
+        user = SimpleNamespace(id=user_id, username=f"user_{user_id}")
+        results.append((user_id, pipeline.run(user, {})[0][:top_n]))
+    return results
+
+
+def candidate_user_ids() -> List[int]:
+    """Usuarios registrados más los usuarios con historial en el modelo colaborativo"""
+    from django.contrib.auth.models import User
+    from .collaborative import get_default_engine
+
+    user_ids = set(User.objects.values_list("id", flat=True))
+    user_ids.update(get_default_engine().user_ids.tolist())
+    return sorted(user_ids)
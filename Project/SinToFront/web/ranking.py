@@ -0,0 +1,88 @@
+"""
+Recorridos perezosos de rankings
+
+Las estrategias exponen sus candidatos como iteradores en orden descendente
+de score; quien consume (filtros, diversidad) tira de ellos hasta completar
+la página, de modo que el trabajo de ordenación es proporcional a k y no al
+número de candidatos.
+"""
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+def iter_ranked(items: np.ndarray, scores: np.ndarray, batch_size: int = 10) -> Iterator[Tuple[int, float]]:
+    """
+    (item, score) en orden descendente, ordenando por bloques
+
+    Cada bloque se separa del resto con argpartition y solo él se ordena; el
+    tamaño se duplica en cada paso. Los scores no finitos se omiten.
+    """
+    remaining = np.flatnonzero(np.isfinite(scores))
+    while len(remaining):
+        k = min(batch_size, len(remaining))
+        if len(remaining) > k:
+            partition = np.argpartition(-scores[remaining], k - 1)
+            head, remaining = remaining[partition[:k]], remaining[partition[k:]]
+        else:
+            head, remaining = remaining, remaining[:0]
+        head = head[np.argsort(-scores[head], kind="stable")]
+        yield from zip(items[head].tolist(), scores[head].tolist())
+        batch_size *= 2
+
+
+class CandidateStream:
+    """
+    Iterador con buffer: permite leer varias veces los primeros n elementos
+
+    Iterar sobre el flujo devuelve una vista independiente que lee del buffer
+    y solo avanza la fuente al pasar del final: así varias peticiones pueden
+    compartir los candidatos de una misma consulta.
+
+    La fuente se avanza bajo un lock: varios hilos (también uno abandonado
+    por _take_within) pueden leer el mismo flujo a la vez.
+    """
+
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self._buffer: List = []
+        self._lock = threading.Lock()
+        self.exhausted = False
+
+    def take(self, n: int, deadline: Optional[float] = None) -> List:
+        """
+        Primeros n elementos (menos si el flujo se agota)
+
+        Con `deadline` (time.monotonic()) deja de avanzar la fuente al pasarlo
+        y devuelve los que haya: quien lo ejecuta en otro hilo lo recupera a
+        tiempo aunque nadie espere ya el resultado.
+        """
+        self._fill(n, deadline)
+        return self._buffer[:n]
+
+    def __iter__(self) -> Iterator:
+        position = 0
+        while self._fill(position + 1):
+            yield self._buffer[position]
+            position += 1
+
+    def _fill(self, n: int, deadline: Optional[float] = None) -> bool:
+        while len(self._buffer) < n and not self.exhausted:
+            if deadline is None:
+                self._lock.acquire()
+            else:
+                # Tampoco se espera al lock más allá del plazo
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._lock.acquire(timeout=remaining):
+                    break
+            try:
+                # Otro hilo pudo avanzar la fuente mientras se esperaba
+                if len(self._buffer) < n and not self.exhausted:
+                    self._buffer.append(next(self._iterator))
+            except StopIteration:
+                self.exhausted = True
+            finally:
+                self._lock.release()
+        return len(self._buffer) >= n
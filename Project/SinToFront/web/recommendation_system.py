@@ -2,12 +2,30 @@
 Sistema de recomendaciones de música con patrones de diseño
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from enum import Enum
+import hashlib
+import itertools
+import json
 import random
+import threading
 import time
-from django.db import models
+from contextlib import contextmanager
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import numpy as np
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .collaborative import ItemSimilarityEngine, get_default_engine, load_engine, set_default_engine
+from .events import ObserverEventBus, RecommendationEvent
+from .fusion import ScoreFusion
+from .interfaces import CacheInterface
+from .models import ListeningEvent, PrecomputedRecommendation, Song
+from .ranking import CandidateStream
+from .records import UNKNOWN_ARTIST, Recommendation, from_rows, to_rows
+from .similarity_index import SongVectorIndex, get_default_index
+from .services import CacheFactory, InMemoryCache
 
 
 # 1. STRATEGY PATTERN para Algoritmos de Recomendación
@@ -15,57 +33,112 @@ class RecommendationStrategy(ABC):
     """Estrategia base para algoritmos de recomendación"""
     
     @abstractmethod
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
         pass
+    
+    def stream(self, user, context: Dict[str, Any]) -> Iterator[Recommendation]:
+        """Candidatos en orden descendente de score, generados bajo demanda"""
+        return iter(self.recommend(user, context))
+    
+    def recommend_within(self, user, context: Dict[str, Any], deadline: float) -> List[Recommendation]:
+        """Como recommend, pero deja de generar candidatos al pasar `deadline` (time.monotonic())"""
+        return self.recommend(user, context)
+    
+    def stream_batch(self, requests, k: int, deadline: Optional[float] = None) -> List[CandidateStream]:
+        """Flujos de varias peticiones (user, context) con la primera página de k ya leída"""
+        streams = [CandidateStream(self.stream(user, context)) for user, context in requests]
+        for stream in streams:
+            stream.take(k, deadline)
+        return streams
+    
+    def get_execution_report(self) -> Optional[Dict[str, Any]]:
+        """Metadatos de la última ejecución en el hilo actual (si la estrategia los genera)"""
+        return None
 
 
 class CollaborativeFilteringStrategy(RecommendationStrategy):
-    """Filtrado colaborativo"""
+    """Filtrado colaborativo item-item sobre el historial de escucha"""
     
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
-        # Simular filtrado colaborativo
-        similar_users = self._find_similar_users(user)
-        recommendations = []
-        
-        for similar_user in similar_users:
-            user_songs = self._get_user_songs(similar_user)
-            recommendations.extend(user_songs)
-        
-        return self._remove_duplicates(recommendations)[:10]
+    def __init__(self, engine: Optional[ItemSimilarityEngine] = None, limit: int = 10):
+        self.engine = engine
+        self.limit = limit
     
-    def _find_similar_users(self, user):
-        # Lógica para encontrar usuarios similares
-        return [f"user_{i}" for i in range(3)]
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
+        return list(itertools.islice(self.stream(user, context), self.limit))
     
-    def _get_user_songs(self, user_id):
-        # Lógica para obtener canciones del usuario
+    def recommend_within(self, user, context: Dict[str, Any], deadline: float) -> List[Recommendation]:
+        return CandidateStream(self.stream(user, context)).take(self.limit, deadline)
+    
+    def stream(self, user, context: Dict[str, Any]) -> Iterator[Recommendation]:
+        engine = self.engine if self.engine is not None else get_default_engine()
+        best = None
+        for song_id, score in engine.iter_recommendations(user.id):
+            # Scores relativos al mejor candidato para poder combinarlos con otras estrategias
+            if best is None:
+                best = score or 1.0
+            yield Recommendation.from_metadata(song_id, engine.song_metadata.get(song_id, {}), score / best)
+    
+    def stream_batch(self, requests, k: int, deadline: Optional[float] = None) -> List[CandidateStream]:
+        # Primera página de todos los usuarios en una sola pasada del motor
+        engine = self.engine if self.engine is not None else get_default_engine()
+        pages = engine.recommend_batch([user.id for user, _ in requests], n=k)
         return [
-            {"title": f"Song {i}", "artist": f"Artist {i}", "score": random.uniform(0.7, 1.0)}
-            for i in range(5)
+            CandidateStream(self._continue(engine, page, user, context))
+            for page, (user, context) in zip(pages, requests)
         ]
     
-    def _remove_duplicates(self, recommendations):
-        seen = set()
-        unique = []
-        for rec in recommendations:
-            key = (rec["title"], rec["artist"])
-            if key not in seen:
-                seen.add(key)
-                unique.append(rec)
-        return unique
+    def _continue(self, engine, page, user, context):
+        """Página precalculada; si se pide más, el resto del flujo individual sin repetir"""
+        best = (page[0][1] or 1.0) if page else 1.0
+        for song_id, score in page:
+            yield Recommendation.from_metadata(song_id, engine.song_metadata.get(song_id, {}), score / best)
+        seen = {song_id for song_id, _ in page}
+        for rec in itertools.islice(self.stream(user, context), len(page), None):
+            if rec.song_id not in seen:
+                yield rec
 
 
 class ContentBasedStrategy(RecommendationStrategy):
     """Recomendaciones basadas en contenido"""
     
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def __init__(self, index: Optional[SongVectorIndex] = None, limit: int = 10,
+                 n_probe: Optional[int] = None):
+        self.index = index
+        self.limit = limit
+        self.n_probe = n_probe
+    
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
+        return list(itertools.islice(self.stream(user, context), self.limit))
+    
+    def recommend_within(self, user, context: Dict[str, Any], deadline: float) -> List[Recommendation]:
+        return CandidateStream(self.stream(user, context)).take(self.limit, deadline)
+    
+    def stream(self, user, context: Dict[str, Any]) -> Iterator[Recommendation]:
         user_preferences = self._get_user_preferences(user)
         current_song = context.get('current_song')
         
         if current_song:
             return self._recommend_similar_songs(current_song, user_preferences)
         else:
-            return self._recommend_by_preferences(user_preferences)
+            return iter(self._recommend_by_preferences(user_preferences))
+    
+    def stream_batch(self, requests, k: int, deadline: Optional[float] = None) -> List[CandidateStream]:
+        # Las peticiones con la misma canción actual comparten la búsqueda de vecinos
+        index = self.index if self.index is not None else get_default_index()
+        shared: Dict[int, CandidateStream] = {}
+        streams = []
+        for user, context in requests:
+            current_song = context.get('current_song')
+            song_id = index.resolve_song(current_song) if current_song else None
+            if song_id is None:
+                streams.append(CandidateStream(self.stream(user, context)))
+            else:
+                if song_id not in shared:
+                    shared[song_id] = CandidateStream(self._similar_stream(index, song_id))
+                streams.append(CandidateStream(shared[song_id]))
+        for stream in streams:
+            stream.take(k, deadline)
+        return streams
     
     def _get_user_preferences(self, user):
         # Lógica para obtener preferencias del usuario
@@ -76,57 +149,141 @@ class ContentBasedStrategy(RecommendationStrategy):
         }
     
     def _recommend_similar_songs(self, current_song, preferences):
-        # Lógica para recomendar canciones similares
-        return [
-            {"title": f"Similar to {current_song}", "artist": "Similar Artist", "score": 0.9}
-            for _ in range(5)
-        ]
+        # Vecinos aproximados de la canción actual en el índice de vectores
+        index = self.index if self.index is not None else get_default_index()
+        song_id = index.resolve_song(current_song)
+        if song_id is None:
+            yield from self._recommend_by_preferences(preferences)
+            return
+        
+        yield from self._similar_stream(index, song_id)
+    
+    def _similar_stream(self, index, song_id):
+        for similar_id, similarity in index.iter_similar(song_id, n_probe=self.n_probe):
+            yield Recommendation.from_metadata(similar_id, index.song_metadata.get(similar_id, {}), max(similarity, 0.0))
     
     def _recommend_by_preferences(self, preferences):
         # Lógica para recomendar por preferencias
         return [
-            {"title": f"Recommended Song {i}", "artist": f"Artist {i}", "score": 0.8}
+            Recommendation(None, f"Recommended Song {i}", f"Artist {i}", 0.8)
             for i in range(5)
         ]
 
 
+_strategy_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="recommendation")
+
+DEFAULT_DEADLINE = 0.2
+# Tope del plazo de una estrategia para todo un lote (run_batch)
+BATCH_DEADLINE = 1.0
+
+
+def _timed_call(fetch, position, deadline):
+    start = time.perf_counter()
+    recommendations = fetch(position, deadline)
+    return recommendations, time.perf_counter() - start
+
+
+def _take_within(stream: CandidateStream, depth: int, deadline: float):
+    """Página de `depth` candidatos si llega antes de `deadline` (monotonic); si no, None"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    # El hilo del pool deja de leer el flujo al pasar el plazo (cancel() no para una tarea en curso)
+    future = _strategy_executor.submit(stream.take, depth, deadline)
+    try:
+        return future.result(timeout=remaining)
+    except FutureTimeoutError:
+        # El flujo se abandona: no se vuelve a leer de él
+        return None
+
+
+def generate_candidates(strategies, weights, deadlines, user, context, fetch=None):
+    """
+    Ejecuta las estrategias en paralelo en el pool compartido
+    
+    Cada una tiene un presupuesto de latencia (segundos): la que no termina a
+    tiempo o falla se descarta y los pesos restantes se renormalizan.
+    `fetch(i, deadline)` obtiene la lista de la estrategia i y debe dejar de
+    trabajar al pasar `deadline` (time.monotonic()) para liberar su hilo; por
+    defecto es su recommend_within.
+    Devuelve (listas de candidatos, pesos, informe de ejecución).
+    """
+    if fetch is None:
+        fetch = lambda position, deadline: strategies[position].recommend_within(user, context, deadline)
+    started = time.monotonic()
+    futures = [
+        _strategy_executor.submit(_timed_call, fetch, position, started + deadline)
+        for position, deadline in enumerate(deadlines)
+    ]
+    
+    ranked_lists, used_weights, report = [], [], []
+    for strategy, weight, deadline, future in zip(strategies, weights, deadlines, futures):
+        entry = {"name": type(strategy).__name__, "weight": weight, "deadline_ms": deadline * 1000}
+        try:
+            recommendations, elapsed = future.result(timeout=max(0.0, started + deadline - time.monotonic()))
+            entry.update(status="ok", elapsed_ms=elapsed * 1000)
+            ranked_lists.append(recommendations)
+            used_weights.append(weight)
+        except FutureTimeoutError:
+            # Si aún no ha empezado no llega a ejecutarse; si ya corre, para sola en su plazo
+            future.cancel()
+            entry.update(status="timeout")
+        except Exception as e:
+            entry.update(status="error", error=str(e))
+        report.append(entry)
+    
+    total_weight = sum(used_weights)
+    used_weights = [weight / total_weight for weight in used_weights] if total_weight else used_weights
+    return ranked_lists, used_weights, {
+        "strategies": report,
+        "contributors": [entry["name"] for entry in report if entry["status"] == "ok"],
+    }
+
+
 class HybridStrategy(RecommendationStrategy):
-    """Estrategia híbrida que combina múltiples algoritmos"""
+    """
+    Estrategia híbrida que combina múltiples algoritmos
+    
+    Las subestrategias se ejecutan en paralelo con `generate_candidates` y sus
+    listas se combinan con la fusión configurada.
+    """
     
-    def __init__(self, strategies: List[RecommendationStrategy], weights: List[float]):
+    DEFAULT_DEADLINE = DEFAULT_DEADLINE
+    
+    def __init__(self, strategies: List[RecommendationStrategy], weights: List[float],
+                 fusion: Optional[ScoreFusion] = None, deadlines: Optional[List[float]] = None):
         self.strategies = strategies
         self.weights = weights
+        self.fusion = fusion or ScoreFusion()
+        self.deadlines = deadlines or [self.DEFAULT_DEADLINE] * len(strategies)
+        self._local = threading.local()
     
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
-        all_recommendations = []
-        
-        for strategy, weight in zip(self.strategies, self.weights):
-            recommendations = strategy.recommend(user, context)
-            # Aplicar peso a las recomendaciones
-            for rec in recommendations:
-                rec['score'] *= weight
-            all_recommendations.extend(recommendations)
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
+        ranked_lists, weights, self._local.report = generate_candidates(
+            self.strategies, self.weights, self.deadlines, user, context
+        )
         
         # Combinar y ordenar recomendaciones
-        return self._merge_recommendations(all_recommendations)
+        return self._merge_recommendations(ranked_lists, weights)
     
-    def _merge_recommendations(self, recommendations):
-        # Agrupar por canción y sumar scores
-        song_scores = {}
-        for rec in recommendations:
-            key = (rec["title"], rec["artist"])
-            if key in song_scores:
-                song_scores[key]["score"] += rec["score"]
-            else:
-                song_scores[key] = rec
-        
-        # Ordenar por score y retornar top 10
-        sorted_recommendations = sorted(
-            song_scores.values(), 
-            key=lambda x: x["score"], 
-            reverse=True
-        )
-        return sorted_recommendations[:10]
+    def get_execution_report(self) -> Optional[Dict[str, Any]]:
+        return getattr(self._local, "report", None)
+    
+    def _merge_recommendations(self, ranked_lists, weights):
+        # Los pesos se aplican dentro de la fusión: las listas de entrada no se modifican
+        return self.fusion.fuse(ranked_lists, weights)
+
+
+def lookup_song_metadata(song_ids) -> Dict[int, Dict[str, Any]]:
+    """Título/artista de canciones conocidas por los modelos cargados en el proceso"""
+    sources = (get_default_engine().song_metadata, get_default_index().song_metadata)
+    metadata = {}
+    for song_id in song_ids:
+        for source in sources:
+            if song_id in source:
+                metadata[song_id] = source[song_id]
+                break
+    return metadata
 
 
 # 2. FACTORY PATTERN para Crear Estrategias
@@ -143,33 +300,172 @@ class RecommendationStrategyFactory:
             collaborative = CollaborativeFilteringStrategy()
             content = ContentBasedStrategy()
             return HybridStrategy([collaborative, content], [0.6, 0.4])
+        elif strategy_type == "hybrid_rrf":
+            collaborative = CollaborativeFilteringStrategy()
+            content = ContentBasedStrategy()
+            return HybridStrategy([collaborative, content], [0.6, 0.4], ScoreFusion(method="rrf"))
         else:
             raise ValueError(f"Estrategia no soportada: {strategy_type}")
 
 
 # 3. OBSERVER PATTERN para Actualizar Recomendaciones
+class RecommendationCache:
+    """Caché de recomendaciones por (usuario, estrategia, contexto normalizado)"""
+    
+    VERSION_TTL = 7 * 24 * 3600
+    # Cambiar si cambia el formato de las entradas (las antiguas quedan huérfanas)
+    SCHEMA = "rows1"
+    
+    def __init__(self, cache_service: CacheInterface, ttl: int = 300):
+        self.cache_service = cache_service
+        self.ttl = ttl
+    
+    @staticmethod
+    def normalize_context(context: Optional[Dict[str, Any]]) -> str:
+        """Serializa el contexto de forma canónica (claves ordenadas, sin nulos)"""
+        normalized = {k: v for k, v in (context or {}).items() if v is not None}
+        return json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    
+    def build_key(self, user, strategy_type: str, context: Optional[Dict[str, Any]]) -> str:
+        """Construye la clave de caché para una petición de recomendaciones"""
+        digest = hashlib.sha1(self.normalize_context(context).encode("utf-8")).hexdigest()
+        version = self.cache_service.get(self._version_key(user)) or 0
+        return f"recommendations_{self.SCHEMA}_{user.id}_v{version}_{strategy_type}_{digest}"
+    
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Entrada cacheada: {'recommendations': [Recommendation, ...], 'metadata': {...}}"""
+        entry = self.cache_service.get(cache_key)
+        if entry is None:
+            return None
+        return {"recommendations": from_rows(entry["recommendations"]), "metadata": entry["metadata"]}
+    
+    def set(self, cache_key: str, recommendations: List[Recommendation],
+            metadata: Optional[Dict[str, Any]] = None) -> bool:
+        # Tuplas planas: compactas y válidas para cualquier serializador del backend
+        entry = {"recommendations": to_rows(recommendations), "metadata": metadata or {}}
+        return self.cache_service.set(cache_key, entry, ttl=self.ttl)
+    
+    def invalidate_user(self, user) -> bool:
+        """Invalida todas las entradas del usuario cambiando su versión"""
+        # CacheInterface no permite borrar por prefijo: una versión nueva deja
+        # huérfanas las claves anteriores, que expiran solas por TTL
+        return self.cache_service.set(self._version_key(user), time.time_ns(), ttl=self.VERSION_TTL)
+    
+    @staticmethod
+    def _version_key(user) -> str:
+        return f"recommendations_version_{user.id}"
+
+
+class PrecomputedRecommendationStore:
+    """Acceso a la tabla de recomendaciones precalculadas (manage.py precompute_recommendations)"""
+    
+    def get(self, user, strategy_type: str):
+        """(recomendaciones, metadatos) precalculados o None"""
+        return self.get_many([user.id], strategy_type).get(user.id)
+    
+    def get_many(self, user_ids, strategy_type: str) -> Dict[int, Any]:
+        """
+        {user_id: (recomendaciones, metadatos)} de los usuarios con resultado, en una consulta
+        
+        Una fila vacía no cuenta como resultado: el usuario se calcula en vivo.
+        """
+        rows = [
+            row for row in PrecomputedRecommendation.objects.for_users(user_ids, strategy_type)
+            if row.song_ids
+        ]
+        unpacked = [
+            (row, np.frombuffer(row.song_ids, dtype="<i8").tolist(), np.frombuffer(row.scores, dtype="<f4").tolist())
+            for row in rows
+        ]
+        metadata = lookup_song_metadata({song_id for _, song_ids, _ in unpacked for song_id in song_ids})
+        results = {}
+        for row, song_ids, scores in unpacked:
+            recommendations = [
+                Recommendation.from_metadata(song_id, metadata.get(song_id, {}), score)
+                for song_id, score in zip(song_ids, scores)
+            ]
+            results[row.user_id] = (
+                recommendations, {"source": "precomputed", "computed_at": row.computed_at.isoformat()}
+            )
+        return results
+    
+    @staticmethod
+    def is_storable(recommendations) -> bool:
+        """Solo se guardan listas no vacías de canciones del catálogo (sin candidatos de relleno)"""
+        return bool(recommendations) and all(rec.song_id is not None for rec in recommendations)
+    
+    def save_many(self, strategy_type: str, results) -> int:
+        """
+        Guarda en bloque [(user_id, recomendaciones)] reemplazando filas previas
+        
+        Los resultados vacíos o parciales no se guardan (esos usuarios se
+        siguen calculando en vivo). Devuelve el número de filas guardadas.
+        """
+        now = timezone.now()
+        rows = [
+            PrecomputedRecommendation(
+                user_id=user_id,
+                strategy=strategy_type,
+                song_ids=np.asarray([rec.song_id for rec in recommendations], dtype="<i8").tobytes(),
+                scores=np.asarray([rec.score for rec in recommendations], dtype="<f4").tobytes(),
+                computed_at=now,
+            )
+            for user_id, recommendations in results
+            if self.is_storable(recommendations)
+        ]
+        PrecomputedRecommendation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user_id", "strategy"],
+            update_fields=["song_ids", "scores", "computed_at"],
+        )
+        return len(rows)
+    
+    def invalidate_user(self, user):
+        self.invalidate_users([user.id])
+    
+    def invalidate_users(self, user_ids):
+        PrecomputedRecommendation.objects.invalidate_users(user_ids)
+
+
 class RecommendationObserver(ABC):
     """Observador para cambios en recomendaciones"""
     
     @abstractmethod
-    def on_recommendations_updated(self, user, recommendations):
+    def on_recommendations_updated(self, user, recommendations, cache_key: Optional[str] = None,
+                                   metadata: Optional[Dict[str, Any]] = None):
         pass
+    
+    def on_recommendations_batch(self, events: List[RecommendationEvent]):
+        """Lote de eventos entregado por ObserverEventBus"""
+        for event in events:
+            self.on_recommendations_updated(event.user, event.recommendations,
+                                            cache_key=event.cache_key, metadata=event.metadata)
 
 
 class CacheObserver(RecommendationObserver):
     """Observador que actualiza caché"""
     
-    def on_recommendations_updated(self, user, recommendations):
-        cache_key = f"recommendations_{user.id}"
-        # Actualizar caché con nuevas recomendaciones
-        print(f"🔄 Actualizando caché para usuario {user.id}")
+    def __init__(self, cache: RecommendationCache):
+        self.cache = cache
+    
+    def on_recommendations_updated(self, user, recommendations, cache_key: Optional[str] = None,
+                                   metadata: Optional[Dict[str, Any]] = None):
+        if cache_key is not None:
+            self.cache.set(cache_key, recommendations, metadata)
 
 
 class NotificationObserver(RecommendationObserver):
     """Observador que envía notificaciones"""
     
-    def on_recommendations_updated(self, user, recommendations):
+    def on_recommendations_updated(self, user, recommendations, cache_key: Optional[str] = None,
+                                   metadata: Optional[Dict[str, Any]] = None):
         print(f"📧 Enviando notificaciones a usuario {user.id}")
+    
+    def on_recommendations_batch(self, events: List[RecommendationEvent]):
+        # Una notificación por usuario aunque haya varios eventos suyos en el lote
+        user_ids = sorted({event.user.id for event in events})
+        print(f"📧 Enviando notificaciones a {len(user_ids)} usuarios: {user_ids}")
 
 
 # 4. COMMAND PATTERN para Operaciones de Recomendación
@@ -188,10 +484,13 @@ class RecommendationCommand(ABC):
 class UpdateUserPreferencesCommand(RecommendationCommand):
     """Comando para actualizar preferencias del usuario"""
     
-    def __init__(self, user, preferences):
+    def __init__(self, user, preferences, cache: Optional[RecommendationCache] = None,
+                 precomputed_store: Optional[PrecomputedRecommendationStore] = None):
         self.user = user
         self.new_preferences = preferences
         self.old_preferences = None
+        self.cache = cache
+        self.precomputed_store = precomputed_store
     
     def execute(self) -> bool:
         # Guardar preferencias anteriores
@@ -199,14 +498,22 @@ class UpdateUserPreferencesCommand(RecommendationCommand):
         
         # Actualizar preferencias
         self._update_preferences(self.user, self.new_preferences)
+        self._invalidate_recommendations()
         return True
     
     def undo(self) -> bool:
         if self.old_preferences:
             self._update_preferences(self.user, self.old_preferences)
+            self._invalidate_recommendations()
             return True
         return False
     
+    def _invalidate_recommendations(self):
+        if self.cache is not None:
+            self.cache.invalidate_user(self.user)
+        if self.precomputed_store is not None:
+            self.precomputed_store.invalidate_user(self.user)
+    
     def _get_user_preferences(self, user):
         # Lógica para obtener preferencias actuales
         return {"genres": ["Pop"], "artists": []}
@@ -234,95 +541,274 @@ class GenerateRecommendationsCommand(RecommendationCommand):
         return False
 
 
+class RecordListeningEventsCommand(RecommendationCommand):
+    """
+    Comando para registrar un lote de eventos de escucha (user_id, song_id, plays)
+    
+    Los eventos se guardan primero en ListeningEvent, en una transacción, y
+    solo después se aplican al motor en memoria: un reentrenamiento
+    (load_engine) o un reinicio no los pierde.
+    """
+    
+    def __init__(self, events, engine: Optional[ItemSimilarityEngine] = None,
+                 cache: Optional[RecommendationCache] = None,
+                 precomputed_store: Optional[PrecomputedRecommendationStore] = None):
+        self.events = events
+        self.engine = engine
+        self.cache = cache
+        self.precomputed_store = precomputed_store
+        self.affected_users = []
+    
+    def execute(self) -> bool:
+        events = list(self.events)
+        with transaction.atomic():
+            song_ids = {song_id for _, song_id, _ in events}
+            missing = song_ids - set(Song.objects.filter(id__in=song_ids).values_list("id", flat=True))
+            if missing:
+                raise ValueError(f"Canciones inexistentes: {sorted(missing)}")
+            ListeningEvent.objects.bulk_create([
+                ListeningEvent(user_id=user_id, song_id=song_id, plays=plays)
+                for user_id, song_id, plays in events
+            ])
+        engine = self.engine if self.engine is not None else get_default_engine()
+        self.affected_users = engine.partial_fit(events)
+        
+        # Las recomendaciones de los usuarios afectados dejan de ser válidas
+        if self.cache is not None:
+            for user_id in self.affected_users:
+                self.cache.invalidate_user(SimpleNamespace(id=user_id))
+        if self.precomputed_store is not None:
+            self.precomputed_store.invalidate_users(self.affected_users)
+        return True
+    
+    def undo(self) -> bool:
+        # Los eventos de escucha no se pueden deshacer
+        return False
+
+
 # 5. DECORATOR PATTERN para Mejorar Recomendaciones
+class Reranker(ABC):
+    """Etapa de re-ranking que consume candidatos en orden y entrega hasta k"""
+    
+    name = "reranker"
+    
+    @abstractmethod
+    def rerank(self, recommendations: Iterable[Recommendation], k: int = 10) -> Iterator[Recommendation]:
+        pass
+
+
+class DiversityReranker(Reranker):
+    """
+    Una canción por artista
+    
+    Filtra de forma perezosa: tira del flujo de entrada solo hasta reunir k
+    resultados. Las canciones sin artista conocido no se agrupan entre sí.
+    """
+    
+    name = "diversity"
+    
+    def rerank(self, recommendations: Iterable[Recommendation], k: int = 10) -> Iterator[Recommendation]:
+        return itertools.islice(self._one_per_artist(recommendations), k)
+    
+    @staticmethod
+    def _one_per_artist(recommendations):
+        used_artists = set()
+        for rec in recommendations:
+            artist = rec.artist if rec.artist != UNKNOWN_ARTIST else rec.key
+            if artist not in used_artists:
+                used_artists.add(artist)
+                yield rec
+
+
+class FreshnessReranker(Reranker):
+    """Prioriza contenido fresco dentro de la página de k resultados"""
+    
+    name = "freshness"
+    
+    def rerank(self, recommendations: Iterable[Recommendation], k: int = 10) -> Iterator[Recommendation]:
+        # Copias: los registros pueden estar cacheados
+        fresh = [
+            rec.replace(
+                # Simular fecha de lanzamiento
+                release_date=f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                freshness_score=random.uniform(0.5, 1.0),
+            )
+            for rec in itertools.islice(recommendations, k)
+        ]
+        
+        return iter(sorted(fresh, key=lambda rec: rec.freshness_score, reverse=True))
+
+
 class RecommendationDecorator(RecommendationStrategy):
     """Decorador base para recomendaciones"""
     
     def __init__(self, strategy: RecommendationStrategy):
         self.strategy = strategy
     
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
         return self.strategy.recommend(user, context)
+    
+    def get_execution_report(self) -> Optional[Dict[str, Any]]:
+        return self.strategy.get_execution_report()
 
 
 class DiversityDecorator(RecommendationDecorator):
     """Decorador para diversificar recomendaciones"""
     
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
-        recommendations = self.strategy.recommend(user, context)
+    reranker = DiversityReranker()
+    limit = 10
+    
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
+        # Tira del flujo de la estrategia hasta completar la página
+        recommendations = self.strategy.stream(user, context)
         return self._diversify_recommendations(recommendations)
     
     def _diversify_recommendations(self, recommendations):
-        # Lógica para diversificar recomendaciones
-        diversified = []
-        used_artists = set()
-        
-        for rec in recommendations:
-            if rec.get('artist') not in used_artists:
-                diversified.append(rec)
-                used_artists.add(rec.get('artist'))
-        
-        return diversified[:10]
+        return list(self.reranker.rerank(recommendations, self.limit))
 
 
 class FreshnessDecorator(RecommendationDecorator):
     """Decorador para priorizar contenido fresco"""
     
-    def recommend(self, user, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    reranker = FreshnessReranker()
+    
+    def recommend(self, user, context: Dict[str, Any]) -> List[Recommendation]:
         recommendations = self.strategy.recommend(user, context)
         return self._prioritize_fresh_content(recommendations)
     
     def _prioritize_fresh_content(self, recommendations):
-        # Lógica para priorizar contenido fresco
-        for rec in recommendations:
-            # Simular fecha de lanzamiento
-            rec['release_date'] = f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
-            rec['freshness_score'] = random.uniform(0.5, 1.0)
-        
-        return sorted(recommendations, key=lambda x: x['freshness_score'], reverse=True)
+        return list(self.reranker.rerank(recommendations, len(recommendations)))
 
 
 # 6. FACADE PATTERN para Sistema Completo
 class RecommendationFacade:
     """Facade para el sistema completo de recomendaciones"""
     
-    def __init__(self):
-        self.strategy_factory = RecommendationStrategyFactory()
+    def __init__(self, cache_service: Optional[CacheInterface] = None,
+                 precomputed_store: Optional[PrecomputedRecommendationStore] = None,
+                 pipelines: Optional["PipelineRegistry"] = None,
+                 event_bus: Optional[ObserverEventBus] = None):
+        self.pipelines = pipelines or default_pipelines
+        self.event_bus = event_bus
+        self.cache = RecommendationCache(cache_service or InMemoryCache())
+        self.precomputed_store = precomputed_store
         self.observers = []
         self.command_history = []
     
     def add_observer(self, observer: RecommendationObserver):
         self.observers.append(observer)
+        if self.event_bus is not None:
+            self.event_bus.subscribe(observer)
     
     def get_recommendations(self, user, strategy_type="hybrid", context=None):
         """Obtiene recomendaciones para un usuario"""
+        recommendations, _ = self.get_recommendations_with_metadata(user, strategy_type, context)
+        return recommendations
+    
+    def get_recommendations_with_metadata(self, user, strategy_type="hybrid", context=None):
+        """Obtiene recomendaciones y metadatos de ejecución (estrategias que contribuyeron)"""
         if context is None:
             context = {}
         
-        # Crear estrategia
-        strategy = self.strategy_factory.create_strategy(strategy_type)
+        # Lectura a través del caché antes de ejecutar la estrategia
+        cache_key = self.cache.build_key(user, strategy_type, context)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached["recommendations"], {**cached["metadata"], "cached": True}
         
-        # Aplicar decoradores
-        strategy = DiversityDecorator(strategy)
-        strategy = FreshnessDecorator(strategy)
+        # Sin contexto, el resultado no depende de la petición: servir el precalculado
+        if not context and self.precomputed_store is not None:
+            precomputed = self.precomputed_store.get(user, strategy_type)
+            if precomputed is not None:
+                return precomputed[0], {**precomputed[1], "cached": False}
         
-        # Generar recomendaciones
-        recommendations = strategy.recommend(user, context)
+        # Generar recomendaciones con el pipeline compilado de la configuración
+        recommendations, metadata = self.pipelines.get(strategy_type).run(user, context)
         
-        # Notificar observadores
-        for observer in self.observers:
-            observer.on_recommendations_updated(user, recommendations)
+        self._notify(RecommendationEvent(user, recommendations, cache_key, metadata))
+        return recommendations, {**metadata, "cached": False}
+    
+    def get_recommendations_batch(self, requests):
+        """
+        Recomendaciones para varias peticiones (user, strategy_type, context)
         
-        return recommendations
+        Devuelve [(recomendaciones, metadatos)] en el orden de entrada. Las
+        peticiones repetidas se calculan una vez, los precalculados se leen en
+        una consulta por estrategia y el resto se ejecuta con run_batch.
+        """
+        results = [None] * len(requests)
+        pending: Dict[str, Dict[str, Any]] = {}
+        precomputable: Dict[str, List[Any]] = {}
+        
+        for position, (user, strategy_type, context) in enumerate(requests):
+            context = context or {}
+            cache_key = self.cache.build_key(user, strategy_type, context)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                results[position] = (cached["recommendations"], {**cached["metadata"], "cached": True})
+                continue
+            entry = pending.setdefault(strategy_type, {}).setdefault(cache_key, [user, context, []])
+            entry[2].append(position)
+            if not context:
+                precomputable.setdefault(strategy_type, []).append(cache_key)
+        
+        # Sin contexto, el resultado no depende de la petición: servir el precalculado
+        if self.precomputed_store is not None:
+            for strategy_type, cache_keys in precomputable.items():
+                entries = pending[strategy_type]
+                found = self.precomputed_store.get_many([entries[key][0].id for key in cache_keys], strategy_type)
+                for cache_key in cache_keys:
+                    user, _, positions = entries[cache_key]
+                    if user.id in found:
+                        recommendations, metadata = found[user.id]
+                        for position in positions:
+                            results[position] = (recommendations, {**metadata, "cached": False})
+                        del entries[cache_key]
+        
+        for strategy_type, entries in pending.items():
+            if not entries:
+                continue
+            pipeline = self.pipelines.get(strategy_type)
+            outputs = pipeline.run_batch([(user, context) for user, context, _ in entries.values()])
+            for (cache_key, (user, _, positions)), (recommendations, metadata) in zip(entries.items(), outputs):
+                self._notify(RecommendationEvent(user, recommendations, cache_key, metadata))
+                for position in positions:
+                    results[position] = (recommendations, {**metadata, "cached": False})
+        return results
+    
+    def _notify(self, event: RecommendationEvent):
+        """Notifica a los observadores: encola en el bus si hay uno, si no en línea"""
+        if self.event_bus is not None:
+            self.event_bus.publish(event)
+            return
+        for observer in self.observers:
+            observer.on_recommendations_updated(event.user, event.recommendations,
+                                                cache_key=event.cache_key, metadata=event.metadata)
     
     def update_user_preferences(self, user, preferences):
         """Actualiza preferencias del usuario"""
-        command = UpdateUserPreferencesCommand(user, preferences)
+        command = UpdateUserPreferencesCommand(
+            user, preferences, cache=self.cache, precomputed_store=self.precomputed_store
+        )
         if command.execute():
             self.command_history.append(command)
             return True
         return False
     
+    def record_listening_events(self, events):
+        """Guarda eventos (user_id, song_id, plays) y los aplica al modelo; devuelve los usuarios afectados"""
+        command = RecordListeningEventsCommand(
+            events, cache=self.cache, precomputed_store=self.precomputed_store
+        )
+        command.execute()
+        return command.affected_users
+    
+    def reload_collaborative_model(self) -> ItemSimilarityEngine:
+        """Reentrena el motor compartido con el historial persistido y lo publica"""
+        engine = load_engine()
+        set_default_engine(engine)
+        return engine
+    
     def undo_last_operation(self):
         """Deshace la última operación"""
         if self.command_history:
@@ -347,34 +833,257 @@ class GlobalRecommendationSystem:
     
     def __init__(self):
         if not hasattr(self, 'initialized'):
-            self.facade = RecommendationFacade()
-            self.facade.add_observer(CacheObserver())
+            self.facade = RecommendationFacade(
+                cache_service=CacheFactory.from_settings(),
+                precomputed_store=PrecomputedRecommendationStore(),
+                event_bus=ObserverEventBus.from_settings(),
+            )
+            self.facade.add_observer(CacheObserver(self.facade.cache))
             self.facade.add_observer(NotificationObserver())
             self.initialized = True
     
     def get_recommendations(self, user, **kwargs):
         return self.facade.get_recommendations(user, **kwargs)
     
+    def get_recommendations_with_metadata(self, user, **kwargs):
+        return self.facade.get_recommendations_with_metadata(user, **kwargs)
+    
+    def get_recommendations_batch(self, requests):
+        return self.facade.get_recommendations_batch(requests)
+    
     def update_preferences(self, user, preferences):
         return self.facade.update_user_preferences(user, preferences)
+    
+    def record_listening_events(self, events):
+        return self.facade.record_listening_events(events)
+    
+    def reload_collaborative_model(self):
+        return self.facade.reload_collaborative_model()
 
 
 # 8. BUILDER PATTERN para Configurar Sistema
+class _StageTimer:
+    """Tiempo exclusivo por etapa: una etapa anidada no cuenta en la que la contiene"""
+    
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._stack = []
+    
+    @contextmanager
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            self._charge(now)
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._charge(now)
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] = now
+    
+    def wrap(self, name: str, iterable: Iterable) -> Iterator:
+        """Cuenta en `name` el tiempo de cada next() sobre el iterador"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(iterator, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return
+            yield item
+    
+    def _charge(self, now: float):
+        name, started = self._stack[-1]
+        self.stages[name] = self.stages.get(name, 0.0) + (now - started) * 1000
+
+
+_EXHAUSTED = object()
+
+
+class RecommendationPipeline:
+    """
+    Pipeline de recomendación compilado e inmutable
+    
+    Etapas, en una sola pasada: generación de candidatos (estrategias en
+    paralelo si hay varias), fusión y re-ranking. Los candidatos fluyen de
+    forma perezosa: los re-rankers tiran de la fusión, y esta de los flujos de
+    las estrategias, solo hasta completar la página de `limit` resultados.
+    El tiempo de cada etapa se devuelve en los metadatos (`stages_ms`). Las
+    estrategias y re-rankers se crean una vez al compilar y se comparten
+    entre peticiones.
+    """
+    
+    __slots__ = ("name", "strategies", "weights", "deadlines", "fusion", "rerankers", "limit")
+    
+    def __init__(self, name: str, strategies, weights, deadlines,
+                 fusion: Optional[ScoreFusion] = None, rerankers=(), limit: int = 10):
+        for attribute, value in (
+            ("name", name),
+            ("strategies", tuple(strategies)),
+            ("weights", tuple(weights)),
+            ("deadlines", tuple(deadlines)),
+            ("fusion", fusion),
+            ("rerankers", tuple(rerankers)),
+            ("limit", limit),
+        ):
+            object.__setattr__(self, attribute, value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("RecommendationPipeline es inmutable")
+    
+    def run(self, user, context: Dict[str, Any], k: Optional[int] = None):
+        """(recomendaciones, metadatos con informe de estrategias y tiempos por etapa)"""
+        return self.run_batch([(user, context)], k)[0]
+    
+    def run_batch(self, requests, k: Optional[int] = None):
+        """
+        Ejecuta el pipeline para varias peticiones (user, context)
+        
+        La generación de candidatos se hace una vez por estrategia para todo el
+        lote (`stream_batch`), con las estrategias en paralelo y un plazo por
+        estrategia proporcional al número de peticiones, hasta BATCH_DEADLINE
+        (o el de una petición, si es mayor); la fusión y el
+        re-ranking se aplican después a cada petición. Las páginas adicionales
+        de cada petición se piden dentro del plazo de su estrategia, contado
+        desde que empieza esa petición.
+        """
+        k = k or self.limit
+        shared = _StageTimer()
+        
+        # Primera página de cada estrategia; el resto se pide solo si hace falta
+        with shared.stage("candidates"):
+            if len(self.strategies) == 1:
+                stream_lists = [self.strategies[0].stream_batch(requests, k)]
+                weights = [1.0]
+                budgets = list(self.deadlines)
+                report = {"contributors": [type(self.strategies[0]).__name__]}
+            else:
+                stream_lists, weights, report = generate_candidates(
+                    self.strategies, self.weights,
+                    [min(deadline * len(requests), max(deadline, BATCH_DEADLINE)) for deadline in self.deadlines],
+                    None, None,
+                    fetch=lambda position, deadline: self.strategies[position].stream_batch(requests, k, deadline),
+                )
+                budgets = [
+                    deadline for deadline, entry in zip(self.deadlines, report["strategies"])
+                    if entry["status"] == "ok"
+                ]
+        
+        results = []
+        for position in range(len(requests)):
+            timer = _StageTimer()
+            timer.stages.update(shared.stages)
+            streams = [streams[position] for streams in stream_lists]
+            started = time.monotonic()
+            deadlines = [started + budget for budget in budgets]
+            candidates = self._fused(streams, weights, k, deadlines, timer)
+            for reranker in self.rerankers:
+                candidates = timer.wrap(reranker.name, reranker.rerank(candidates, k))
+            recommendations = list(itertools.islice(candidates, k))
+            results.append((recommendations, {**report, "pipeline": self.name, "stages_ms": timer.stages}))
+        return results
+    
+    def _fused(self, streams, weights, k, deadlines, timer):
+        """Candidatos fusionados en orden; amplía la profundidad leída de cada flujo al agotarse"""
+        if not streams:
+            return iter(())
+        if self.fusion is None:
+            return timer.wrap("fusion", self._single(streams[0], k, deadlines[0], timer))
+        return timer.wrap("fusion", self._deepening(streams, weights, k, deadlines, timer))
+    
+    @staticmethod
+    def _single(stream, depth, deadline, timer):
+        position = 0
+        with timer.stage("candidates"):
+            page = stream.take(depth)
+        while True:
+            yield from page[position:]
+            if stream.exhausted:
+                return
+            position, depth = len(page), depth * 2
+            with timer.stage("candidates"):
+                page = _take_within(stream, depth, deadline)
+            if page is None:
+                return
+    
+    def _deepening(self, streams, weights, depth, deadlines, timer):
+        emitted = set()
+        with timer.stage("candidates"):
+            lists = [stream.take(depth) for stream in streams]
+        # Flujos de los que aún se pueden pedir más candidatos
+        pending = [position for position, stream in enumerate(streams) if not stream.exhausted]
+        while True:
+            for rec in self.fusion.fuse(lists, weights, limit=sum(map(len, lists))):
+                if rec.key not in emitted:
+                    emitted.add(rec.key)
+                    yield rec
+            if not pending:
+                return
+            depth *= 2
+            with timer.stage("candidates"):
+                for position in list(pending):
+                    page = _take_within(streams[position], depth, deadlines[position])
+                    if page is not None:
+                        lists[position] = page
+                    if page is None or streams[position].exhausted:
+                        pending.remove(position)
+
+
+class PipelineRegistry:
+    """Pipelines compilados por nombre de configuración; cada uno se compila una sola vez"""
+    
+    def __init__(self, builders: Optional[Dict[str, "RecommendationSystemBuilder"]] = None):
+        self._builders = dict(builders or {})
+        self._pipelines: Dict[str, RecommendationPipeline] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name: str, builder: "RecommendationSystemBuilder"):
+        with self._lock:
+            self._builders[name] = builder
+            self._pipelines.pop(name, None)
+    
+    def get(self, name: str) -> RecommendationPipeline:
+        pipeline = self._pipelines.get(name)
+        if pipeline is None:
+            with self._lock:
+                pipeline = self._pipelines.get(name)
+                if pipeline is None:
+                    builder = self._builders.get(name)
+                    if builder is None:
+                        raise ValueError(f"Estrategia no soportada: {name}")
+                    pipeline = self._pipelines[name] = builder.build_pipeline(name)
+        return pipeline
+
+
 class RecommendationSystemBuilder:
     """Builder para configurar el sistema de recomendaciones"""
     
-    def __init__(self):
+    RERANKERS = {
+        "diversity": DiversityReranker,
+        "freshness": FreshnessReranker,
+    }
+    
+    def __init__(self, name: str = "custom"):
+        self.name = name
         self.strategies = []
         self.weights = []
+        self.deadlines = []
         self.decorators = []
         self.observers = []
+        self.fusion_method = "weighted"
+        self.limit = 10
     
-    def add_strategy(self, strategy_type: str, weight: float = 1.0):
+    def add_strategy(self, strategy_type: str, weight: float = 1.0, deadline: float = DEFAULT_DEADLINE):
         self.strategies.append(strategy_type)
         self.weights.append(weight)
+        self.deadlines.append(deadline)
         return self
     
     def add_decorator(self, decorator_type: str):
+        if decorator_type not in self.RERANKERS:
+            raise ValueError(f"Decorador no soportado: {decorator_type}")
         self.decorators.append(decorator_type)
         return self
     
@@ -382,26 +1091,65 @@ class RecommendationSystemBuilder:
         self.observers.append(observer_type)
         return self
     
+    def with_fusion(self, method: str):
+        self.fusion_method = method
+        return self
+    
+    def with_limit(self, limit: int):
+        self.limit = limit
+        return self
+    
+    def build_pipeline(self, name: Optional[str] = None) -> RecommendationPipeline:
+        """Compila la configuración en un pipeline inmutable"""
+        if not self.strategies:
+            raise ValueError("El pipeline necesita al menos una estrategia")
+        return RecommendationPipeline(
+            name or self.name,
+            [RecommendationStrategyFactory.create_strategy(strategy_type) for strategy_type in self.strategies],
+            self.weights,
+            self.deadlines,
+            fusion=ScoreFusion(method=self.fusion_method) if len(self.strategies) > 1 else None,
+            rerankers=[self.RERANKERS[decorator_type]() for decorator_type in self.decorators],
+            limit=self.limit,
+        )
+    
     def build(self):
-        """Construye el sistema de recomendaciones"""
-        facade = RecommendationFacade()
+        """Construye el sistema de recomendaciones con el pipeline registrado como `name`"""
+        pipelines = PipelineRegistry({**default_pipelines._builders, self.name: self})
+        facade = RecommendationFacade(pipelines=pipelines)
         
         # Configurar observadores
         for observer_type in self.observers:
             if observer_type == "cache":
-                facade.add_observer(CacheObserver())
+                facade.add_observer(CacheObserver(facade.cache))
             elif observer_type == "notification":
                 facade.add_observer(NotificationObserver())
         
         return facade
 
 
+def _standard_builder(*strategies, fusion: str = "weighted") -> RecommendationSystemBuilder:
+    builder = RecommendationSystemBuilder().with_fusion(fusion)
+    for strategy_type, weight in strategies:
+        builder.add_strategy(strategy_type, weight)
+    return builder.add_decorator("diversity").add_decorator("freshness")
+
+
+# Configuraciones servidas por la API (strategy_type -> pipeline)
+default_pipelines = PipelineRegistry({
+    "collaborative": _standard_builder(("collaborative", 1.0)),
+    "content": _standard_builder(("content", 1.0)),
+    "hybrid": _standard_builder(("collaborative", 0.6), ("content", 0.4)),
+    "hybrid_rrf": _standard_builder(("collaborative", 0.6), ("content", 0.4), fusion="rrf"),
+})
+
+
 # Ejemplo de uso del sistema
 def example_usage():
     """Ejemplo de uso del sistema de recomendaciones"""
     
     # Crear sistema usando Builder
-    builder = RecommendationSystemBuilder()
+    builder = RecommendationSystemBuilder(name="example")
     system = (builder
               .add_strategy("collaborative", 0.6)
               .add_strategy("content", 0.4)
@@ -431,6 +1179,6 @@ def example_usage():
     
     print("🎵 Recomendaciones generadas:")
     for i, rec in enumerate(recommendations, 1):
-        print(f"{i}. {rec['title']} - {rec['artist']} (Score: {rec.get('score', 0):.2f})")
+        print(f"{i}. {rec.title} - {rec.artist} (Score: {rec.score:.2f})")
     
     return recommendations
@@ -0,0 +1,110 @@
+"""
+Registros compactos de recomendación
+
+Las estrategias, la fusión y los decoradores intercambian objetos
+`Recommendation` con `__slots__` (sin dict por instancia) y song_id entero.
+La conversión a JSON se hace una sola vez, en la vista, con `encode_json`.
+"""
+import json
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la biblioteca estándar
+    orjson = None
+
+UNKNOWN_ARTIST = "Unknown Artist"
+
+
+class Recommendation:
+    """Canción recomendada con su score y, opcionalmente, datos de frescura"""
+
+    __slots__ = ("song_id", "title", "artist", "score", "release_date", "freshness_score")
+
+    def __init__(self, song_id: Optional[int], title: str, artist: str, score: float,
+                 release_date: Optional[str] = None, freshness_score: Optional[float] = None):
+        self.song_id = song_id
+        self.title = title
+        self.artist = artist
+        self.score = score
+        self.release_date = release_date
+        self.freshness_score = freshness_score
+
+    @classmethod
+    def from_metadata(cls, song_id: int, metadata: Dict[str, Any], score: float) -> "Recommendation":
+        """Registro de una canción del catálogo a partir de su título/artista"""
+        return cls(
+            song_id,
+            metadata.get("title", f"Song {song_id}"),
+            metadata.get("artist", UNKNOWN_ARTIST),
+            score,
+        )
+
+    @property
+    def key(self) -> Hashable:
+        """Identidad del candidato: song_id si existe, si no (título, artista)"""
+        return self.song_id if self.song_id is not None else (self.title, self.artist)
+
+    def replace(self, **changes) -> "Recommendation":
+        """Copia con los campos indicados cambiados (los registros compartidos no se mutan)"""
+        return Recommendation(
+            changes.get("song_id", self.song_id),
+            changes.get("title", self.title),
+            changes.get("artist", self.artist),
+            changes.get("score", self.score),
+            changes.get("release_date", self.release_date),
+            changes.get("freshness_score", self.freshness_score),
+        )
+
+    def to_row(self) -> Tuple:
+        """Tupla posicional, compacta para cachés y pickle"""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_row(cls, row) -> "Recommendation":
+        return cls(*row)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representación JSON; los campos opcionales vacíos se omiten"""
+        data = {"song_id": self.song_id, "title": self.title, "artist": self.artist, "score": self.score}
+        if self.release_date is not None:
+            data["release_date"] = self.release_date
+        if self.freshness_score is not None:
+            data["freshness_score"] = self.freshness_score
+        return data
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Recommendation):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __hash__(self) -> int:
+        # Mismos campos que __eq__; válido porque los registros no se mutan (ver replace)
+        return hash(self.to_row())
+
+    def __repr__(self) -> str:
+        return f"Recommendation(song_id={self.song_id!r}, title={self.title!r}, score={self.score:.4f})"
+
+
+def to_rows(recommendations: Iterable[Recommendation]) -> List[Tuple]:
+    return [recommendation.to_row() for recommendation in recommendations]
+
+
+def from_rows(rows: Iterable) -> List[Recommendation]:
+    return [Recommendation.from_row(row) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, Recommendation):
+        return value.to_dict()
+    # Escalares de NumPy que puedan venir en los metadatos
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def encode_json(payload: Any) -> bytes:
+    """Serializa una respuesta que puede contener registros Recommendation"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
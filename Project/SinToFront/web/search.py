@@ -0,0 +1,132 @@
+"""
+Búsqueda de texto completo de canciones (SQLite FTS5)
+
+La tabla virtual `web_song_fts` indexa título y artista de cada canción con
+rowid = id de la canción; los triggers la mantienen sincronizada con
+web_song y web_artist. El tokenizador unicode61 ignora mayúsculas y tildes
+("cancion" encuentra "Canción") y el índice de prefijos sirve la búsqueda
+mientras se escribe. Los resultados se ordenan por BM25, con más peso en el
+título que en el artista.
+
+BM25 puntúa todas las coincidencias antes de ordenar (unos µs por fila); un
+prefijo de dos letras puede coincidir con medio catálogo y ahí la relevancia
+apenas informa. Por eso, si una consulta supera RANK_LIMIT coincidencias, se
+devuelven las canciones más recientes sin puntuar.
+
+En bases de datos que no son SQLite se usa el filtro `icontains` de siempre.
+"""
+import re
+import unicodedata
+from typing import List, Optional
+
+from django.db import connections, router
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "web_song_fts"
+
+# Pesos BM25 por columna (title, artist)
+TITLE_WEIGHT = 10.0
+ARTIST_WEIGHT = 5.0
+BM25 = f"bm25({FTS_TABLE}, {TITLE_WEIGHT}, {ARTIST_WEIGHT})"
+
+RANK_LIMIT = 2000
+
+# SQL con parámetros %s (estilo DB-API de Django)
+PROBE_SQL = f"SELECT count(*) FROM (SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s)"
+IDS_SQL = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY {{order}} LIMIT %s"
+
+MATCH_SQL = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+RANK_SQL = f"SELECT {BM25} FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = web_song.id"
+
+# El esquema y los triggers viven en la migración 0004; esto solo reconstruye el índice
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES('rebuild')"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(text: str) -> str:
+    """
+    Convierte texto libre en una consulta FTS5 segura
+
+    Cada palabra va entre comillas (sin operadores ni sintaxis del usuario) y
+    la última se busca como prefijo, porque puede estar a medio escribir.
+    """
+    tokens = _TOKEN.findall(text or "")
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Forma canónica de una búsqueda: palabras en minúsculas y sin tildes
+
+    Dos textos con la misma forma canónica devuelven las mismas canciones
+    (el tokenizador ignora mayúsculas, tildes y puntuación), así que sirve
+    como clave de caché.
+    """
+    plain = unicodedata.normalize("NFKD", (text or "").lower())
+    plain = "".join(char for char in plain if not unicodedata.combining(char))
+    return " ".join(_TOKEN.findall(plain))
+
+
+def fts_available(using: str) -> bool:
+    return connections[using].vendor == "sqlite"
+
+
+def rebuild_search_index(using: str = "default"):
+    """Reconstruye el índice invertido desde las filas de la tabla FTS (los triggers las mantienen al día)"""
+    if fts_available(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(REBUILD_SQL)
+
+
+def _rankable(query: str, using: str) -> bool:
+    """Si la consulta tiene pocas coincidencias para ordenarlas por BM25 (conteo acotado)"""
+    with connections[using].cursor() as cursor:
+        cursor.execute(PROBE_SQL, [query, RANK_LIMIT + 1])
+        return cursor.fetchone()[0] <= RANK_LIMIT
+
+
+def search_songs(queryset, text: str, rank: bool = True):
+    """
+    Filtra el queryset de canciones por texto, ordenado por relevancia
+
+    Devuelve un queryset (admite más filtros y paginación) con la anotación
+    `search_rank` (None si la consulta es demasiado amplia para puntuarla);
+    sin palabras buscables no filtra nada. Con rank=False solo filtra, sin
+    anotación ni la consulta previa de conteo (p. ej. para agregados).
+    """
+    query = fts_query(text)
+    if not query:
+        return queryset
+    # El conteo previo va a la misma base que leerá el queryset
+    if not fts_available(queryset.db):
+        return queryset.filter(Q(title__icontains=text) | Q(artist__name__icontains=text))
+    queryset = queryset.filter(id__in=RawSQL(MATCH_SQL, [query]))
+    if not rank:
+        return queryset
+    if not _rankable(query, queryset.db):
+        return queryset.annotate(search_rank=Value(None, output_field=FloatField())).order_by("-id")
+    return queryset.annotate(
+        search_rank=RawSQL(RANK_SQL, [query], output_field=FloatField())
+    ).order_by(F("search_rank").asc(), "-id")
+
+
+def search_song_ids(text: str, limit: int = 50, using: Optional[str] = None) -> List[int]:
+    """Ids de las canciones más relevantes, sin pasar por el ORM (autocompletado)"""
+    from .models import Song
+
+    query = fts_query(text)
+    if not query:
+        return []
+    using = using or router.db_for_read(Song)
+    if not fts_available(using):
+        return list(search_songs(Song.objects.using(using), text).values_list("id", flat=True)[:limit])
+    with connections[using].cursor() as cursor:
+        order = BM25 if _rankable(query, using) else "rowid DESC"
+        cursor.execute(IDS_SQL.format(order=order), [query, limit])
+        return [row[0] for row in cursor.fetchall()]
@@ -2,15 +2,21 @@
 Implementaciones concretas de servicios con inversión de dependencias
 """
 import numpy as np
+import os
+import pickle
 import random
+import sqlite3
+import threading
 import time
 from typing import Dict, Any, Optional
 from .interfaces import (
     GestureDetectorInterface, 
     AudioPlayerInterface, 
     NotificationServiceInterface,
-    CacheInterface
+    CacheInterface,
+    CacheSerializerInterface
 )
+from .cache_serializers import SERIALIZERS, PickleSerializer
 
 
 class MockGestureDetector(GestureDetectorInterface):
@@ -168,3 +174,180 @@ class RedisCache(CacheInterface):
         """Elimina un valor de Redis"""
         # Implementación real con Redis
         return True
+
+
+class SQLiteCache(CacheInterface):
+    """
+    Caché persistente en un archivo SQLite (modo WAL) compartido entre procesos
+    
+    Todos los workers de gunicorn de una misma máquina abren el mismo archivo:
+    las lecturas usan páginas mapeadas en memoria (mmap) y las escrituras son
+    atómicas entre procesos gracias a las transacciones de SQLite. El contenido
+    sobrevive a reinicios y se expulsan primero las entradas expiradas y luego
+    las más próximas a expirar cuando se supera `max_entries`.
+    """
+    
+    CULL_EVERY = 100
+    
+    def __init__(self, path: str, max_entries: int = 10000, timeout: float = 5.0,
+                 mmap_size: int = 64 * 1024 * 1024,
+                 serializer: Optional[CacheSerializerInterface] = None):
+        self.path = str(path)
+        self.serializer = serializer or PickleSerializer()
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._sets_since_cull = 0
+        self._cull_lock = threading.Lock()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._connection().execute(
+            "CREATE INDEX IF NOT EXISTS cache_entries_expires_at ON cache_entries (expires_at)"
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión por hilo y por proceso (se reabre tras un fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Obtiene un valor del caché"""
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        now = time.time()
+        if row[1] <= now:
+            # TTL expirado; un set concurrente entre el SELECT y el DELETE deja la fila viva
+            self._delete_where(key, "expires_at <= ?", now)
+            return None
+        try:
+            return self.serializer.loads(row[0])
+        except Exception:
+            # Entrada corrupta o de otro serializador: fallo de caché; solo se borra si no ha cambiado
+            self._delete_where(key, "value = ?", row[0])
+            return None
+    
+    def set(self, key: str, value: Any, ttl: int = 300) -> bool:
+        """Almacena un valor en el caché"""
+        try:
+            payload = self.serializer.dumps(value)
+            self._connection().execute(
+                "INSERT INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                (key, payload, time.time() + ttl),
+            )
+        except (sqlite3.Error, pickle.PicklingError, TypeError, ValueError, AttributeError):
+            return False
+        # El valor ya está guardado: un fallo al expulsar no cambia el resultado
+        if self._cull_due():
+            self._cull()
+        return True
+    
+    def delete(self, key: str) -> bool:
+        """Elimina un valor del caché"""
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _delete_where(self, key: str, condition: str, value: Any) -> bool:
+        """Borra la entrada solo si aún cumple `condition` (la fila leída no fue sustituida)"""
+        try:
+            self._connection().execute(
+                f"DELETE FROM cache_entries WHERE key = ? AND {condition}", (key, value)
+            )
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def clear(self) -> bool:
+        """Elimina todas las entradas"""
+        try:
+            self._connection().execute("DELETE FROM cache_entries")
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _cull_due(self) -> bool:
+        """Cuenta un set y dice si toca expulsar (una vez cada CULL_EVERY, entre hilos)"""
+        with self._cull_lock:
+            self._sets_since_cull += 1
+            if self._sets_since_cull < self.CULL_EVERY:
+                return False
+            self._sets_since_cull = 0
+            return True
+    
+    def _cull(self) -> bool:
+        """Expulsa entradas expiradas y, si sobran, las más próximas a expirar; False si no pudo"""
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            overflow = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN ("
+                    " SELECT key FROM cache_entries ORDER BY expires_at LIMIT ?)",
+                    (overflow,),
+                )
+            conn.execute("COMMIT")
+            return True
+        except sqlite3.Error:
+            # Otro proceso tiene el bloqueo de escritura: se reintenta en la próxima ronda
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            return False
+
+
+class CacheFactory:
+    """Factory para crear backends de caché"""
+    
+    @staticmethod
+    def create_cache(backend: str = "memory", **options) -> CacheInterface:
+        if backend == "memory":
+            return InMemoryCache()
+        elif backend == "sqlite":
+            return SQLiteCache(
+                options["location"],
+                max_entries=options.get("max_entries", 10000),
+                serializer=SERIALIZERS[options.get("serializer", "pickle")](),
+            )
+        elif backend == "redis":
+            return RedisCache()
+        else:
+            raise ValueError(f"Backend de caché no soportado: {backend}")
+    
+    @staticmethod
+    def from_settings(name: str = "RECOMMENDATION_CACHE") -> CacheInterface:
+        """Crea el caché configurado en settings.<name> (por defecto RECOMMENDATION_CACHE)"""
+        from django.conf import settings
+        
+        config = getattr(settings, name, {})
+        return CacheFactory.create_cache(
+            config.get("BACKEND", "memory"),
+            location=config.get("LOCATION"),
+            max_entries=config.get("MAX_ENTRIES", 10000),
+            serializer=config.get("SERIALIZER", "pickle"),
+        )
@@ -0,0 +1,78 @@
+"""
+Mantenimiento incremental de los contadores de playlists y usuarios
+
+Cada alta o baja de una entrada ajusta song_count y el histograma de géneros
+de su playlist y de UserMusicStats del dueño, en la misma transacción, con
+UPDATE relativos (F() y json_patch) que no leen las filas: dos altas
+concurrentes no se pisan. Al borrar una playlist se descuentan sus totales
+de una vez y se ignoran las bajas de sus entradas en cascada.
+
+bulk_create y las actualizaciones por queryset no emiten señales: tras una
+carga masiva hay que llamar a Playlist.objects.rebuild_counters() e invalidar
+UserMusicStats (ver catalog_import).
+"""
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Playlist, PlaylistEntry, Song, UserMusicStats
+
+# Playlists que se están borrando en este hilo -> origen del borrado (señal
+# `origin`). Solo se ignoran las bajas en cascada de ese mismo borrado: si
+# falla o se revierte, la marca no afecta a bajas posteriores, que tienen
+# otro origen.
+_deleting = threading.local()
+
+
+def _deleting_origins() -> dict:
+    if not hasattr(_deleting, "origins"):
+        _deleting.origins = {}
+    return _deleting.origins
+
+
+def _entry_changed(entry: PlaylistEntry, delta: int):
+    genre = Song.objects.filter(pk=entry.song_id).values_list("genre", flat=True).first()
+    genres = {genre: delta} if genre else None
+    with transaction.atomic():
+        Playlist.objects.filter(pk=entry.playlist_id).apply(songs=delta, genres=genres)
+        UserMusicStats.objects.filter(user__playlists=entry.playlist_id).apply(songs=delta, genres=genres)
+
+
+@receiver(post_save, sender=PlaylistEntry)
+def playlist_entry_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _entry_changed(instance, 1)
+
+
+@receiver(post_delete, sender=PlaylistEntry)
+def playlist_entry_deleted(sender, instance, origin=None, **kwargs):
+    deleting = _deleting_origins()
+    if instance.playlist_id not in deleting or deleting[instance.playlist_id] is not origin:
+        _entry_changed(instance, -1)
+
+
+@receiver(post_save, sender=Playlist)
+def playlist_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserMusicStats.objects.filter(user_id=instance.user_id).apply(playlists=1)
+
+
+@receiver(pre_delete, sender=Playlist)
+def playlist_deleting(sender, instance, origin=None, **kwargs):
+    _deleting_origins()[instance.id] = origin
+    # Valores de la base: la instancia en memoria puede ser anterior a altas recientes
+    song_count, genre_counts = Playlist.objects.filter(id=instance.id).values_list(
+        "song_count", "genre_counts"
+    ).get()
+    UserMusicStats.objects.filter(user_id=instance.user_id).apply(
+        playlists=-1,
+        songs=-song_count,
+        genres={genre: -count for genre, count in genre_counts.items()},
+    )
+
+
+@receiver(post_delete, sender=Playlist)
+def playlist_deleted(sender, instance, **kwargs):
+    _deleting_origins().pop(instance.id, None)
@@ -0,0 +1,219 @@
+"""
+Índice aproximado de vecinos más cercanos (IVF) para vectores de canciones
+
+Los vectores se normalizan (similitud coseno = producto punto) y se guardan
+en una única matriz float32 contigua, reordenada por lista invertida para que
+cada celda del k-means grueso sea un bloque contiguo. Una consulta compara
+contra los centroides y solo escanea las `n_probe` listas más cercanas.
+
+Knobs de recall/latencia:
+- n_lists: número de celdas del k-means (más celdas = listas más cortas)
+- n_probe: listas escaneadas por consulta (más listas = más recall y latencia)
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .ranking import iter_ranked
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Índices de los k mayores scores, ordenados de mayor a menor"""
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class SongVectorIndex:
+    """Índice IVF con k-means grueso sobre una matriz float32 contigua"""
+
+    FILES = ("vectors", "song_ids", "centroids", "list_offsets")
+
+    def __init__(self, n_lists: int = 256, n_probe: int = 8, kmeans_iterations: int = 10,
+                 training_sample: int = 100_000, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.kmeans_iterations = kmeans_iterations
+        self.training_sample = training_sample
+        self.seed = seed
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.song_ids = np.zeros(0, dtype=np.int64)
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.list_offsets = np.zeros(1, dtype=np.int64)
+        self.song_metadata: Dict[int, Dict[str, Any]] = {}
+        self._positions: Dict[int, int] = {}
+        self._title_to_id: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.song_ids)
+
+    def build(self, song_ids, vectors: np.ndarray,
+              song_metadata: Optional[Dict[int, Dict[str, Any]]] = None) -> "SongVectorIndex":
+        """Entrena el k-means grueso y agrupa los vectores por lista invertida"""
+        vectors = _normalize(vectors)
+        song_ids = np.asarray(song_ids, dtype=np.int64)
+        n_lists = max(1, min(self.n_lists, len(vectors)))
+
+        self.centroids = self._train_centroids(vectors, n_lists)
+        assignments = self._assign(vectors, self.centroids)
+
+        order = np.argsort(assignments, kind="stable")
+        self.vectors = np.ascontiguousarray(vectors[order])
+        self.song_ids = song_ids[order]
+        self.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=n_lists), out=self.list_offsets[1:])
+        self.song_metadata = song_metadata or {}
+        self._build_lookups()
+        return self
+
+    def _train_centroids(self, vectors: np.ndarray, n_lists: int) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(vectors), max(self.training_sample, n_lists))
+        sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+
+        for _ in range(self.kmeans_iterations):
+            assignments = self._assign(sample, centroids)
+            order = np.argsort(assignments, kind="stable")
+            filled, starts = np.unique(assignments[order], return_index=True)
+            # Las celdas vacías conservan su centroide anterior
+            centroids[filled] = _normalize(np.add.reduceat(sample[order], starts, axis=0))
+        return centroids
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            assignments[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return assignments
+
+    def _build_lookups(self):
+        self._positions = {int(song_id): i for i, song_id in enumerate(self.song_ids)}
+        self._title_to_id = {
+            str(metadata.get("title", "")).lower(): int(song_id)
+            for song_id, metadata in self.song_metadata.items()
+        }
+
+    def resolve_song(self, song) -> Optional[int]:
+        """Acepta un id de canción o su título"""
+        if isinstance(song, int) or (isinstance(song, str) and song.isdigit()):
+            song_id = int(song)
+            return song_id if song_id in self._positions else None
+        return self._title_to_id.get(str(song).lower())
+
+    def vector(self, song_id: int) -> Optional[np.ndarray]:
+        position = self._positions.get(song_id)
+        return None if position is None else self.vectors[position]
+
+    def search(self, query: np.ndarray, k: int = 10, n_probe: Optional[int] = None,
+               exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Top-k (song_id, similitud) escaneando solo las n_probe listas más cercanas"""
+        if len(self) == 0:
+            return []
+        candidates, scores = self._probe(query, n_probe)
+        return self._finalize(candidates, scores, k, exclude)
+
+    def iter_similar(self, song_id: int, n_probe: Optional[int] = None,
+                     batch_size: int = 10) -> Iterator[Tuple[int, float]]:
+        """(song_id, similitud) de las listas sondeadas en orden descendente, ordenados por bloques"""
+        query = self.vector(song_id)
+        if query is None:
+            return
+        candidates, scores = self._probe(query, n_probe)
+        scores = np.where(self.song_ids[candidates] == song_id, -np.inf, scores)
+        for song, score in iter_ranked(self.song_ids[candidates], scores, batch_size):
+            yield int(song), score
+
+    def _probe(self, query: np.ndarray, n_probe: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        query = _normalize(query)
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        probes = _top_k(self.centroids @ query, n_probe)
+
+        candidates = [np.arange(self.list_offsets[p], self.list_offsets[p + 1]) for p in probes]
+        candidates = np.concatenate(candidates)
+        return candidates, self.vectors[candidates] @ query
+
+    def exact_search(self, query: np.ndarray, k: int = 10,
+                     exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Búsqueda exhaustiva (referencia para medir recall)"""
+        if len(self) == 0:
+            return []
+        scores = self.vectors @ _normalize(query)
+        return self._finalize(np.arange(len(self)), scores, k, exclude)
+
+    def similar_songs(self, song_id: int, k: int = 10, n_probe: Optional[int] = None) -> List[Tuple[int, float]]:
+        query = self.vector(song_id)
+        if query is None:
+            return []
+        return self.search(query, k=k, n_probe=n_probe, exclude=song_id)
+
+    def _finalize(self, candidates, scores, k, exclude):
+        if exclude is not None:
+            scores = np.where(self.song_ids[candidates] == exclude, -np.inf, scores)
+        top = _top_k(scores, k)
+        top = top[np.isfinite(scores[top])]
+        return [(int(self.song_ids[candidates[i]]), float(scores[i])) for i in top]
+
+    def save(self, directory: str):
+        """Guarda el índice como archivos .npy (recargables con mmap)"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.FILES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "n_lists": self.n_lists,
+                "n_probe": self.n_probe,
+                "song_metadata": {str(k): v for k, v in self.song_metadata.items()},
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "SongVectorIndex":
+        """Carga un índice guardado; con mmap los vectores no se copian a memoria"""
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        index = cls(n_lists=config["n_lists"], n_probe=config["n_probe"])
+        for name in cls.FILES:
+            setattr(index, name, np.load(os.path.join(directory, f"{name}.npy"),
+                                         mmap_mode="r" if mmap else None))
+        index.song_metadata = {int(k): v for k, v in config["song_metadata"].items()}
+        index._build_lookups()
+        return index
+
+
+_default_index: Optional[SongVectorIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_index() -> SongVectorIndex:
+    """Índice compartido del proceso, cargado de settings.SONG_VECTOR_INDEX_DIR si existe"""
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                from django.conf import settings
+
+                directory = getattr(settings, "SONG_VECTOR_INDEX_DIR", None)
+                if directory and os.path.exists(os.path.join(directory, "index.json")):
+                    _default_index = SongVectorIndex.load(directory)
+                else:
+                    _default_index = SongVectorIndex()
+    return _default_index
+
+
+def set_default_index(index: SongVectorIndex):
+    """Reemplaza el índice compartido (p. ej. tras reconstruirlo)"""
+    global _default_index
+    with _default_index_lock:
+        _default_index = index
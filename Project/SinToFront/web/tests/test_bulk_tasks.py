@@ -0,0 +1,37 @@
+from django.middleware.csrf import get_token
+from django.test import Client, RequestFactory, TestCase
+
+from web.models import Task
+
+
+class BulkTaskCsrfTests(TestCase):
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.tasks = Task.objects.bulk_create([Task(title=f"Tarea {i}") for i in range(3)])
+
+    def post(self, url, payload, **headers):
+        return self.client.post(url, payload, content_type="application/json", **headers)
+
+    def csrf_headers(self):
+        token = get_token(RequestFactory().get("/"))
+        self.client.cookies["csrftoken"] = token
+        return {"HTTP_X_CSRFTOKEN": token}
+
+    def test_post_without_token_is_forbidden(self):
+        response = self.post("/api/tasks/bulk/delete/", {"ids": [task.id for task in self.tasks]})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_post_with_header_token(self):
+        response = self.post("/api/tasks/bulk/status/", {"ids": [self.tasks[0].id], "status": "DONE"},
+                             **self.csrf_headers())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"updated": 1})
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].id).status, Task.Status.DONE)
+
+    def test_validation_errors_are_400(self):
+        response = self.post("/api/tasks/bulk/archive/", {"ids": "todas"}, **self.csrf_headers())
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,112 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from web.services import SQLiteCache
+
+
+class _BusyBegin:
+    """Conexión que falla al pedir el bloqueo de escritura, como con otro proceso escribiendo"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, *args):
+        if sql == "BEGIN IMMEDIATE":
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, *args)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+
+class _SetBeforeDelete:
+    """Conexión en la que otro proceso guarda `key` justo antes de cada DELETE"""
+
+    def __init__(self, conn, key, value):
+        self._conn = conn
+        self._key = key
+        self._value = value
+
+    def execute(self, sql, *args):
+        if sql.startswith("DELETE"):
+            self._conn.execute(
+                "UPDATE cache_entries SET value = ?, expires_at = ? WHERE key = ?",
+                (pickle.dumps(self._value), time.time() + 60, self._key),
+            )
+        return self._conn.execute(sql, *args)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.sqlite3")
+        self.cache = SQLiteCache(self.path, max_entries=10)
+
+    def test_corrupt_entry_is_a_miss_and_is_removed(self):
+        self.cache.set("key", {"a": 1})
+        self.cache._connection().execute("UPDATE cache_entries SET value = ? WHERE key = ?", (b"not pickle", "key"))
+
+        self.assertIsNone(self.cache.get("key"))
+        count = self.cache._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_set_succeeds_when_cull_cannot_lock(self):
+        conn = self.cache._connection()
+        self.cache._local.conn = _BusyBegin(conn)
+        self.cache._sets_since_cull = SQLiteCache.CULL_EVERY - 1
+
+        self.assertTrue(self.cache.set("key", "value"))
+        self.cache._local.conn = conn
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertFalse(conn.in_transaction)
+
+    def test_cull_runs_once_per_cull_every_across_threads(self):
+        culls = []
+
+        def setter():
+            for _ in range(250):
+                if self.cache._cull_due():
+                    culls.append(1)
+
+        threads = [threading.Thread(target=setter) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(culls), 4 * 250 // SQLiteCache.CULL_EVERY)
+
+    def test_cull_keeps_max_entries(self):
+        for i in range(SQLiteCache.CULL_EVERY):
+            self.cache.set(f"key{i}", i, ttl=60 + i)
+
+        count = self.cache._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        self.assertEqual(count, 10)
+        self.assertEqual(self.cache.get(f"key{SQLiteCache.CULL_EVERY - 1}"), SQLiteCache.CULL_EVERY - 1)
+
+    def test_expired_entry_replaced_concurrently_is_kept(self):
+        self.cache.set("key", "old", ttl=-1)
+        conn = self.cache._connection()
+        self.cache._local.conn = _SetBeforeDelete(conn, "key", "new")
+
+        self.assertIsNone(self.cache.get("key"))
+        self.cache._local.conn = conn
+        self.assertEqual(self.cache.get("key"), "new")
+
+    def test_corrupt_entry_replaced_concurrently_is_kept(self):
+        self.cache.set("key", "old")
+        conn = self.cache._connection()
+        conn.execute("UPDATE cache_entries SET value = ? WHERE key = ?", (b"not pickle", "key"))
+        self.cache._local.conn = _SetBeforeDelete(conn, "key", "new")
+
+        self.assertIsNone(self.cache.get("key"))
+        self.cache._local.conn = conn
+        self.assertEqual(self.cache.get("key"), "new")
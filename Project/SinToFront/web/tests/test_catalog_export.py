@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+
+from django.test import TestCase
+
+from web.catalog_export import ITERATOR_CHUNK_SIZE, export_stream
+from web.models import Task
+
+ROWS = 5 * ITERATOR_CHUNK_SIZE
+# Pico de memoria de Python durante la exportación (un bloque del cursor más el de salida)
+PEAK_BOUND_BYTES = 4 * 2 ** 20
+
+
+def _export(fmt, compress=False) -> bytes:
+    return b"".join(export_stream("tasks", fmt, compress))
+
+
+class CatalogExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Task.objects.bulk_create(
+            Task(title=f"Tarea {i}", description=f"Descripción, con \"comillas\"\n{i}") for i in range(ROWS)
+        )
+
+    def test_csv_has_header_and_every_row(self):
+        rows = list(csv.reader(io.StringIO(_export("csv").decode("utf-8"))))
+
+        self.assertEqual(rows[0], ["id", "title", "description", "status", "created_at", "updated_at"])
+        self.assertEqual(len(rows), ROWS + 1)
+        self.assertEqual(rows[1][2], "Descripción, con \"comillas\"\n0")
+
+    def test_ndjson_lines_are_json_objects(self):
+        lines = _export("ndjson").splitlines()
+
+        self.assertEqual(len(lines), ROWS)
+        first = json.loads(lines[0])
+        self.assertEqual(first["title"], "Tarea 0")
+        self.assertEqual(set(first), {"id", "title", "description", "status", "created_at", "updated_at"})
+
+    def test_gzip_decompresses_to_the_plain_export(self):
+        for fmt in ("csv", "ndjson"):
+            with self.subTest(fmt=fmt):
+                self.assertEqual(gzip.decompress(_export(fmt, compress=True)), _export(fmt))
+
+    def test_streaming_memory_does_not_grow_with_rows(self):
+        peaks = {}
+        # Desde dos bloques del cursor (el anterior sigue vivo al pedir el siguiente)
+        small = 2 * ITERATOR_CHUNK_SIZE
+        for rows in (small, ROWS):
+            tracemalloc.start()
+            try:
+                size = sum(len(chunk) for chunk in export_stream("tasks", "csv", compress=True, limit=rows))
+                peaks[rows] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertGreater(size, 0)
+
+        self.assertLess(peaks[ROWS], PEAK_BOUND_BYTES)
+        self.assertLess(peaks[ROWS], 1.2 * peaks[small])
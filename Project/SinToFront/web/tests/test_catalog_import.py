@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from web.catalog_import import import_rows
+from web.models import Artist, Playlist, PlaylistEntry, Song, UserMusicStats
+
+
+class PlaylistCountersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="ana")
+        artist = Artist.objects.create(name="Artista")
+        cls.rock = Song.objects.create(title="Rock", artist=artist, genre="Rock")
+        cls.jazz = Song.objects.create(title="Jazz", artist=artist, genre="Jazz")
+        cls.playlists = [Playlist.objects.create(user=cls.user, name=f"Lista {i}") for i in range(5)]
+
+    def test_rebuild_counters_walks_every_chunk(self):
+        for i, playlist in enumerate(self.playlists):
+            PlaylistEntry.objects.bulk_create([
+                PlaylistEntry(playlist=playlist, song=self.rock if position % 2 else self.jazz, position=position)
+                for position in range(i)
+            ])
+
+        Playlist.objects.all().rebuild_counters(chunk_size=2)
+
+        for i, playlist in enumerate(self.playlists):
+            playlist.refresh_from_db()
+            self.assertEqual(playlist.song_count, i)
+            self.assertEqual(sum(playlist.genre_counts.values()), i)
+
+    def test_import_refreshes_only_touched_playlists(self):
+        touched, untouched = self.playlists[:2]
+        Playlist.objects.filter(pk=untouched.pk).update(song_count=99)
+        UserMusicStats.objects.for_user(self.user.id)
+
+        rows = [
+            {"playlist_id": touched.id, "song_id": self.rock.id, "position": 0},
+            {"playlist_id": touched.id, "song_id": self.jazz.id, "position": 1},
+        ]
+        self.assertEqual(sum(import_rows("playlist_entries", rows, batch_size=1)), 2)
+
+        touched.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual(touched.song_count, 2)
+        self.assertEqual(touched.genre_counts, {"Rock": 1, "Jazz": 1})
+        self.assertEqual(untouched.song_count, 99)
+        self.assertFalse(UserMusicStats.objects.filter(user_id=self.user.id).exists())
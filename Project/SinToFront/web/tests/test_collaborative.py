@@ -0,0 +1,176 @@
+import tempfile
+import threading
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from web.collaborative import ItemSimilarityEngine, get_default_engine, load_engine, set_default_engine
+from web.models import Artist, ListeningEvent, Song
+from web.recommendation_system import CollaborativeFilteringStrategy
+
+
+class _User:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class DefaultEngineLoadingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        artist = Artist.objects.create(name="Artista")
+        cls.songs = [Song.objects.create(title=f"Canción {i}", artist=artist) for i in range(3)]
+        a, b, c = cls.songs
+        ListeningEvent.objects.bulk_create([
+            ListeningEvent(user_id=1, song=a, plays=3),
+            ListeningEvent(user_id=1, song=b, plays=2),
+            ListeningEvent(user_id=2, song=a, plays=1),
+            ListeningEvent(user_id=2, song=b, plays=4),
+            ListeningEvent(user_id=3, song=a, plays=2),
+            ListeningEvent(user_id=3, song=c, plays=1),
+        ])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.enterContext(override_settings(COLLABORATIVE_MODEL_DIR=self.directory))
+        set_default_engine(None)
+        self.addCleanup(set_default_engine, None)
+
+    def test_default_engine_without_saved_model_is_empty_and_does_not_query(self):
+        with self.assertNumQueries(0):
+            engine = get_default_engine()
+
+        self.assertFalse(engine.is_fitted)
+        self.assertIs(get_default_engine(), engine)
+
+    def test_load_engine_fits_from_listening_events(self):
+        engine = load_engine()
+
+        self.assertTrue(engine.is_fitted)
+        self.assertEqual(sorted(engine.user_ids.tolist()), [1, 2, 3])
+
+    def test_default_engine_loads_the_saved_model(self):
+        fitted = load_engine()
+        fitted.save(self.directory)
+
+        with self.assertNumQueries(0):
+            engine = get_default_engine()
+
+        self.assertIsNot(engine, fitted)
+        self.assertEqual(engine.song_metadata, fitted.song_metadata)
+        for user_id in (1, 2, 3, 4):
+            self.assertEqual(engine.recommend(user_id), fitted.recommend(user_id))
+        # El modelo cargado con mmap sigue aceptando eventos nuevos
+        engine.partial_fit([(4, self.songs[0].id, 1.0)])
+        engine.compact()
+        self.assertIn(4, engine.user_ids.tolist())
+
+    def test_strategy_recommends_persisted_history_with_titles(self):
+        set_default_engine(load_engine())
+
+        recommendations = CollaborativeFilteringStrategy().recommend(_User(2), {})
+
+        self.assertEqual([rec.song_id for rec in recommendations], [self.songs[2].id])
+        self.assertEqual(recommendations[0].title, "Canción 2")
+        self.assertEqual(recommendations[0].artist, "Artista")
+
+
+class RecordListeningEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        artist = Artist.objects.create(name="Artista")
+        cls.songs = [Song.objects.create(title=f"Canción {i}", artist=artist) for i in range(2)]
+
+    def setUp(self):
+        set_default_engine(None)
+        self.addCleanup(set_default_engine, None)
+
+    def post(self, events):
+        return self.client.post("/api/listening-events/", {"events": events}, content_type="application/json")
+
+    def test_events_are_persisted_before_the_engine_is_updated(self):
+        a, b = self.songs
+        response = self.post([
+            {"user_id": 7, "song_id": a.id, "plays": 2},
+            {"user_id": 7, "song_id": b.id},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["affected_users"], [7])
+        self.assertEqual(
+            sorted(ListeningEvent.objects.values_list("user_id", "song_id", "plays")),
+            [(7, a.id, 2), (7, b.id, 1)],
+        )
+        self.assertIn(7, get_default_engine().user_ids.tolist())
+
+        # Un reentrenamiento desde la base conserva los eventos
+        self.assertIn(7, load_engine().user_ids.tolist())
+
+    def test_unknown_song_is_rejected_without_side_effects(self):
+        response = self.post([{"user_id": 7, "song_id": self.songs[0].id}, {"user_id": 7, "song_id": 999_999}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ListeningEvent.objects.exists())
+        self.assertNotIn(7, get_default_engine().user_ids.tolist())
+
+    def test_fractional_plays_are_rejected(self):
+        response = self.post([{"user_id": 7, "song_id": self.songs[0].id, "weight": 0.5}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ListeningEvent.objects.exists())
+
+
+class BackgroundCompactionTests(SimpleTestCase):
+    BASE = [(1, 10, 3.0), (1, 11, 2.0), (2, 10, 1.0), (2, 12, 4.0), (3, 11, 2.0), (3, 12, 1.0)]
+
+    def assertMatchesRefit(self, engine, events):
+        refit = ItemSimilarityEngine().fit(events)
+        for user_id in (1, 2, 3, 4):
+            self.assertEqual(engine.recommend(user_id), refit.recommend(user_id))
+
+    def test_partial_fit_compacts_in_the_background(self):
+        engine = ItemSimilarityEngine(compaction_threshold=1).fit(self.BASE)
+        compacting, release = threading.Event(), threading.Event()
+        build = engine._compacted
+
+        def blocking_build(*args):
+            compacting.set()
+            release.wait(5)
+            return build(*args)
+
+        engine._compacted = blocking_build
+        engine.partial_fit([(4, 10, 2.0)])
+
+        # partial_fit no espera a la compactación ni bloquea las consultas
+        self.assertTrue(compacting.wait(5))
+        self.assertTrue(engine.recommend(4))
+        release.set()
+        engine.wait_for_compaction(5)
+
+        self.assertEqual(engine.pending_events, 0)
+        self.assertMatchesRefit(engine, self.BASE + [(4, 10, 2.0)])
+
+    def test_events_during_compaction_are_kept(self):
+        engine = ItemSimilarityEngine(compaction_threshold=10).fit(self.BASE)
+        engine.partial_fit([(4, 10, 2.0)])
+        compacting, release = threading.Event(), threading.Event()
+        build = engine._compacted
+
+        def blocking_build(*args):
+            compacting.set()
+            release.wait(5)
+            return build(*args)
+
+        engine._compacted = blocking_build
+        thread = threading.Thread(target=engine.compact)
+        thread.start()
+        self.assertTrue(compacting.wait(5))
+        engine.partial_fit([(4, 11, 1.0), (5, 12, 3.0)])
+        release.set()
+        thread.join(5)
+
+        self.assertEqual(engine.pending_events, 2)
+        self.assertIn(5, engine.user_ids.tolist())
+        engine._compacted = build
+        engine.compact()
+        self.assertMatchesRefit(engine, self.BASE + [(4, 10, 2.0), (4, 11, 1.0), (5, 12, 3.0)])
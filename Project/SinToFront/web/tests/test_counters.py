@@ -0,0 +1,108 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from web.django_patterns import AddSongToPlaylistCommand, CommandInvoker
+from web.models import Artist, Playlist, PlaylistEntry, Song, UserMusicStats
+
+
+class PlaylistCountersSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="ana")
+        artist = Artist.objects.create(name="Artista")
+        cls.rock = Song.objects.create(title="Rock", artist=artist, genre="Rock")
+        cls.quoted = Song.objects.create(title="Raro", artist=artist, genre='Lo "raro"')
+        cls.untagged = Song.objects.create(title="Sin género", artist=artist)
+
+    def setUp(self):
+        self.playlist = Playlist.objects.create(user=self.user, name="Lista")
+        # Con fila de estadísticas: las señales la mantienen
+        UserMusicStats.objects.for_user(self.user.id)
+
+    def assertCounters(self, song_count, genre_counts, playlist_count=1):
+        playlist = Playlist.objects.get(pk=self.playlist.pk)
+        stats = UserMusicStats.objects.get(user_id=self.user.id)
+        self.assertEqual((playlist.song_count, playlist.genre_counts), (song_count, genre_counts))
+        self.assertEqual(
+            (stats.playlist_count, stats.song_count, stats.genre_counts),
+            (playlist_count, song_count, genre_counts),
+        )
+        # Lo mantenido coincide con una reconstrucción completa
+        UserMusicStats.objects.rebuild([self.user.id])
+        rebuilt = UserMusicStats.objects.get(user_id=self.user.id)
+        self.assertEqual((rebuilt.song_count, rebuilt.genre_counts), (song_count, genre_counts))
+
+    def test_add_updates_playlist_and_user(self):
+        self.playlist.append(self.rock)
+        self.playlist.append(self.rock)
+        self.playlist.append(self.quoted)
+        self.playlist.append(self.untagged)
+
+        self.assertCounters(4, {"Rock": 2, 'Lo "raro"': 1})
+
+    def test_undo_removes_only_the_added_entry(self):
+        self.playlist.append(self.rock)
+        invoker = CommandInvoker()
+        invoker.execute_command(AddSongToPlaylistCommand(self.playlist.id, self.rock.id))
+        self.assertCounters(2, {"Rock": 2})
+
+        self.assertTrue(invoker.undo_last())
+
+        self.assertCounters(1, {"Rock": 1})
+        self.assertEqual(PlaylistEntry.objects.filter(playlist=self.playlist).count(), 1)
+
+    def test_removing_last_entry_of_a_genre_drops_it(self):
+        entry = self.playlist.append(self.quoted)
+
+        self.playlist.remove(entry.id)
+
+        self.assertCounters(0, {})
+
+    def test_deleting_playlist_discounts_its_totals(self):
+        other = Playlist.objects.create(user=self.user, name="Otra")
+        other.append(self.rock)
+        self.playlist.append(self.rock)
+        self.playlist.append(self.quoted)
+
+        self.playlist.delete()
+
+        stats = UserMusicStats.objects.get(user_id=self.user.id)
+        self.assertEqual((stats.playlist_count, stats.song_count, stats.genre_counts), (1, 1, {"Rock": 1}))
+
+    def test_deleting_song_discounts_its_entries(self):
+        self.playlist.append(self.rock)
+        self.playlist.append(self.quoted)
+
+        Song.objects.filter(pk=self.quoted.pk).delete()
+
+        self.assertCounters(1, {"Rock": 1})
+
+    def test_failed_playlist_delete_does_not_silence_later_removals(self):
+        entry = self.playlist.append(self.rock)
+
+        def fail(sender, instance, **kwargs):
+            raise RuntimeError("fallo al borrar")
+
+        pre_delete.connect(fail, sender=Playlist)
+        self.addCleanup(pre_delete.disconnect, fail, sender=Playlist)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.playlist.delete()
+        pre_delete.disconnect(fail, sender=Playlist)
+
+        self.playlist.remove(entry.id)
+
+        self.assertCounters(0, {})
+
+    def test_append_computes_the_position_in_the_insert(self):
+        self.playlist.append(self.rock)
+
+        with CaptureQueriesContext(connection) as queries:
+            entry = self.playlist.append(self.quoted)
+
+        self.assertEqual(entry.position, 1)
+        first = queries.captured_queries[0]["sql"]
+        self.assertTrue(first.startswith("INSERT"), first)
+        self.assertIn("MAX", first)
@@ -0,0 +1,14 @@
+from django.test import SimpleTestCase, override_settings
+
+from web.db import pragma_statements, sqlite_pragmas
+
+
+class SQLitePragmasTests(SimpleTestCase):
+    @override_settings(SQLITE_PRAGMAS_ENABLED=False)
+    def test_disabled_profile_leaves_only_query_only(self):
+        self.assertEqual(sqlite_pragmas(), {})
+        self.assertEqual(pragma_statements(sqlite_pragmas(), read_only=True), ["PRAGMA query_only=1"])
+
+    @override_settings(SQLITE_PRAGMAS_ENABLED=True, SQLITE_PRAGMAS={"busy_timeout": 100})
+    def test_enabled_profile_is_read_from_settings_only(self):
+        self.assertEqual(sqlite_pragmas(), {"busy_timeout": 100})
@@ -0,0 +1,68 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from web.django_patterns import DateRangeFilter, FilterContext, GenreFilter, SearchFilter
+from web.models import Artist, Song
+from web.services import InMemoryCache
+
+
+def _context(*filters):
+    context = FilterContext(Song.objects.all())
+    for filter_strategy in filters:
+        context.add_filter(filter_strategy)
+    return context
+
+
+class FacetCacheKeyTests(TestCase):
+    def test_order_and_repeated_filters_share_the_key(self):
+        first = _context(GenreFilter("Rock"), DateRangeFilter("2024-01-01", "2024-02-01"))
+        second = _context(DateRangeFilter("2024-01-01", "2024-02-01"), GenreFilter(" Rock "), GenreFilter("Rock"))
+
+        self.assertEqual(first.cache_key(), second.cache_key())
+
+    def test_equivalent_search_text_shares_the_key_and_empty_search_is_ignored(self):
+        self.assertEqual(_context(SearchFilter("Canción  ÁMOR")).cache_key(), _context(SearchFilter("cancion amor")).cache_key())
+        self.assertEqual(_context(SearchFilter("  ")).cache_key(), _context().cache_key())
+
+    def test_date_and_datetime_at_midnight_share_the_key(self):
+        midnight = timezone.make_aware(datetime.datetime(2024, 1, 1))
+
+        self.assertEqual(
+            _context(DateRangeFilter(datetime.date(2024, 1, 1), "2024-02-01")).cache_key(),
+            _context(DateRangeFilter(midnight, "2024-02-01")).cache_key(),
+        )
+
+    def test_different_filters_or_extras_change_the_key(self):
+        self.assertNotEqual(_context(GenreFilter("Rock")).cache_key(), _context(GenreFilter("Jazz")).cache_key())
+        self.assertNotEqual(_context().cache_key(edges=[1]), _context().cache_key(edges=[2]))
+
+
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        artist = Artist.objects.create(name="Artista")
+        Song.objects.create(title="Rock", artist=artist, genre="Rock")
+        Song.objects.create(title="Jazz", artist=artist, genre="Jazz")
+        Song.objects.create(title="Sin género", artist=artist, genre="")
+
+    def test_songs_without_genre_count_in_total_but_not_as_a_genre(self):
+        facets = _context().facets()
+
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(facets["genres"], {"Jazz": 1, "Rock": 1})
+
+    def test_default_histogram_includes_songs_created_just_now(self):
+        Song.objects.create(title="Reciente", artist=Artist.objects.get(), genre="Rock")
+
+        facets = _context().facets()
+
+        self.assertEqual(sum(bucket["count"] for bucket in facets["created_at"]), 4)
+
+    def test_default_range_is_served_from_the_cache_on_the_next_call(self):
+        cache = InMemoryCache()
+        first = _context(GenreFilter("Rock")).facets(cache=cache)
+        Song.objects.create(title="Otra", artist=Artist.objects.get(), genre="Rock")
+
+        self.assertEqual(_context(GenreFilter("Rock")).facets(cache=cache), first)
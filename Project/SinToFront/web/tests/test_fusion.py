@@ -0,0 +1,81 @@
+import random
+
+from django.test import SimpleTestCase
+
+from web.fusion import ScoreFusion
+from web.records import Recommendation
+
+
+def _reference(ranked_lists, weights, method, rrf_k=60):
+    """Fusión con diccionarios, como la implementación anterior: {key: score}"""
+    totals = {}
+    for recommendations, weight in zip(ranked_lists, weights):
+        for rank, rec in enumerate(recommendations, start=1):
+            contribution = weight / (rrf_k + rank) if method == "rrf" else weight * rec.score
+            totals[rec.key] = totals.get(rec.key, 0.0) + contribution
+    return totals
+
+
+def _random_lists(rng, with_ids=True):
+    lists = []
+    for _ in range(3):
+        song_ids = rng.sample(range(40), rng.randint(0, 15))
+        lists.append([
+            Recommendation(song_id if with_ids else None, f"Canción {song_id}", "Artista", rng.random())
+            for song_id in song_ids
+        ])
+    return lists
+
+
+class ScoreFusionTests(SimpleTestCase):
+    def assertMatchesReference(self, fused, totals, limit):
+        self.assertEqual(len(fused), min(limit, len(totals)))
+        scores = [rec.score for rec in fused]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for rec in fused:
+            self.assertAlmostEqual(rec.score, totals[rec.key])
+        # Ningún candidato descartado supera al último devuelto
+        if fused:
+            returned = {rec.key for rec in fused}
+            rest = [score for key, score in totals.items() if key not in returned]
+            self.assertTrue(all(score <= scores[-1] + 1e-12 for score in rest))
+
+    def test_matches_dict_reference(self):
+        rng = random.Random(0)
+        for method in ScoreFusion.METHODS:
+            for with_ids in (True, False):
+                for _ in range(20):
+                    lists = _random_lists(rng, with_ids)
+                    weights = [rng.random() for _ in lists]
+                    fused = ScoreFusion(method, limit=10).fuse(lists, weights)
+                    with self.subTest(method=method, with_ids=with_ids):
+                        self.assertMatchesReference(fused, _reference(lists, weights, method), 10)
+
+    def test_inputs_are_not_mutated(self):
+        lists = [
+            [Recommendation(1, "A", "X", 0.9), Recommendation(2, "B", "X", 0.5)],
+            [Recommendation(2, "B", "X", 0.8)],
+        ]
+        before = [[rec.to_row() for rec in recommendations] for recommendations in lists]
+
+        fused = ScoreFusion().fuse(lists, [0.5, 0.5])
+
+        self.assertEqual([[rec.to_row() for rec in recommendations] for recommendations in lists], before)
+        self.assertTrue(all(rec is not original for rec in fused for original in lists[0] + lists[1]))
+
+    def test_rrf_depends_on_rank_not_score(self):
+        lists = [
+            [Recommendation(1, "A", "X", 100.0), Recommendation(2, "B", "X", 0.1)],
+            [Recommendation(2, "B", "X", 0.1), Recommendation(1, "A", "X", 0.1)],
+        ]
+
+        fused = ScoreFusion("rrf").fuse(lists, [1.0, 1.0])
+
+        self.assertAlmostEqual(fused[0].score, fused[1].score)
+
+    def test_empty_lists(self):
+        self.assertEqual(ScoreFusion().fuse([[], []], [0.5, 0.5]), [])
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            ScoreFusion("borda")
@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from web.django_patterns import MusicFacade, SongRepository
+from web.models import Artist, Song
+
+
+class SongNaturalKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.artist = Artist.objects.create(name="Artista")
+        cls.song = Song.objects.create(title="Existente", artist=cls.artist, genre="Rock")
+
+    def setUp(self):
+        self.repository = SongRepository(Song)
+
+    def test_natural_key_is_unique(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Song.objects.create(title="Existente", artist=self.artist)
+
+    def test_get_or_create_many_reuses_and_creates(self):
+        rows = self.repository.get_or_create_many([
+            {"artist": "Artista", "title": "Existente"},
+            {"artist": "Artista", "title": "Nueva", "genre": "Jazz"},
+            {"artist": "Otro", "title": "Nueva"},
+            {"artist": "Artista", "title": "Nueva"},
+        ])
+
+        new = Song.objects.get(artist=self.artist, title="Nueva")
+        other = Song.objects.get(artist__name="Otro", title="Nueva")
+        self.assertEqual(rows, [(self.song.id, "Rock"), (new.id, "Jazz"), (other.id, ""), (new.id, "Jazz")])
+        self.assertEqual(Song.objects.count(), 3)
+
+    def test_song_created_concurrently_is_reselected(self):
+        # Otro proceso crea la canción entre la lectura y el INSERT
+        real = SongRepository._by_natural_key
+        calls = []
+
+        def stale_first_read(repository, keys):
+            calls.append(keys)
+            return {} if len(calls) == 1 else real(repository, keys)
+
+        with mock.patch.object(SongRepository, "_by_natural_key", stale_first_read):
+            rows = self.repository.get_or_create_many([{"artist": "Artista", "title": "Existente"}])
+
+        self.assertEqual(rows, [(self.song.id, "Rock")])
+        self.assertEqual(Song.objects.count(), 1)
+
+    def test_complete_playlist_has_its_counters(self):
+        user = User.objects.create(username="ana")
+
+        playlist = MusicFacade().create_complete_playlist(user, "Lista", [
+            {"artist": "Artista", "title": "Existente"},
+            {"artist": "Artista", "title": "Otra", "genre": "Jazz"},
+            {"artist": "Artista", "title": "Existente"},
+        ], batch_size=2)
+
+        self.assertEqual(playlist.song_count, 3)
+        self.assertEqual(playlist.genre_counts, {"Rock": 2, "Jazz": 1})
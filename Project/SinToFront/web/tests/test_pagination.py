@@ -0,0 +1,92 @@
+import datetime
+
+from django.db.models.functions import Lower
+from django.test import TestCase
+from django.utils import timezone
+
+from web.models import Task
+from web.pagination import CURSOR_PREVIOUS, InvalidCursor, KeysetPaginator, encode_cursor
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        moment = timezone.now().replace(microsecond=123456)
+        # Marcas de tiempo repetidas: el desempate lo hace el id
+        Task.objects.bulk_create([
+            Task(title=["beta", "Alfa", "alfa", "gamma"][i % 4], created_at=moment - datetime.timedelta(seconds=i // 3))
+            for i in range(10)
+        ])
+
+    def by_created(self, per_page):
+        return KeysetPaginator(Task.objects.all(), ["-created_at", "-id"], per_page)
+
+    def walk(self, paginator):
+        pages, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            pages.append(page)
+            if not page.has_next():
+                return pages
+            cursor = page.next_cursor
+
+    def test_forward_walk_visits_every_row_once_in_order(self):
+        for per_page in (1, 3, 4, 10, 11):
+            with self.subTest(per_page=per_page):
+                pages = self.walk(self.by_created(per_page))
+                ids = [task.id for page in pages for task in page]
+                expected = list(Task.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+                self.assertEqual(ids, expected)
+                self.assertTrue(all(len(page) == per_page for page in pages[:-1]))
+
+    def test_exact_multiple_has_no_empty_last_page(self):
+        pages = self.walk(self.by_created(5))
+
+        self.assertEqual([len(page) for page in pages], [5, 5])
+        self.assertFalse(pages[0].has_previous())
+        self.assertIsNone(pages[-1].next_cursor)
+
+    def test_backward_walk_returns_the_same_pages(self):
+        paginator = self.by_created(3)
+        forward = self.walk(paginator)
+
+        backward, page = [forward[-1]], forward[-1]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.append(page)
+
+        self.assertEqual([[t.id for t in p] for p in reversed(backward)], [[t.id for t in p] for p in forward])
+
+    def test_cursor_before_the_first_row_is_empty(self):
+        first = Task.objects.order_by("-created_at", "-id").first()
+        cursor = encode_cursor(CURSOR_PREVIOUS, [first.created_at, first.id])
+
+        page = self.by_created(3).page(cursor)
+
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_other_pages())
+
+    def test_annotation_ordering_with_case_ties(self):
+        queryset = Task.objects.annotate(title_lower=Lower("title"))
+        pages = self.walk(KeysetPaginator(queryset, ["title_lower", "id"], 2))
+
+        ids = [task.id for page in pages for task in page]
+        self.assertEqual(ids, list(queryset.order_by("title_lower", "id").values_list("id", flat=True)))
+
+    def test_empty_queryset(self):
+        page = KeysetPaginator(Task.objects.none(), ["-id"], 5).page()
+
+        self.assertEqual(len(page), 0)
+        self.assertFalse(page.has_other_pages())
+
+    def test_invalid_cursor(self):
+        for cursor in ("no-base64!", encode_cursor("x", [1, 2]), encode_cursor("n", [1])):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                self.by_created(3).page(cursor)
+
+    def test_list_view_rejects_invalid_cursor(self):
+        self.assertEqual(self.client.get("/tasks/", {"cursor": "basura"}).status_code, 404)
+        response = self.client.get("/tasks/", {"sort": "title"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page_obj"]), 10)
+        self.assertFalse(response.context["page_obj"].has_other_pages())
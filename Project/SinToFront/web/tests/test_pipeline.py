@@ -0,0 +1,214 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from web.fusion import ScoreFusion
+from web.ranking import CandidateStream
+from web.records import Recommendation
+from web.recommendation_system import (
+    DiversityReranker, HybridStrategy, PipelineRegistry, RecommendationPipeline, RecommendationStrategy,
+    RecommendationSystemBuilder, _strategy_executor, _take_within,
+)
+
+
+class _User:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class _ListStrategy(RecommendationStrategy):
+    """Candidatos fijos; espera `delay` antes de cada uno a partir del `slow_from`"""
+
+    def __init__(self, recommendations, slow_from=None, delay=0.0, batch_delay=0.0):
+        self.recommendations = recommendations
+        self.slow_from = slow_from
+        self.delay = delay
+        self.batch_delay = batch_delay
+
+    def recommend(self, user, context):
+        return list(self.recommendations)
+
+    def recommend_within(self, user, context, deadline):
+        return CandidateStream(self.stream(user, context)).take(len(self.recommendations), deadline)
+
+    def stream(self, user, context):
+        for position, rec in enumerate(self.recommendations):
+            if self.slow_from is not None and position >= self.slow_from:
+                time.sleep(self.delay)
+            yield rec
+
+    def stream_batch(self, requests, k, deadline=None):
+        time.sleep(self.batch_delay * len(requests))
+        return super().stream_batch(requests, k, deadline)
+
+
+def _songs(start, count, artist=None):
+    return [
+        Recommendation(song_id, f"Canción {song_id}", artist or f"Artista {song_id}", 1.0 - song_id / 1000)
+        for song_id in range(start, start + count)
+    ]
+
+
+class PipelineDeadlineTests(SimpleTestCase):
+    def test_deepening_pulls_respect_strategy_deadline(self):
+        # Todas del mismo artista: la diversidad obliga a pedir más páginas al flujo lento
+        slow = _ListStrategy(_songs(1, 100, artist="Mismo"), slow_from=3, delay=1.0)
+        fast = _ListStrategy(_songs(200, 1))
+        pipeline = RecommendationPipeline(
+            "test", [slow, fast], [0.5, 0.5], [0.05, 0.05],
+            fusion=ScoreFusion(), rerankers=[DiversityReranker()], limit=3,
+        )
+
+        start = time.monotonic()
+        recommendations, _ = pipeline.run(_User(1), {})
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(len(recommendations), 2)
+
+    def test_single_strategy_deepening_respects_deadline(self):
+        slow = _ListStrategy(_songs(1, 100, artist="Mismo"), slow_from=3, delay=1.0)
+        pipeline = RecommendationPipeline(
+            "test", [slow], [1.0], [0.05], rerankers=[DiversityReranker()], limit=3,
+        )
+
+        start = time.monotonic()
+        recommendations, _ = pipeline.run(_User(1), {})
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(len(recommendations), 1)
+
+    def test_batch_deadline_scales_with_batch_size(self):
+        # 20 peticiones × 10 ms superan el plazo de una petición, no el del lote
+        batched = _ListStrategy(_songs(1, 5), batch_delay=0.01)
+        other = _ListStrategy(_songs(100, 5))
+        pipeline = RecommendationPipeline(
+            "test", [batched, other], [0.5, 0.5], [0.1, 0.1], fusion=ScoreFusion(), limit=5,
+        )
+
+        results = pipeline.run_batch([(_User(i), {}) for i in range(20)])
+
+        for _, metadata in results:
+            self.assertEqual(metadata["contributors"], ["_ListStrategy", "_ListStrategy"])
+
+
+    @mock.patch("web.recommendation_system.BATCH_DEADLINE", 0.2)
+    def test_batch_deadline_is_capped(self):
+        # 20 × 20 ms caben en 20 plazos de 100 ms, pero no en el tope del lote
+        batched = _ListStrategy(_songs(1, 5), batch_delay=0.02)
+        other = _ListStrategy(_songs(100, 5))
+        pipeline = RecommendationPipeline(
+            "test", [batched, other], [0.5, 0.5], [0.1, 0.1], fusion=ScoreFusion(), limit=5,
+        )
+
+        start = time.monotonic()
+        results = pipeline.run_batch([(_User(i), {}) for i in range(20)])
+
+        self.assertLess(time.monotonic() - start, 0.35)
+        for _, metadata in results:
+            self.assertEqual(metadata["contributors"], ["_ListStrategy"])
+
+
+class CandidateStreamTests(SimpleTestCase):
+    def test_shared_stream_is_safe_across_threads(self):
+        # Como en ContentBasedStrategy.stream_batch: vistas de un flujo compartido en varios hilos
+        shared = CandidateStream(_ListStrategy(_songs(1, 200), slow_from=0, delay=0.0005).stream(None, {}))
+        views = [CandidateStream(shared) for _ in range(8)]
+
+        pages = list(_strategy_executor.map(lambda view: view.take(200), views))
+
+        expected = [rec.song_id for rec in _songs(1, 200)]
+        for page in pages:
+            self.assertEqual([rec.song_id for rec in page], expected)
+
+    def test_waiting_for_the_lock_respects_the_deadline(self):
+        stream = CandidateStream(_ListStrategy(_songs(1, 5), slow_from=0, delay=0.3).stream(None, {}))
+        _strategy_executor.submit(stream.take, 1)
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        stream.take(1, time.monotonic() + 0.05)
+
+        self.assertLess(time.monotonic() - start, 0.2)
+
+
+class StrategyPoolTests(SimpleTestCase):
+    # Más tareas abandonadas que hilos en el pool (16): deben soltarlos al pasar su plazo
+    ABANDONED = 24
+
+    def assertPoolIsFree(self):
+        start = time.monotonic()
+        self.assertTrue(_strategy_executor.submit(lambda: True).result(timeout=0.3))
+        self.assertLess(time.monotonic() - start, 0.3)
+
+    def test_timed_out_pulls_release_their_threads(self):
+        for _ in range(self.ABANDONED):
+            stream = CandidateStream(_ListStrategy(_songs(1, 100), slow_from=0, delay=0.02).stream(None, {}))
+            _take_within(stream, 100, time.monotonic() + 0.01)
+
+        self.assertPoolIsFree()
+
+    def test_timed_out_strategies_release_their_threads(self):
+        slow = _ListStrategy(_songs(1, 100), slow_from=0, delay=0.02)
+        hybrid = HybridStrategy([slow] * self.ABANDONED, [1.0] * self.ABANDONED, deadlines=[0.01] * self.ABANDONED)
+
+        hybrid.recommend(_User(1), {})
+
+        self.assertEqual(hybrid.get_execution_report()["contributors"], [])
+        self.assertPoolIsFree()
+
+
+class PipelineCompilationTests(SimpleTestCase):
+    def build(self):
+        return (RecommendationSystemBuilder()
+                .add_strategy("collaborative", 0.6)
+                .add_strategy("content", 0.4)
+                .add_decorator("diversity")
+                .with_limit(5))
+
+    def test_pipeline_is_immutable(self):
+        pipeline = self.build().build_pipeline("test")
+
+        with self.assertRaises(AttributeError):
+            pipeline.limit = 20
+        with self.assertRaises(AttributeError):
+            pipeline.extra = True
+        self.assertIsInstance(pipeline.strategies, tuple)
+        self.assertIsInstance(pipeline.rerankers, tuple)
+        self.assertEqual(pipeline.limit, 5)
+
+    def test_builder_changes_do_not_leak_into_compiled_pipeline(self):
+        builder = self.build()
+        pipeline = builder.build_pipeline("test")
+
+        builder.add_strategy("content", 1.0).add_decorator("freshness").with_limit(20)
+
+        self.assertEqual(len(pipeline.strategies), 2)
+        self.assertEqual(pipeline.weights, (0.6, 0.4))
+        self.assertEqual([reranker.name for reranker in pipeline.rerankers], ["diversity"])
+
+    def test_registry_compiles_once_and_recompiles_on_register(self):
+        registry = PipelineRegistry({"test": self.build()})
+
+        first = registry.get("test")
+        self.assertIs(registry.get("test"), first)
+
+        registry.register("test", self.build().with_limit(3))
+        self.assertIsNot(registry.get("test"), first)
+        self.assertEqual(registry.get("test").limit, 3)
+
+    def test_unknown_pipeline(self):
+        with self.assertRaises(ValueError):
+            PipelineRegistry().get("missing")
+
+    def test_run_does_not_mutate_strategy_results(self):
+        shared = _songs(1, 5)
+        before = [rec.to_row() for rec in shared]
+        pipeline = RecommendationPipeline(
+            "test", [_ListStrategy(shared), _ListStrategy(_songs(3, 5))], [0.5, 0.5], [1.0, 1.0],
+            fusion=ScoreFusion(), rerankers=[DiversityReranker()], limit=4,
+        )
+
+        pipeline.run(_User(1), {})
+
+        self.assertEqual([rec.to_row() for rec in shared], before)
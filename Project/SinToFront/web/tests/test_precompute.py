@@ -0,0 +1,87 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from web.catalog_import import import_rows
+from web.collaborative import get_default_engine, load_engine, set_default_engine
+from web.models import Artist, ListeningEvent, PrecomputedRecommendation, Song
+from web.records import Recommendation
+from web.recommendation_system import PrecomputedRecommendationStore, RecommendationFacade
+
+
+class _User:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class PrecomputeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        artists = [Artist.objects.create(name=f"Artista {i}") for i in range(3)]
+        cls.songs = [Song.objects.create(title=f"Canción {i}", artist=artists[i]) for i in range(3)]
+        a, b, c = cls.songs
+        ListeningEvent.objects.bulk_create([
+            ListeningEvent(user_id=1, song=a, plays=3),
+            ListeningEvent(user_id=1, song=b, plays=2),
+            ListeningEvent(user_id=2, song=a, plays=1),
+            ListeningEvent(user_id=2, song=b, plays=4),
+            ListeningEvent(user_id=3, song=a, plays=2),
+            ListeningEvent(user_id=3, song=c, plays=1),
+        ])
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.enterContext(override_settings(COLLABORATIVE_MODEL_DIR=self.directory))
+        set_default_engine(None)
+        self.addCleanup(set_default_engine, None)
+        self.store = PrecomputedRecommendationStore()
+
+    def test_job_fits_engine_from_listening_events(self):
+        call_command("precompute_recommendations", strategy="collaborative", processes=1, stdout=StringIO())
+
+        results = self.store.get_many([1, 2, 3], "collaborative")
+        self.assertEqual(sorted(results), [1, 2, 3])
+        self.assertEqual([rec.song_id for rec in results[2][0]], [self.songs[2].id])
+        self.assertEqual(results[2][0][0].title, "Canción 2")
+
+    def test_job_saves_the_model_for_the_web_processes(self):
+        call_command("precompute_recommendations", strategy="collaborative", processes=1, stdout=StringIO())
+        set_default_engine(None)
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "model.json")))
+        self.assertEqual(sorted(get_default_engine().user_ids.tolist()), [1, 2, 3])
+
+    def test_empty_and_partial_results_are_not_stored(self):
+        song_id = self.songs[0].id
+        saved = self.store.save_many("hybrid", [
+            (1, []),
+            (2, [Recommendation(song_id, "Canción 0", "Artista 0", 1.0), Recommendation(None, "X", "Y", 0.5)]),
+            (3, [Recommendation(song_id, "Canción 0", "Artista 0", 1.0)]),
+        ])
+
+        self.assertEqual(saved, 1)
+        self.assertEqual(list(PrecomputedRecommendation.objects.values_list("user_id", flat=True)), [3])
+
+    def test_facade_computes_live_when_row_is_empty(self):
+        PrecomputedRecommendation.objects.create(user_id=2, strategy="collaborative", song_ids=b"", scores=b"")
+        set_default_engine(load_engine())
+        facade = RecommendationFacade(precomputed_store=self.store)
+
+        recommendations, metadata = facade.get_recommendations_with_metadata(_User(2), "collaborative")
+
+        self.assertNotEqual(metadata.get("source"), "precomputed")
+        self.assertEqual([rec.song_id for rec in recommendations], [self.songs[2].id])
+
+    def test_importing_events_invalidates_precomputed_rows(self):
+        self.store.save_many("collaborative", [
+            (user_id, [Recommendation(self.songs[0].id, "Canción 0", "Artista 0", 1.0)]) for user_id in (1, 2)
+        ])
+
+        list(import_rows("events", [{"user_id": 1, "song_id": self.songs[2].id}]))
+
+        self.assertEqual(list(PrecomputedRecommendation.objects.values_list("user_id", flat=True)), [2])
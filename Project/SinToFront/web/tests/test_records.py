@@ -0,0 +1,20 @@
+from django.test import SimpleTestCase
+
+from web.records import Recommendation, from_rows, to_rows
+
+
+class RecommendationTests(SimpleTestCase):
+    def test_equal_records_hash_alike(self):
+        first = Recommendation(1, "Canción", "Artista", 0.5)
+        same = Recommendation(1, "Canción", "Artista", 0.5)
+        rescored = first.replace(score=0.7)
+
+        self.assertEqual(hash(first), hash(same))
+        self.assertEqual({first, same, rescored}, {first, rescored})
+        self.assertEqual({first: "a"}[same], "a")
+
+    def test_rows_round_trip(self):
+        records = [Recommendation(1, "Canción", "Artista", 0.5, "2024-01-01", 0.9),
+                   Recommendation(None, "Otra", "Artista", 0.1)]
+
+        self.assertEqual(from_rows(to_rows(records)), records)
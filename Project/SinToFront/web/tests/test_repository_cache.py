@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from web import django_patterns
+from web.django_patterns import (
+    CachedPlaylistRepository,
+    CachedSongRepository,
+    MusicService,
+    connect_cache_observers,
+    repository_cache,
+    song_cache_key,
+)
+from web.models import Artist, Playlist, Song
+from web.services import InMemoryCache
+
+
+@override_settings(REPOSITORY_CACHE={"BACKEND": "memory"})
+class RepositoryCacheTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(django_patterns, "_repository_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connecting_observers_does_not_create_the_cache(self):
+        connect_cache_observers()
+
+        self.assertIsNone(django_patterns._repository_cache)
+
+    def test_first_invalidation_creates_the_cache_and_deletes_the_key(self):
+        song = Song.objects.create(title="Canción", artist=Artist.objects.create(name="Artista"))
+        cache = django_patterns._repository_cache
+        self.assertIsInstance(cache, InMemoryCache)
+
+        cache.set(song_cache_key(song.pk), song)
+        song.title = "Otra"
+        song.save()
+
+        self.assertIs(repository_cache(), cache)
+        self.assertIsNone(cache.get(song_cache_key(song.pk)))
+
+    def _playlists(self, user):
+        return CachedPlaylistRepository(Playlist, repository_cache()).get_user_playlists(user)
+
+    def test_appending_and_removing_entries_invalidates_the_cached_playlists(self):
+        user = User.objects.create_user("oyente")
+        playlist = Playlist.objects.create(user=user, name="Lista")
+        song = Song.objects.create(title="Canción", artist=Artist.objects.create(name="Artista"), genre="Rock")
+        self.assertEqual(self._playlists(user)[0].song_count, 0)
+
+        entry = playlist.append(song)
+        cached = self._playlists(user)[0]
+        self.assertEqual((cached.song_count, cached.genre_counts), (1, {"Rock": 1}))
+
+        playlist.remove(entry.id)
+        self.assertEqual(self._playlists(user)[0].song_count, 0)
+
+    def test_bulk_append_invalidates_the_cached_playlists(self):
+        user = User.objects.create_user("oyente")
+        playlist = Playlist.objects.create(user=user, name="Lista")
+        self.assertEqual(self._playlists(user)[0].song_count, 0)
+
+        service = MusicService(
+            CachedSongRepository(Song, repository_cache()),
+            CachedPlaylistRepository(Playlist, repository_cache()),
+        )
+        with transaction.atomic():
+            service.add_songs_to_playlist(playlist, [{"title": "Canción", "artist": "Artista"}])
+
+        self.assertEqual(self._playlists(user)[0].song_count, 1)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from web.models import Artist, Song
+from web.search import (
+    FTS_TABLE, normalize_search_text, rebuild_search_index, search_song_ids, search_songs,
+)
+
+
+class SongSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        alvaro = Artist.objects.create(name="Álvaro Pérez")
+        other = Artist.objects.create(name="Otro")
+        cls.lullaby = Song.objects.create(title="Canción de cuna", artist=alvaro)
+        cls.other = Song.objects.create(title="Otra cosa", artist=other)
+
+    def search(self, text):
+        return list(search_songs(Song.objects.all(), text).values_list("id", flat=True))
+
+    def test_matches_ignoring_case_and_diacritics(self):
+        self.assertEqual(self.search("cancion"), [self.lullaby.id])
+        self.assertEqual(self.search("CANCIÓN"), [self.lullaby.id])
+        self.assertEqual(self.search("alvaro perez"), [self.lullaby.id])
+
+    def test_last_word_is_a_prefix(self):
+        self.assertEqual(self.search("canc"), [self.lullaby.id])
+        self.assertEqual(search_song_ids("ot"), [self.other.id])
+
+    def test_user_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('cuna" OR "otra'), [])
+        # Sin palabras buscables no se filtra
+        self.assertEqual(len(self.search("***")), 2)
+
+    def test_title_matches_rank_above_artist_matches(self):
+        by_artist = Song.objects.create(title="Sin título", artist=Artist.objects.create(name="Cuna"))
+
+        results = search_songs(Song.objects.all(), "cuna")
+
+        self.assertEqual([song.id for song in results], [self.lullaby.id, by_artist.id])
+        self.assertLess(results[0].search_rank, 0)
+
+    def test_unranked_search_only_filters(self):
+        queryset = search_songs(Song.objects.all(), "cuna", rank=False)
+
+        self.assertEqual(list(queryset.values_list("id", flat=True)), [self.lullaby.id])
+        self.assertNotIn("search_rank", queryset.query.annotations)
+
+    def test_rebuild_keeps_index_searchable(self):
+        rebuild_search_index()
+
+        self.assertEqual(self.search("cancion"), [self.lullaby.id])
+
+    def test_renaming_artist_updates_index(self):
+        Artist.objects.filter(pk=self.lullaby.artist_id).update(name="Nuevo Nombre")
+
+        self.assertEqual(self.search("nuevo"), [self.lullaby.id])
+        self.assertEqual(self.search("alvaro"), [])
+
+    def test_normalized_text_is_equivalent(self):
+        self.assertEqual(normalize_search_text("  Canción,  DE cuna "), "cancion de cuna")
+        self.assertEqual(self.search("Canción, DE cuna"), self.search(normalize_search_text("Canción, DE cuna")))
+
+    def test_rank_probe_runs_on_the_queryset_database(self):
+        # Solo el alias del queryset existe: usar otra conexión fallaría con KeyError
+        with mock.patch("web.search.connections", {"replica": connections["default"]}), \
+                CaptureQueriesContext(connections["default"]) as queries:
+            queryset = search_songs(Song.objects.using("replica"), "cancion")
+
+        self.assertEqual(queryset.db, "replica")
+        self.assertTrue(any(f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH" in query["sql"]
+                            for query in queries.captured_queries))
@@ -0,0 +1,57 @@
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from web.similarity_index import SongVectorIndex
+
+
+class SongVectorIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # Grupos alrededor de unos pocos centros, como los embeddings reales
+        centers = rng.normal(size=(8, 16))
+        self.vectors = centers[rng.integers(0, 8, size=400)] + 0.3 * rng.normal(size=(400, 16))
+        self.song_ids = np.arange(1000, 1400)
+        self.queries = rng.normal(size=(20, 16))
+        self.index = SongVectorIndex(n_lists=8, n_probe=3).build(
+            self.song_ids, self.vectors, {1000: {"title": "Primera"}},
+        )
+
+    def recall(self, index, k=10):
+        hits = 0
+        for query in self.queries:
+            exact = {song for song, _ in index.exact_search(query, k=k)}
+            hits += len(exact & {song for song, _ in index.search(query, k=k)})
+        return hits / (k * len(self.queries))
+
+    def test_search_recall_against_exact_search(self):
+        self.assertGreaterEqual(self.recall(self.index), 0.9)
+
+    def test_probing_every_list_is_exact(self):
+        query = self.queries[0]
+
+        self.assertEqual(self.index.search(query, k=10, n_probe=8), self.index.exact_search(query, k=10))
+
+    def test_similar_songs_exclude_the_query_song(self):
+        song_id = int(self.song_ids[0])
+
+        similar = self.index.similar_songs(song_id, k=10)
+        streamed = list(self.index.iter_similar(song_id))
+
+        self.assertEqual(len(similar), 10)
+        self.assertNotIn(song_id, [song for song, _ in similar])
+        self.assertNotIn(song_id, [song for song, _ in streamed])
+        self.assertEqual(streamed[:10], similar)
+
+    def test_save_and_load_with_mmap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.index.save(directory)
+            loaded = SongVectorIndex.load(directory, mmap=True)
+
+            self.assertIsInstance(loaded.vectors, np.memmap)
+            self.assertEqual(len(loaded), len(self.index))
+            self.assertEqual(loaded.resolve_song("primera"), 1000)
+            for query in self.queries[:5]:
+                self.assertEqual(loaded.search(query, k=5), self.index.search(query, k=5))
+            del loaded
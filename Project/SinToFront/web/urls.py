@@ -8,7 +8,15 @@ from .views import (
     TaskDeleteView,
     detectar_gesto,
     get_recommendations,
+    get_recommendations_batch,
     update_preferences,
+    record_listening_events,
+    bulk_move_tasks,
+    bulk_archive_tasks,
+    bulk_delete_tasks,
+    bulk_import_tasks,
+    bulk_update_tasks,
+    export_data,
 )
 
 def login_view(request):
@@ -19,9 +27,17 @@ urlpatterns = [
     path('login/', login_view, name='login'),
     path('detectar-gesto/', detectar_gesto, name='detectar_gesto'),
     path('api/recommendations/', get_recommendations, name='get_recommendations'),
+    path('api/recommendations/batch/', get_recommendations_batch, name='get_recommendations_batch'),
     path('api/preferences/', update_preferences, name='update_preferences'),
+    path('api/listening-events/', record_listening_events, name='record_listening_events'),
     path('tasks/', TaskListView.as_view(), name='task_list'),
     path('tasks/new/', TaskCreateView.as_view(), name='task_create'),
     path('tasks/<int:pk>/edit/', TaskUpdateView.as_view(), name='task_update'),
     path('tasks/<int:pk>/delete/', TaskDeleteView.as_view(), name='task_delete'),
+    path('api/tasks/bulk/status/', bulk_move_tasks, name='bulk_move_tasks'),
+    path('api/tasks/bulk/archive/', bulk_archive_tasks, name='bulk_archive_tasks'),
+    path('api/tasks/bulk/delete/', bulk_delete_tasks, name='bulk_delete_tasks'),
+    path('api/tasks/bulk/import/', bulk_import_tasks, name='bulk_import_tasks'),
+    path('api/tasks/bulk/update/', bulk_update_tasks, name='bulk_update_tasks'),
+    path('api/export/<str:kind>/', export_data, name='export_data'),
 ]
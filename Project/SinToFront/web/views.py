@@ -1,23 +1,31 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol, Iterable
+from typing import Any, Dict, List, Optional, Protocol, Iterable, Tuple
 import base64
 import io
 import cv2
 import numpy as np
 import json
 
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.functions import Lower
 from django.forms import ModelForm
 from django.shortcuts import render
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.views import View
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from .catalog_export import CONTENT_TYPES, export_filename, export_stream
+from .catalog_import import batched
 from .models import Task
+from .pagination import KeysetPaginationMixin
+from .records import encode_json
 # from .model.gesture_detector import GestureDetector
 
 
@@ -39,8 +47,23 @@ class TaskRepository(Protocol):
     def delete(self, task: Task) -> None:
         ...
 
+    def move_many(self, ids: Iterable[int], status: str, from_statuses: Optional[Iterable[str]] = None) -> int:
+        ...
+
+    def delete_many(self, ids: Iterable[int]) -> int:
+        ...
+
+    def create_many(self, rows: Iterable[Dict[str, Any]]) -> List[Task]:
+        ...
+
+    def update_many(self, changes: Dict[int, Dict[str, Any]]) -> int:
+        ...
+
 
 class DjangoORMTaskRepository:
+    # Filas por sentencia: acota el número de parámetros de cada IN/INSERT
+    chunk_size = 500
+
     def list(self) -> Iterable[Task]:
         return Task.objects.active()
 
@@ -50,27 +73,91 @@ class DjangoORMTaskRepository:
     def update(self, task: Task, **fields) -> Task:
         for key, value in fields.items():
             setattr(task, key, value)
-        task.save()
+        task.save(update_fields=[*fields, "updated_at"])
         return task
 
     def delete(self, task: Task) -> None:
         task.delete()
 
-
-# Strategy pattern for sorting tasks
+    def move_many(self, ids: Iterable[int], status: str, from_statuses: Optional[Iterable[str]] = None) -> int:
+        """Cambio de estado masivo: un UPDATE por bloque de ids, todo en una transacción"""
+        from_statuses = None if from_statuses is None else list(from_statuses)
+        with transaction.atomic():
+            return sum(
+                Task.objects.filter(id__in=chunk).move_to(status, from_statuses)
+                for chunk in batched(ids, self.chunk_size)
+            )
+
+    def archive_many(self, ids: Iterable[int]) -> int:
+        return self.move_many(ids, Task.Status.ARCHIVED)
+
+    def delete_many(self, ids: Iterable[int]) -> int:
+        with transaction.atomic():
+            return sum(
+                Task.objects.filter(id__in=chunk).delete()[0]
+                for chunk in batched(ids, self.chunk_size)
+            )
+
+    def create_many(self, rows: Iterable[Dict[str, Any]]) -> List[Task]:
+        """Valida cada fila con TaskForm y las inserta con bulk_create en una transacción"""
+        created = []
+        with transaction.atomic():
+            for chunk in batched(rows, self.chunk_size):
+                tasks = [_validated_task(index + len(created), row) for index, row in enumerate(chunk)]
+                created.extend(Task.objects.bulk_create(tasks))
+        return created
+
+    def update_many(self, changes: Dict[int, Dict[str, Any]]) -> int:
+        """Cambios distintos por tarea ({id: {campo: valor}}) con bulk_update por bloques"""
+        editable = set(TaskForm.Meta.fields)
+        fields = sorted({field for values in changes.values() for field in values})
+        if not fields or not editable.issuperset(fields):
+            raise ValueError(f"Campos editables: {', '.join(sorted(editable))}")
+        now = timezone.now()
+        updated = 0
+        with transaction.atomic():
+            for chunk in batched(changes.items(), self.chunk_size):
+                tasks = Task.objects.in_bulk([task_id for task_id, _ in chunk])
+                for task_id, values in chunk:
+                    task = tasks.get(task_id)
+                    if task is None:
+                        continue
+                    current = {field: getattr(task, field) for field in editable}
+                    form = TaskForm(data={**current, **values}, instance=task)
+                    if not form.is_valid():
+                        raise ValueError(f"Tarea {task_id}: {form.errors.as_json()}")
+                    task.updated_at = now
+                updated += Task.objects.bulk_update(tasks.values(), [*fields, "updated_at"])
+        return updated
+
+
+# Strategy pattern for sorting tasks: the database sorts, using an index
+# that covers `ordering` (the last key is unique so it can drive a cursor)
 class TaskSortStrategy(Protocol):
-    def sort(self, tasks: Iterable[Task]) -> Iterable[Task]:
+    ordering: Tuple[str, ...]
+
+    def sort(self, tasks: QuerySet) -> QuerySet:
         ...
 
 
 class SortByCreatedDesc:
-    def sort(self, tasks: Iterable[Task]) -> Iterable[Task]:
-        return sorted(tasks, key=lambda t: t.created_at, reverse=True)
+    ordering = ("-created_at", "-id")
+
+    def sort(self, tasks: QuerySet) -> QuerySet:
+        return tasks.order_by(*self.ordering)
 
 
 class SortByTitleAsc:
-    def sort(self, tasks: Iterable[Task]) -> Iterable[Task]:
-        return sorted(tasks, key=lambda t: t.title.lower())
+    ordering = ("title_lower", "id")
+
+    def sort(self, tasks: QuerySet) -> QuerySet:
+        return tasks.annotate(title_lower=Lower("title")).order_by(*self.ordering)
+
+
+TASK_SORT_STRATEGIES = {
+    "created": SortByCreatedDesc,
+    "title": SortByTitleAsc,
+}
 
 
 @dataclass
@@ -78,7 +165,7 @@ class TaskListService:
     repo: TaskRepository
     sorter: TaskSortStrategy
 
-    def list_tasks(self) -> Iterable[Task]:
+    def list_tasks(self) -> QuerySet:
         return self.sorter.sort(self.repo.list())
 
 
@@ -88,17 +175,40 @@ class TaskForm(ModelForm):
         fields = ["title", "description", "status"]
 
 
-class TaskListView(ListView):
+def _validated_task(index: int, row: Dict[str, Any]) -> Task:
+    """Tarea sin guardar a partir de una fila importada, con las reglas del formulario"""
+    if not isinstance(row, dict):
+        raise ValueError(f"Fila {index}: se esperaba un objeto")
+    form = TaskForm(data={"description": "", "status": Task.Status.TODO, **row})
+    if not form.is_valid():
+        raise ValueError(f"Fila {index}: {form.errors.as_json()}")
+    return form.save(commit=False)
+
+
+class TaskListView(KeysetPaginationMixin, ListView):
     model = Task
     template_name = "task_list.html"
     context_object_name = "tasks"
+    paginate_by = 20
 
-    def get_queryset(self):
-        repo = DjangoORMTaskRepository()
+    def get_sort_key(self) -> str:
         sort_key = self.request.GET.get("sort", "created")
-        sorter: TaskSortStrategy = SortByCreatedDesc() if sort_key == "created" else SortByTitleAsc()
-        service = TaskListService(repo=repo, sorter=sorter)
-        return list(service.list_tasks())
+        return sort_key if sort_key in TASK_SORT_STRATEGIES else "title"
+
+    def get_sorter(self) -> TaskSortStrategy:
+        return TASK_SORT_STRATEGIES[self.get_sort_key()]()
+
+    def get_queryset(self):
+        service = TaskListService(repo=DjangoORMTaskRepository(), sorter=self.get_sorter())
+        return service.list_tasks()
+
+    def get_keyset_ordering(self):
+        return list(self.get_sorter().ordering)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["sort"] = self.get_sort_key()
+        return context
 
 
 class TaskCreateView(CreateView):
@@ -162,22 +272,76 @@ def get_recommendations(request):
         
         # Obtener recomendaciones
         system = GlobalRecommendationSystem()
-        recommendations = system.get_recommendations(
+        recommendations, metadata = system.get_recommendations_with_metadata(
             user, 
             strategy_type=strategy_type,
             context=context
         )
         
-        return JsonResponse({
+        # Única conversión de los registros a JSON
+        return HttpResponse(encode_json({
             'recommendations': recommendations,
             'strategy_used': strategy_type,
-            'total_count': len(recommendations)
-        })
+            'total_count': len(recommendations),
+            'metadata': metadata
+        }), content_type='application/json')
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
+MAX_BATCH_REQUESTS = 500
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def get_recommendations_batch(request):
+    """Endpoint para obtener recomendaciones de varios usuarios/contextos en una llamada"""
+    try:
+        from .recommendation_system import GlobalRecommendationSystem
+        
+        data = json.loads(request.body)
+        items = data.get('requests', [])
+        if not isinstance(items, list) or len(items) > MAX_BATCH_REQUESTS:
+            return JsonResponse({'error': f'requests debe ser una lista de hasta {MAX_BATCH_REQUESTS} elementos'}, status=400)
+        
+        # Crear usuarios mock
+        class MockUser:
+            def __init__(self, id):
+                self.id = id
+                self.username = f"user_{id}"
+        
+        users = {}
+        requests = []
+        for item in items:
+            user_id = int(item.get('user_id', 1))
+            user = users.setdefault(user_id, MockUser(user_id))
+            requests.append((user, item.get('strategy', 'hybrid'), item.get('context') or {}))
+        
+        system = GlobalRecommendationSystem()
+        results = system.get_recommendations_batch(requests)
+        
+        # Única conversión de los registros a JSON
+        return HttpResponse(encode_json({
+            'results': [
+                {
+                    'user_id': user.id,
+                    'strategy_used': strategy_type,
+                    'recommendations': recommendations,
+                    'total_count': len(recommendations),
+                    'metadata': metadata,
+                }
+                for (user, strategy_type, _), (recommendations, metadata) in zip(requests, results)
+            ],
+            'total_count': len(results),
+        }), content_type='application/json')
+        
+    except (AttributeError, TypeError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def update_preferences(request):
@@ -209,3 +373,120 @@ def update_preferences(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+
+
+def _listening_event(event) -> tuple:
+    """(user_id, song_id, plays) de un evento de la API; `weight` se acepta como alias de plays"""
+    plays = float(event.get('plays', event.get('weight', 1)))
+    if not plays.is_integer() or plays < 1:
+        raise ValueError("plays debe ser un entero positivo")
+    return int(event['user_id']), int(event['song_id']), int(plays)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def record_listening_events(request):
+    """Endpoint para registrar un lote de eventos de escucha"""
+    try:
+        from .recommendation_system import GlobalRecommendationSystem
+        
+        data = json.loads(request.body)
+        events = [_listening_event(event) for event in data.get('events', [])]
+        
+        system = GlobalRecommendationSystem()
+        affected_users = system.record_listening_events(events)
+        
+        return JsonResponse({
+            'success': True,
+            'processed_count': len(events),
+            'affected_users': affected_users
+        })
+        
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+MAX_BULK_TASKS = 10_000
+
+
+def _bulk_payload(request, key: str) -> list:
+    data = json.loads(request.body)
+    items = data.get(key)
+    if not isinstance(items, list) or len(items) > MAX_BULK_TASKS:
+        raise ValueError(f"{key} debe ser una lista de hasta {MAX_BULK_TASKS} elementos")
+    return items
+
+
+def _bulk_response(handler):
+    """
+    Traduce errores de validación a 400 en los endpoints masivos de tareas
+
+    Protegidos por CSRF: modifican muchas filas de una vez, así que el cliente
+    debe enviar el token de la cookie csrftoken en la cabecera X-CSRFToken.
+    """
+    def wrapper(request):
+        try:
+            return JsonResponse(handler(request, DjangoORMTaskRepository()))
+        except (KeyError, TypeError, ValueError) as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    wrapper.__name__ = handler.__name__
+    wrapper.__doc__ = handler.__doc__
+    return require_http_methods(["POST"])(wrapper)
+
+
+@_bulk_response
+def bulk_move_tasks(request, repo):
+    """Cambia el estado de muchas tareas: {"ids": [...], "status": "DONE", "from": ["TODO"]}"""
+    data = json.loads(request.body)
+    ids = [int(task_id) for task_id in _bulk_payload(request, 'ids')]
+    from_statuses = data.get('from')
+    if from_statuses is not None and not isinstance(from_statuses, list):
+        raise ValueError("from debe ser una lista de estados")
+    return {'updated': repo.move_many(ids, data['status'], from_statuses)}
+
+
+@_bulk_response
+def bulk_archive_tasks(request, repo):
+    """Archiva muchas tareas: {"ids": [...]}"""
+    ids = [int(task_id) for task_id in _bulk_payload(request, 'ids')]
+    return {'updated': repo.archive_many(ids)}
+
+
+@_bulk_response
+def bulk_delete_tasks(request, repo):
+    """Elimina muchas tareas: {"ids": [...]}"""
+    ids = [int(task_id) for task_id in _bulk_payload(request, 'ids')]
+    return {'deleted': repo.delete_many(ids)}
+
+
+@_bulk_response
+def bulk_import_tasks(request, repo):
+    """Crea tareas desde JSON: {"tasks": [{"title": ..., "description": ..., "status": ...}]}"""
+    tasks = repo.create_many(_bulk_payload(request, 'tasks'))
+    return {'created': len(tasks), 'ids': [task.id for task in tasks]}
+
+
+@_bulk_response
+def bulk_update_tasks(request, repo):
+    """Edita campos distintos por tarea: {"tasks": [{"id": 1, "title": ...}]}"""
+    changes = {}
+    for item in _bulk_payload(request, 'tasks'):
+        values = dict(item)
+        changes[int(values.pop('id'))] = values
+    return {'updated': repo.update_many(changes)}
+
+
+@require_http_methods(["GET"])
+def export_data(request, kind):
+    """Exporta tareas o canciones en streaming: ?format=csv|ndjson&gzip=1"""
+    fmt = request.GET.get('format', 'csv')
+    compress = request.GET.get('gzip') in ('1', 'true')
+    try:
+        stream = export_stream(kind, fmt, compress)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    response = StreamingHttpResponse(stream, content_type='application/gzip' if compress else CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(kind, fmt, compress)}"'
+    return response